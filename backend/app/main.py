@@ -6,15 +6,20 @@ FastAPI 기반 웹 API
 import sys
 from pathlib import Path
 from typing import List, Dict, Optional
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, nullcontext
 from fastapi import FastAPI, HTTPException, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 import os
-import requests
+import json
+import asyncio
+import httpx
 from dotenv import load_dotenv
 import time  # <-- 추가
+import logging
+import uuid
 
 # 프로젝트 루트 경로 설정
 project_root = Path(__file__).parent.parent.parent
@@ -29,13 +34,31 @@ load_dotenv(dotenv_path=env_path)
 from backend.app.services.data_loaders import load_shelter_csv, load_all_disaster_jsons
 from backend.app.services.documents import csv_to_documents, json_to_documents
 from backend.app.services.embedding_and_vectordb import create_embeddings_and_vectordb
-from backend.app.services.langgraph_agent import create_langgraph_app, create_hybrid_retrievers
+from backend.app.services.langgraph_agent import create_langgraph_apps, create_hybrid_retrievers
+from backend.app.services.llm_callbacks import LLMCallCounter, llm_usage_stats
+from backend.app.services.semantic_cache import SemanticCache, LOCATION_INDEPENDENT_INTENTS
+from backend.app.services.response_cache import ResponseCache
+from backend.app.services.data_version import read_data_version
+from backend.app.services.budget import budget_stats, new_deadline, remaining
+from backend.app.services.admission import Overloaded, admission_stats, admit, check_admission, record_overload
+from backend.app.services.faq_store import faq_stats
+from backend.app.services.guideline_cards import guideline_card_stats
+from backend.app.services.query_hints import is_location_free, priority_lane
+from backend.app.services.context_window import context_window_stats
+from backend.app.services.prompts import static_prompt_tokens
+from backend.app.services.speculation import finish_speculation, speculation_stats
+from backend.app.services.tracing import TracingCallback, render_prometheus, trace_request, tracing_stats
+from backend.app.services.logging_setup import logging_stats, setup_logging
 
 from langchain_chroma import Chroma
 from langchain_openai import OpenAIEmbeddings
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage
 import pandas as pd
 
+# 비동기 구조화 로깅 (backend.* 로거 → 큐 → 백그라운드 출력)
+setup_logging()
+logger = logging.getLogger("backend.app.main")
+
 
 # -----------------------------------------------------------------------------
 # 경로 설정
@@ -43,9 +66,7 @@ import pandas as pd
 DATA_DIR = project_root / "data"
 CHROMA_DB_DIR = project_root / "chroma_db"
 
-print(f"[경로] 프로젝트 루트: {project_root}")
-print(f"[경로] 데이터 디렉토리: {DATA_DIR}")
-print(f"[경로] Chroma DB: {CHROMA_DB_DIR}")
+logger.info("[경로] 프로젝트 루트: %s, 데이터: %s, Chroma DB: %s", project_root, DATA_DIR, CHROMA_DB_DIR)
 
 
 # -----------------------------------------------------------------------------
@@ -84,7 +105,10 @@ class ChatbotResponse(BaseModel):
 async def lifespan(app: FastAPI):
     """서버 시작/종료 시 실행되는 초기화 작업"""
     global vectorstore, shelter_df, embeddings
-    global shelter_hybrid_retriever, guideline_hybrid_retriever, langgraph_app
+    global shelter_hybrid_retriever, guideline_hybrid_retriever, langgraph_app, stateless_langgraph_app
+    global semantic_cache, response_cache
+
+    startup_start = time.perf_counter()
 
     # OpenAI 임베딩 초기화
     try:
@@ -92,10 +116,33 @@ async def lifespan(app: FastAPI):
             model="text-embedding-3-small", 
             openai_api_key=os.getenv("OPENAI_API_KEY")
         )
-        print("[lifespan] 임베딩 모델 초기화 성공")
+        logger.info("[lifespan] 임베딩 모델 초기화 성공")
     except Exception as e:
         embeddings = None
-        print(f"[lifespan] 임베딩 모델 초기화 실패: {e}")
+        logger.warning("[lifespan] 임베딩 모델 초기화 실패: %s", e)
+
+    # 정확 일치 응답 캐시 초기화 (RESPONSE_CACHE_PATH 설정 시 디스크에서 복원)
+    if os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true":
+        response_cache = ResponseCache(
+            max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")),
+            ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL", "600")),
+            persist_path=os.getenv("RESPONSE_CACHE_PATH") or None,
+            data_version=read_data_version(str(CHROMA_DB_DIR)),
+            stale_seconds=float(os.getenv("RESPONSE_CACHE_STALE_SECONDS", "86400")),
+        )
+        response_cache.load()
+        logger.info("[lifespan] 응답 캐시 초기화 성공")
+
+    # 시맨틱 응답 캐시 초기화 (임베딩 모델 필요)
+    if embeddings is not None and os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true":
+        semantic_cache = SemanticCache(
+            embeddings,
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+            ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL", "3600")),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "512")),
+            data_version=read_data_version(str(CHROMA_DB_DIR)),
+        )
+        logger.info("[lifespan] 시맨틱 캐시 초기화 성공")
 
     # 벡터 DB 로드
     try:
@@ -104,41 +151,54 @@ async def lifespan(app: FastAPI):
             embedding_function=embeddings,
             persist_directory=str(CHROMA_DB_DIR),
         )
-        print("[lifespan] 벡터DB 로드 성공")
+        logger.info("[lifespan] 벡터DB 로드 성공")
     except Exception as e:
         vectorstore = None
-        print(f"[lifespan] 벡터DB 로드 실패: {e}")
+        logger.warning("[lifespan] 벡터DB 로드 실패: %s", e)
 
     # 대피소 데이터 로드 (절대 경로 사용)
     try:
         shelter_csv_path = DATA_DIR / "shelter.csv"
-        print(f"[lifespan] 대피소 CSV 경로: {shelter_csv_path}")
+        logger.debug("[lifespan] 대피소 CSV 경로: %s", shelter_csv_path)
         
         shelter_data = load_shelter_csv("shelter.csv", data_dir=str(DATA_DIR))
         shelter_df = pd.DataFrame(shelter_data)
-        print(f"[lifespan] 대피소 데이터 로드 성공: {len(shelter_df)}개")
+        logger.info("[lifespan] 대피소 데이터 로드 성공: %d개", len(shelter_df))
     except Exception as e:
         shelter_df = None
-        print(f"[lifespan] 대피소 데이터 로드 실패: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[lifespan] 대피소 데이터 로드 실패: %s", e)
 
-    # LangGraph 초기화
+    # LangGraph 초기화 (리트리버는 한 번만 만들어 그래프와 공유)
     try:
+        langgraph_init_start = time.perf_counter()
         shelter_hybrid_retriever, guideline_hybrid_retriever = create_hybrid_retrievers(vectorstore)
-        langgraph_app = create_langgraph_app(vectorstore)
-        print("[lifespan] LangGraph Agent 초기화 완료")
+        langgraph_app, stateless_langgraph_app = create_langgraph_apps(
+            vectorstore,
+            retrievers=(shelter_hybrid_retriever, guideline_hybrid_retriever),
+        )
+        logger.info("[lifespan] LangGraph Agent 초기화 완료 (%.3f초)", time.perf_counter() - langgraph_init_start)
     except Exception as e:
         shelter_hybrid_retriever = None
         guideline_hybrid_retriever = None
         langgraph_app = None
-        print(f"[lifespan] LangGraph 초기화 실패: {e}")
-        import traceback
-        traceback.print_exc()
+        stateless_langgraph_app = None
+        logger.exception("[lifespan] LangGraph 초기화 실패: %s", e)
+
+    logger.info("⏱️ [서버 시작 총 시간] %.3f초", time.perf_counter() - startup_start)
 
     yield  # 애플리케이션 실행 중
 
     # 종료 시 정리 작업
+    checkpointer = getattr(langgraph_app, "checkpointer", None)
+    if hasattr(checkpointer, "close"):
+        # SQLite 체크포인트 버퍼에 남은 대화 기록
+        checkpointer.close()
+
+    if response_cache is not None:
+        try:
+            response_cache.save()
+        except Exception as e:
+            logger.warning("[lifespan] 응답 캐시 저장 실패: %s", e)
 
 
 # FastAPI 앱 생성
@@ -156,6 +216,9 @@ embeddings = None
 shelter_hybrid_retriever = None
 guideline_hybrid_retriever = None
 langgraph_app = None
+stateless_langgraph_app = None  # 단발성 질의용 (체크포인터 없음)
+semantic_cache = None
+response_cache = None
 
 
 # -----------------------------------------------------------------------------
@@ -175,6 +238,151 @@ app.add_middleware(
 )
 
 
+# -----------------------------------------------------------------------------
+# 응답 캐시 헬퍼
+# -----------------------------------------------------------------------------
+
+def ensure_cache_versions():
+    """데이터가 재적재됐으면 정확 일치/시맨틱 캐시를 함께 무효화"""
+    data_version = read_data_version(str(CHROMA_DB_DIR))
+    if response_cache is not None:
+        response_cache.ensure_version(data_version)
+    if semantic_cache is not None:
+        semantic_cache.ensure_version(data_version)
+
+
+def get_cached_response(cache_key: str) -> Optional[dict]:
+    """정확 일치 캐시 조회 (데이터가 재적재됐으면 먼저 무효화)"""
+    if response_cache is None:
+        return None
+
+    ensure_cache_versions()
+    return response_cache.get(cache_key)
+
+
+def store_cached_response(cache_key: str, payload: dict):
+    if response_cache is not None:
+        response_cache.set(cache_key, payload)
+
+
+async def session_has_history(session_id: str) -> bool:
+    """
+    세션에 이전 대화가 있는지
+    (후속 질문은 에이전트가 이전 대화를 보고 답하므로, 캐시는 대화가 없는 세션의 질문만 조회/저장)
+    """
+    if langgraph_app is None:
+        return False
+    try:
+        snapshot = await langgraph_app.aget_state({"configurable": {"thread_id": session_id}})
+    except Exception as e:
+        logger.warning("[대화 기록] 조회 실패 → 캐시 사용 안 함: %s", e)
+        return True
+    return bool(snapshot.values.get("messages"))
+
+
+async def record_cached_turn(session_id: str, message: str, response: str):
+    """캐시로 답한 질문/답변을 세션 대화 기록에 추가 (그래프를 실행하지 않으므로 직접 기록)"""
+    try:
+        await langgraph_app.aupdate_state(
+            {"configurable": {"thread_id": session_id}},
+            {"messages": [HumanMessage(content=message), AIMessage(content=response)]},
+            as_node="agent",
+        )
+    except Exception as e:
+        logger.warning("[대화 기록] 캐시 응답 기록 실패: %s", e)
+
+
+async def lookup_semantic_cache(query: str):
+    """
+    위치와 무관하다고 확신할 수 있는 질문만 시맨틱 캐시 조회
+    (장소명일 수 있는 단어가 남으면 조회하지 않음, 적중해도 위치 무관 의도로 저장된 답변만 사용)
+    Returns: (캐시된 payload 또는 None, 질문 임베딩 또는 None)
+    """
+    if semantic_cache is None or not is_location_free(query):
+        return None, None
+
+    ensure_cache_versions()
+    try:
+        # 임베딩도 OpenAI 호출이므로 자리를 확보한 뒤 실행 (자리가 없으면 캐시 미스)
+        async with admit("embeddings"):
+            cached, query_vector = await semantic_cache.alookup(query)
+    except Overloaded:
+        return None, None
+    except Exception as e:
+        logger.warning("[시맨틱 캐시] 조회 실패: %s", e)
+        return None, None
+
+    if cached is not None and cached.get("intent") not in LOCATION_INDEPENDENT_INTENTS:
+        return None, query_vector
+    return cached, query_vector
+
+
+async def store_semantic_cache(query: str, query_vector, result: dict, message: str, tool_used: Optional[str]):
+    """지도 데이터가 없는 위치 무관 답변만 시맨틱 캐시에 저장 (시간 예산 소진으로 끊긴 답변 제외)"""
+    if (
+        semantic_cache is None
+        or result.get("structured_data")
+        or result.get("budget_exhausted")
+        or result.get("intent") not in LOCATION_INDEPENDENT_INTENTS
+        or not is_location_free(query)
+    ):
+        return
+
+    try:
+        async with admit("embeddings") if query_vector is None else nullcontext():
+            await semantic_cache.astore(
+                query,
+                query_vector,
+                {"message": message, "intent": result.get("intent"), "tool_used": tool_used},
+                result.get("intent"),
+            )
+    except Overloaded:
+        # 조회 때 임베딩을 만들지 못했고 지금도 자리가 없으면 저장 생략
+        return
+    except Exception as e:
+        logger.warning("[시맨틱 캐시] 저장 실패: %s", e)
+
+
+# -----------------------------------------------------------------------------
+# 과부하 대응 헬퍼
+# -----------------------------------------------------------------------------
+
+# 과부하 시 대체 응답으로 쓸 시맨틱 캐시 최소 유사도 (평소 임계값보다 낮음)
+DEGRADED_SEMANTIC_THRESHOLD = float(os.getenv("DEGRADED_SEMANTIC_THRESHOLD", "0.85"))
+DEGRADED_NOTICE = "🚦 지금 요청이 많아 이전에 안내한 답변을 보여드립니다.\n\n"
+
+
+def degraded_answer(overload: Overloaded, cache_key: Optional[str], query_vector=None) -> Optional[dict]:
+    """
+    LLM 대기열이 가득 찼을 때의 대체 응답
+    만료된 정확 일치 캐시 → 임계값을 낮춘 시맨틱 캐시 순 (없으면 None → 503)
+    cache_key가 None이면(이전 대화가 있는 세션) 정확 일치 캐시를 보지 않음
+    """
+    if response_cache is not None and cache_key is not None:
+        payload = response_cache.get_stale(cache_key)
+        if payload:
+            record_overload(overload, "stale_exact")
+            return payload
+
+    if semantic_cache is not None and query_vector is not None:
+        payload = semantic_cache.nearest(query_vector, DEGRADED_SEMANTIC_THRESHOLD)
+        if payload:
+            record_overload(overload, "semantic")
+            return payload
+
+    record_overload(overload, "rejected")
+    return None
+
+
+def overloaded_error(overload: Overloaded) -> HTTPException:
+    """대체 응답이 없을 때 바로 돌려줄 503 (Retry-After: 대기열이 빠지는 예상 시간)"""
+    return HTTPException(
+        status_code=503,
+        detail="지금 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+        headers={"Retry-After": str(overload.retry_after)},
+    )
+
+
 # -----------------------------------------------------------------------------
 # API 엔드포인트
 # -----------------------------------------------------------------------------
@@ -213,95 +421,193 @@ async def get_api_status():
     }
 
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """응답 캐시 통계 (적중률 등)"""
+    checkpointer = getattr(langgraph_app, "checkpointer", None)
+    return {
+        "exact": response_cache.stats() if response_cache is not None else None,
+        "semantic": semantic_cache.stats() if semantic_cache is not None else None,
+        "speculation": speculation_stats(),
+        "guideline_cards": guideline_card_stats(),
+        "faq": faq_stats(),
+        "checkpointer": checkpointer.stats() if hasattr(checkpointer, "stats") else None,
+        "context_window": context_window_stats(),
+        "llm_usage": llm_usage_stats(),
+        "static_prompt_tokens": static_prompt_tokens(),
+        "logging": logging_stats(),
+        "budget": budget_stats(),
+        "admission": admission_stats(),
+    }
+
+
+@app.get("/metrics")
+async def get_metrics(format: str = "prometheus"):
+    """
+    단계별 지연시간 히스토그램 (요청/노드/도구/LLM/카카오/ChromaDB span)
+    - 기본: Prometheus 텍스트 형식, format=json: span별 p50/p95/p99 요약
+    """
+    if format == "json":
+        return tracing_stats()
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/api/cache/invalidate")
+async def invalidate_caches():
+    """응답 캐시 전체 무효화 (대피소/행동요령 데이터 재적재 후 호출)"""
+    if response_cache is not None:
+        response_cache.invalidate()
+        response_cache.data_version = read_data_version(str(CHROMA_DB_DIR))
+    if semantic_cache is not None:
+        semantic_cache.clear()
+        semantic_cache.data_version = read_data_version(str(CHROMA_DB_DIR))
+    return {"invalidated": True}
+
+
 @app.post("/api/location/extract")
 async def extract_location(request: LocationExtractRequest = Body(...)):
     """
     LangGraph Agent 기반 통합 검색 (시간 측정 포함)
     """
-    request_start = time.time()
+    with trace_request("location_extract") as request_span:
+        request_start = time.perf_counter()
+        # 요청 마감 시각 (그래프 State로 전달되어 LLM/도구/카카오 호출 대기 시간 제한)
+        deadline = new_deadline()
     
-    if langgraph_app is None:
-        return LocationExtractResponse(
-            success=False, 
-            message="서버 초기화가 완료되지 않았습니다."
-        )
-
-    query = request.query.strip()
-    if not query:
-        return LocationExtractResponse(
-            success=False, 
-            message="입력 문장이 비어 있습니다."
-        )
+        if stateless_langgraph_app is None:
+            return LocationExtractResponse(
+                success=False, 
+                message="서버 초기화가 완료되지 않았습니다."
+            )
 
-    print(f"\n{'='*60}")
-    print(f"[API 요청 시작] '{query}'")
-    print(f"{'='*60}")
+        query = request.query.strip()
+        if not query:
+            return LocationExtractResponse(
+                success=False, 
+                message="입력 문장이 비어 있습니다."
+            )
 
-    try:
-        session_id = f"session_{hash(query) % 100000}"
-        config = {"configurable": {"thread_id": session_id}}
-
-        # LangGraph 실행 시간 측정
-        langgraph_start = time.time()
-        result = langgraph_app.invoke(
-            {"messages": [HumanMessage(content=query)]}, 
-            config=config
-        )
-        langgraph_time = time.time() - langgraph_start
+        logger.debug("[API 요청 시작] '%s'", query)
+
+        request_id = uuid.uuid4().hex
+
+        try:
+            # 정확 일치 캐시 조회 (프리셋 버튼 등 동일 질문)
+            cache_key = ResponseCache.make_key("location_extract", query)
+            cached_response = get_cached_response(cache_key)
+            if cached_response:
+                request_span.set(cache="exact")
+                logger.info("⏱️ [응답 캐시 응답] %.3f초", time.perf_counter() - request_start, extra={"cache": "exact"})
+                return LocationExtractResponse(**cached_response)
+
+            # 시맨틱 캐시 조회 (위치 무관 질문만)
+            cached, query_vector = await lookup_semantic_cache(query)
+            if cached:
+                request_span.set(cache="semantic")
+                logger.info("⏱️ [시맨틱 캐시 응답] %.3f초", time.perf_counter() - request_start, extra={"cache": "semantic"})
+                return LocationExtractResponse(
+                    success=True,
+                    message=cached["message"],
+                    intent=cached.get("intent"),
+                )
+
+            # 단발성 질의 → 무상태 앱 (대화 기록 조회/저장 없음, 다른 사용자 질문과 섞이지 않음)
+            llm_counter = LLMCallCounter()
+            config = {
+                "configurable": {"request_id": request_id, "deadline": deadline},
+                "callbacks": [llm_counter, TracingCallback()],
+            }
 
-        final_message = result["messages"][-1]
-        structured_data = result.get("structured_data", None)
+            # LangGraph 실행 시간 측정 (LLM 자리 대기 시간 제외, 위치/재난 질문 우선)
+            lane = priority_lane(query)
+            request_span.set(lane=lane)
+            async with admit("llm", max_wait=remaining(deadline), lane=lane):
+                langgraph_start = time.perf_counter()
+                result = await stateless_langgraph_app.ainvoke(
+                    {"messages": [HumanMessage(content=query)]}, 
+                    config=config
+                )
+                langgraph_time = time.perf_counter() - langgraph_start
+
+            final_message = result["messages"][-1]
+            structured_data = result.get("structured_data", None)
+
+            # [2026-01-08 추가] 사용된 도구명 추출 로직 (messages를 역순으로 훑어 tool_calls 탐색)
+            tool_used = None
+            for msg in reversed(result["messages"]):
+                if hasattr(msg, "tool_calls") and msg.tool_calls:
+                    tool_used = msg.tool_calls[0]["name"]
+                    break
+
+            await store_semantic_cache(query, query_vector, result, final_message.content, tool_used)
+
+            # 총 처리 시간
+            total_time = time.perf_counter() - request_start
+
+            logger.info(
+                "⏱️ [성능 측정 결과] LangGraph %.3f초, 총 %.3f초, 도구 %s, LLM 호출 %d회 (%s), %s",
+                langgraph_time,
+                total_time,
+                tool_used,
+                llm_counter.count,
+                ", ".join(llm_counter.calls),
+                llm_counter.token_summary(),
+                extra={"latency": round(total_time, 3), "tool": tool_used, "llm_calls": llm_counter.count},
+            )
 
-        # [2026-01-08 추가] 사용된 도구명 추출 로직 (messages를 역순으로 훑어 tool_calls 탐색)
-        tool_used = None
-        for msg in reversed(result["messages"]):
-            if hasattr(msg, "tool_calls") and msg.tool_calls:
-                tool_used = msg.tool_calls[0]["name"]
-                break
-
-        # 총 처리 시간
-        total_time = time.time() - request_start
-
-        print(f"\n{'='*60}")
-        print(f"⏱️ [성능 측정 결과]")
-        print(f"  - LangGraph 실행 시간: {langgraph_time:.3f}초")
-        print(f"  - API 총 처리 시간: {total_time:.3f}초")
-        print(f"  - 탐지된 도구: {tool_used}") # 로그 추가
-        print(f"{'='*60}\n")
-
-        if structured_data:
-            print(f"[INFO] 구조화된 응답 반환 (좌표 포함)")
+            if structured_data:
+                logger.debug("[INFO] 구조화된 응답 반환 (좌표 포함)")
+                response = LocationExtractResponse(
+                    success=True,
+                    location=structured_data.get("location"),
+                    coordinates=structured_data.get("coordinates"),
+                    shelters=structured_data.get("shelters", []),
+                    total_count=structured_data.get("total_count", 0),
+                    message=final_message.content,
+                    intent=result.get("intent"),
+                    tool_used=tool_used # 추출된 도구명 전달
+                )
+            else:
+                logger.debug("[INFO] 텍스트 응답 반환")
+                response = LocationExtractResponse(
+                    success=True,
+                    location=None,
+                    coordinates=None,
+                    shelters=[],
+                    total_count=0,
+                    message=final_message.content,
+                    intent=result.get("intent"),
+                    tool_used=tool_used
+                )
+
+            request_span.set(budget_exhausted=result.get("budget_exhausted"))
+            if not result.get("budget_exhausted"):
+                store_cached_response(cache_key, response.model_dump())
+            return response
+
+        except Overloaded as e:
+            request_span.set(overload=e.reason)
+            payload = degraded_answer(e, cache_key, query_vector)
+            if payload is None:
+                raise overloaded_error(e)
+            if "success" in payload:
+                # 같은 질문의 이전 응답 (대피소 목록 포함)
+                return LocationExtractResponse(**{**payload, "message": DEGRADED_NOTICE + payload["message"]})
             return LocationExtractResponse(
                 success=True,
-                location=structured_data.get("location"),
-                coordinates=structured_data.get("coordinates"),
-                shelters=structured_data.get("shelters", []),
-                total_count=structured_data.get("total_count", 0),
-                message=final_message.content,
-                intent=result.get("intent"),
-                tool_used=tool_used # 추출된 도구명 전달
+                message=DEGRADED_NOTICE + payload["message"],
+                intent=payload.get("intent"),
             )
-        else:
-            print(f"[INFO] 텍스트 응답 반환")
+
+        except Exception as e:
+            logger.exception("[ERROR] LangGraph Agent 실행 실패: %s", e)
             return LocationExtractResponse(
-                success=True,
-                location=None,
-                coordinates=None,
-                shelters=[],
-                total_count=0,
-                message=final_message.content,
-                intent=result.get("intent"),
-                tool_used=tool_used
+                success=False,
+                message="처리 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.",
             )
-
-    except Exception as e:
-        print(f"[ERROR] LangGraph Agent 실행 실패: {e}")
-        import traceback
-        traceback.print_exc()
-        return LocationExtractResponse(
-            success=False,
-            message="처리 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.",
-        )
+        finally:
+            # 사용되지 않은 선행 위치 검색 정리
+            finish_speculation(request_id)
 
 
 @app.get("/api/shelters/nearest")
@@ -310,7 +616,7 @@ async def get_nearest_shelters(lat: float, lon: float, k: int = 5):
     현위치 기준 가장 가까운 대피소 검색
     기존 main.py의 로직 그대로 사용
     """
-    print(f"[API] get_nearest_shelters 호출: lat={lat}, lon={lon}, k={k}")
+    logger.debug("[API] get_nearest_shelters 호출: lat=%s, lon=%s, k=%s", lat, lon, k)
     
     import math
 
@@ -365,7 +671,7 @@ async def get_nearest_shelters(lat: float, lon: float, k: int = 5):
         }
 
     try:
-        all_data = vectorstore.get(where={"type": "shelter"})
+        all_data = await asyncio.to_thread(vectorstore.get, where={"type": "shelter"})
         all_metadatas = all_data.get("metadatas", [])
 
         shelters = []
@@ -405,7 +711,7 @@ async def get_nearest_shelters(lat: float, lon: float, k: int = 5):
         }
 
     except Exception as e:
-        print(f"[ERROR] VectorStore 사용 중 오류: {e}")
+        logger.exception("[ERROR] VectorStore 사용 중 오류: %s", e)
         return {
             "user_location": {"lat": lat, "lon": lon},
             "shelters": [],
@@ -419,36 +725,274 @@ async def chatbot_endpoint(request: ChatbotRequest):
     LangGraph Agent 기반 챗봇
     기존 main.py의 로직 그대로 사용
     """
-    try:
-        if langgraph_app is None:
+    with trace_request("chatbot") as request_span:
+        deadline = new_deadline()
+        try:
+            if langgraph_app is None:
+                raise HTTPException(
+                    status_code=503,
+                    detail="챗봇 시스템이 초기화되지 않았습니다."
+                )
+
+            # 정확 일치 캐시 조회 (이전 대화가 없는 세션의 질문만 - 후속 질문은 답이 대화 맥락에 의존)
+            cacheable = not await session_has_history(request.session_id)
+            cache_key = ResponseCache.make_key("chatbot", request.message)
+            cached_response = get_cached_response(cache_key) if cacheable else None
+            if cached_response:
+                request_span.set(cache="exact")
+                await record_cached_turn(request.session_id, request.message, cached_response["response"])
+                return ChatbotResponse(
+                    response=cached_response["response"],
+                    session_id=request.session_id
+                )
+
+            # 시맨틱 캐시 조회 (위치 무관 질문만, 이전 대화가 없는 세션만)
+            cached, query_vector = await lookup_semantic_cache(request.message) if cacheable else (None, None)
+            if cached:
+                request_span.set(cache="semantic")
+                await record_cached_turn(request.session_id, request.message, cached["message"])
+                return ChatbotResponse(
+                    response=cached["message"],
+                    session_id=request.session_id
+                )
+
+            request_id = uuid.uuid4().hex
+            llm_counter = LLMCallCounter()
+            config = {
+                "configurable": {"thread_id": request.session_id, "request_id": request_id, "deadline": deadline},
+                "callbacks": [llm_counter, TracingCallback()],
+            }
+
+            lane = priority_lane(request.message)
+            request_span.set(lane=lane)
+            try:
+                async with admit("llm", max_wait=remaining(deadline), lane=lane):
+                    result = await langgraph_app.ainvoke(
+                        {"messages": [HumanMessage(content=request.message)]}, 
+                        config=config
+                    )
+            except Overloaded as e:
+                request_span.set(overload=e.reason)
+                payload = degraded_answer(e, cache_key if cacheable else None, query_vector)
+                if payload is None:
+                    raise overloaded_error(e)
+                degraded_response = DEGRADED_NOTICE + (payload.get("response") or payload["message"])
+                await record_cached_turn(request.session_id, request.message, degraded_response)
+                return ChatbotResponse(
+                    response=degraded_response,
+                    session_id=request.session_id
+                )
+            finally:
+                finish_speculation(request_id)
+            logger.info(
+                "[챗봇] LLM 호출 횟수: %d회 (%s), %s",
+                llm_counter.count,
+                ", ".join(llm_counter.calls),
+                llm_counter.token_summary(),
+                extra={"llm_calls": llm_counter.count},
+            )
+
+            bot_response = result["messages"][-1].content
+            request_span.set(budget_exhausted=result.get("budget_exhausted"))
+            if cacheable:
+                await store_semantic_cache(request.message, query_vector, result, bot_response, None)
+            if (
+                cacheable
+                and result.get("intent") in LOCATION_INDEPENDENT_INTENTS
+                and not result.get("structured_data")
+                and not result.get("budget_exhausted")
+            ):
+                store_cached_response(cache_key, {"response": bot_response})
+
+            return ChatbotResponse(
+                response=bot_response, 
+                session_id=request.session_id
+            )
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.exception("[ERROR] 챗봇 오류: %s", e)
             raise HTTPException(
-                status_code=503,
-                detail="챗봇 시스템이 초기화되지 않았습니다."
+                status_code=500, 
+                detail=f"챗봇 처리 중 오류가 발생했습니다: {str(e)}"
             )
 
-        config = {"configurable": {"thread_id": request.session_id}}
 
-        result = langgraph_app.invoke(
-            {"messages": [HumanMessage(content=request.message)]}, 
-            config=config
-        )
+# -----------------------------------------------------------------------------
+# 스트리밍 챗봇 API (Server-Sent Events)
+# -----------------------------------------------------------------------------
+
+# 진행 상황을 알릴 그래프 노드
+GRAPH_NODES = {"intent_classifier", "query_rewrite", "agent", "direct_dispatch", "tools", "budget_exhausted"}
+
+# 사용자에게 토큰을 흘려보낼 노드 (의도분류/질문재정의의 JSON 출력은 제외)
+TOKEN_STREAM_NODES = {"agent", "tools"}
+
+
+def sse_event(event: str, data) -> str:
+    """SSE 메시지 포맷"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
 
-        bot_response = result["messages"][-1].content
 
-        return ChatbotResponse(
-            response=bot_response, 
-            session_id=request.session_id
+async def stream_langgraph_events(message: str, session_id: str):
+    """
+    LangGraph astream_events를 SSE로 변환
+    - node: 노드 시작 알림
+    - map: 도구 실행이 끝나는 즉시 지도 데이터 전송
+    - token: LLM 토큰
+    - done: 최종 응답 (message, intent, structured_data, tool_used)
+    """
+    with trace_request("chatbot_stream") as request_span:
+        request_start = time.perf_counter()
+        deadline = new_deadline()
+        first_token_time = None
+
+        # 정확 일치 캐시 적중 시 바로 종료 (이전 대화가 없는 세션의 질문만)
+        cacheable = not await session_has_history(session_id)
+        cache_key = ResponseCache.make_key("chatbot", message)
+        cached_response = get_cached_response(cache_key) if cacheable else None
+        if cached_response:
+            request_span.set(cache="exact")
+            await record_cached_turn(session_id, message, cached_response["response"])
+            yield sse_event("done", {"message": cached_response["response"], "session_id": session_id, "cached": True})
+            return
+
+        request_id = uuid.uuid4().hex
+        llm_counter = LLMCallCounter()
+        config = {
+            "configurable": {"thread_id": session_id, "request_id": request_id, "deadline": deadline},
+            "callbacks": [llm_counter, TracingCallback()],
+        }
+
+        tool_used = None
+        final_state = None
+        lane = priority_lane(message)
+        request_span.set(lane=lane)
+
+        try:
+            async with admit("llm", max_wait=remaining(deadline), lane=lane):
+                async for event in langgraph_app.astream_events(
+                    {"messages": [HumanMessage(content=message)]},
+                    config=config,
+                    version="v2",
+                ):
+                    kind = event["event"]
+                    name = event.get("name")
+                    node = event.get("metadata", {}).get("langgraph_node")
+
+                    if kind == "on_chain_start" and name in GRAPH_NODES and node == name:
+                        yield sse_event("node", {"node": name})
+
+                    elif kind == "on_tool_start":
+                        tool_used = name
+                        yield sse_event("tool", {"tool": name})
+
+                    elif kind == "on_chain_end" and name == "tools" and node == "tools":
+                        output = event["data"].get("output") or {}
+                        if isinstance(output, dict) and output.get("structured_data"):
+                            yield sse_event("map", output["structured_data"])
+
+                    elif kind == "on_chat_model_stream" and node in TOKEN_STREAM_NODES:
+                        chunk = event["data"]["chunk"]
+                        if isinstance(chunk.content, str) and chunk.content:
+                            if first_token_time is None:
+                                first_token_time = time.perf_counter() - request_start
+                                request_span.set(first_token=round(first_token_time, 3))
+                                logger.debug("⏱️ [첫 토큰까지] %.3f초", first_token_time)
+                            yield sse_event("token", {"content": chunk.content})
+
+                    elif kind == "on_chain_end" and not event.get("parent_ids"):
+                        # 최상위 그래프 종료 → 최종 State
+                        final_state = event["data"].get("output")
+
+        except Overloaded as e:
+            request_span.set(overload=e.reason)
+            payload = degraded_answer(e, cache_key if cacheable else None)
+            if payload is None:
+                yield sse_event("error", {
+                    "message": "지금 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                    "retry_after": e.retry_after,
+                })
+            else:
+                await record_cached_turn(session_id, message, DEGRADED_NOTICE + payload["response"])
+                yield sse_event("done", {
+                    "message": DEGRADED_NOTICE + payload["response"],
+                    "session_id": session_id,
+                    "cached": True,
+                    "degraded": True,
+                })
+            return
+        except Exception as e:
+            logger.exception("[ERROR] 스트리밍 챗봇 오류: %s", e)
+            yield sse_event("error", {"message": "처리 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요."})
+            return
+        finally:
+            # 클라이언트 연결 종료 포함, 사용되지 않은 선행 위치 검색 정리
+            finish_speculation(request_id)
+
+        if not isinstance(final_state, dict) or not final_state.get("messages"):
+            yield sse_event("error", {"message": "응답을 생성하지 못했습니다."})
+            return
+
+        bot_response = final_state["messages"][-1].content
+        logger.info(
+            "⏱️ [스트리밍 총 처리 시간] %.3f초 (LLM 호출 %d회, %s)",
+            time.perf_counter() - request_start,
+            llm_counter.count,
+            llm_counter.token_summary(),
+            extra={"llm_calls": llm_counter.count},
         )
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"[ERROR] 챗봇 오류: {e}")
+        request_span.set(budget_exhausted=final_state.get("budget_exhausted"))
+        if (
+            cacheable
+            and final_state.get("intent") in LOCATION_INDEPENDENT_INTENTS
+            and not final_state.get("structured_data")
+            and not final_state.get("budget_exhausted")
+        ):
+            store_cached_response(cache_key, {"response": bot_response})
+
+        yield sse_event("done", {
+            "message": bot_response,
+            "intent": final_state.get("intent"),
+            "structured_data": final_state.get("structured_data"),
+            "tool_used": tool_used,
+            "session_id": session_id,
+        })
+
+
+@app.post("/api/chatbot/stream")
+async def chatbot_stream_endpoint(request: ChatbotRequest):
+    """
+    LangGraph Agent 기반 스트리밍 챗봇 (SSE)
+    그래프 전체가 끝나기를 기다리지 않고 노드 진행/지도 데이터/LLM 토큰을 즉시 전송
+    """
+    if langgraph_app is None:
         raise HTTPException(
-            status_code=500, 
-            detail=f"챗봇 처리 중 오류가 발생했습니다: {str(e)}"
+            status_code=503,
+            detail="챗봇 시스템이 초기화되지 않았습니다."
         )
 
+    # LLM 대기열이 이미 가득 찼고(low 레인은 high가 밀려 있어도) 캐시된 답변도 없으면 스트림을 열지 않고 바로 503
+    try:
+        check_admission("llm", priority_lane(request.message))
+    except Overloaded as e:
+        cache_key = ResponseCache.make_key("chatbot", request.message)
+        if (
+            response_cache is None
+            or cache_key not in response_cache
+            or await session_has_history(request.session_id)
+        ):
+            record_overload(e, "rejected")
+            raise overloaded_error(e)
+
+    return StreamingResponse(
+        stream_langgraph_events(request.message, request.session_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 # -----------------------------------------------------------------------------
 # 길찾기 API (2026-01-07 수정: 기존 카카오 대신 T Map 보행자 경로 API 사용)
@@ -490,14 +1034,19 @@ async def get_directions(origin: str, destination: str):
             "resCoordType": "WGS84GEO"
         }
 
-        response = requests.post(url, headers=headers, json=payload)
+        async with admit("tmap"):
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.post(url, headers=headers, json=payload)
         if response.status_code != 200:
-            print(f"[DEBUG] T Map Response: {response.status_code} - {response.text}")
+            logger.warning("[T Map] 응답 오류: %s - %s", response.status_code, response.text)
         response.raise_for_status()
         return response.json()
-        
+
+    except Overloaded as e:
+        record_overload(e, "rejected")
+        raise overloaded_error(e)
     except Exception as e:
-        print(f"[ERROR] T Map 길찾기 API 호출 실패: {e}")
+        logger.exception("[ERROR] T Map 길찾기 API 호출 실패: %s", e)
         raise HTTPException(status_code=500, detail=f"길찾기 정보를 가져오는 중 오류가 발생했습니다: {str(e)}")
 
 # [2026-01-07 주석 처리] 기존 카카오 길찾기 API 로직
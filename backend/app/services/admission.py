@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+외부 API 동시 실행 제한 (admission control) 모듈
+- 외부 API(LLM, 임베딩, 카카오, T Map)별로 동시 실행 수 상한 + 대기열 길이 상한 + 최대 대기 시간
+- 우선순위 레인: high(위치/재난 대응)는 예약 자리와 우선 배정, low(일반 대화/지식)는 과부하 시 먼저 버림
+  (레인별 대기 시간은 admission.<API>.<레인> 히스토그램으로 /metrics에 노출)
+- 자리가 없으면 대기열에서 도착 순서대로 기다리고, 대기열이 가득 찼거나 최대 대기 시간을 넘기면
+  Overloaded를 던져 호출자가 바로 503(Retry-After) 또는 캐시된 답변으로 응답하도록 함
+- 재난 문자 직후처럼 요청이 몰려도 외부 API에는 감당 가능한 만큼만 보내
+  rate limit 오류 → 재시도 → 연쇄 타임아웃으로 처리량이 무너지지 않게 함
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from backend.app.services.tracing import observe
+
+logger = logging.getLogger(__name__)
+
+# Retry-After 상한 (초)
+ADMISSION_MAX_RETRY_AFTER = int(os.getenv("ADMISSION_MAX_RETRY_AFTER", "30"))
+
+
+# 우선순위 레인: 위치/재난 대응 질문(high)은 예약된 자리까지 쓰고, 일반 대화/지식 질문(low)은 먼저 버림
+LANE_HIGH = "high"
+LANE_LOW = "low"
+LANES = (LANE_HIGH, LANE_LOW)
+
+
+class Overloaded(Exception):
+    """외부 API 대기열이 가득 찼거나 최대 대기 시간을 넘김"""
+
+    def __init__(self, upstream: str, reason: str, retry_after: int, lane: str = LANE_HIGH):
+        super().__init__(f"{upstream}/{lane} overloaded ({reason})")
+        self.upstream = upstream
+        self.lane = lane
+        self.reason = reason  # queue_full / wait_timeout / shed
+        self.retry_after = retry_after
+
+
+class Lane:
+    """우선순위 레인 하나의 대기열과 통계"""
+
+    def __init__(self, name: str, queue_size: int, max_wait: float):
+        self.name = name
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected_queue_full = 0
+        self.rejected_wait_timeout = 0
+        self.shed = 0  # high 레인이 밀려 있어 대기열에 넣지 않고 버린 수
+        self.max_wait_seen = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "queue_size": self.queue_size,
+            "max_wait": self.max_wait,
+            "in_flight": self.in_flight,
+            "waiting": len(self.waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_wait_timeout": self.rejected_wait_timeout,
+            "shed": self.shed,
+            "max_wait_seen": round(self.max_wait_seen, 3),
+        }
+
+
+class Upstream:
+    """
+    외부 API 하나의 동시 실행 제한기 (이벤트 루프 안에서만 사용)
+
+    - concurrency: 동시에 실행할 수 있는 호출 수
+    - reserved_high: high 레인만 쓸 수 있는 자리 수 (low 레인은 concurrency - reserved_high까지)
+    - queue_size / low_queue_size: 레인별로 자리를 기다릴 수 있는 호출 수 (넘으면 즉시 거절)
+    - max_wait / low_max_wait: 레인별 대기열 최대 대기 시간 (초)
+    - 자리가 나면 high 대기자부터 넘겨주고, high 대기자가 있는 동안 새 low 요청은 바로 버림
+    """
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: int,
+        queue_size: int,
+        max_wait: float,
+        reserved_high: int = 0,
+        low_queue_size: Optional[int] = None,
+        low_max_wait: Optional[float] = None,
+    ):
+        self.name = name
+        self.concurrency = concurrency
+        self.reserved_high = min(reserved_high, concurrency - 1)
+        self.lanes: Dict[str, Lane] = {
+            LANE_HIGH: Lane(LANE_HIGH, queue_size, max_wait),
+            LANE_LOW: Lane(
+                LANE_LOW,
+                queue_size if low_queue_size is None else low_queue_size,
+                max_wait if low_max_wait is None else low_max_wait,
+            ),
+        }
+        # 호출 1건의 점유 시간 지수이동평균 (Retry-After 추정용)
+        self._hold_ewma = 1.0
+
+    @property
+    def in_flight(self) -> int:
+        return sum(lane.in_flight for lane in self.lanes.values())
+
+    def _lane_limit(self, lane: str) -> int:
+        return self.concurrency if lane == LANE_HIGH else self.concurrency - self.reserved_high
+
+    def retry_after(self, lane: str = LANE_HIGH) -> int:
+        """해당 레인 대기열이 빠지는 데 걸릴 예상 시간 (초, 1 ~ ADMISSION_MAX_RETRY_AFTER)"""
+        ahead = len(self.lanes[LANE_HIGH].waiters)
+        if lane == LANE_LOW:
+            ahead += len(self.lanes[LANE_LOW].waiters)
+        estimate = self._hold_ewma * (ahead + 1) / self._lane_limit(lane)
+        return max(1, min(ADMISSION_MAX_RETRY_AFTER, math.ceil(estimate)))
+
+    def has_free_slot(self, lane: str = LANE_HIGH) -> bool:
+        """기다리지 않고 바로 실행할 수 있는지 (앞선 대기자가 없고 레인 한도 안)"""
+        if self.in_flight >= self.concurrency or self.lanes[lane].waiters:
+            return False
+        if lane == LANE_LOW:
+            return not self.lanes[LANE_HIGH].waiters and self.lanes[LANE_LOW].in_flight < self._lane_limit(LANE_LOW)
+        return True
+
+    def _reject_reason(self, lane: str) -> Optional[str]:
+        """대기열에 넣을 수 없는 이유 (넣을 수 있으면 None)"""
+        if lane == LANE_LOW and self.lanes[LANE_HIGH].waiters:
+            return "shed"
+        if len(self.lanes[lane].waiters) >= self.lanes[lane].queue_size:
+            return "queue_full"
+        return None
+
+    def _reject(self, lane: str, reason: str) -> Overloaded:
+        state = self.lanes[lane]
+        if reason == "shed":
+            state.shed += 1
+        elif reason == "queue_full":
+            state.rejected_queue_full += 1
+        else:
+            state.rejected_wait_timeout += 1
+        return Overloaded(self.name, reason, self.retry_after(lane), lane)
+
+    def check(self, lane: str = LANE_HIGH):
+        """바로 실행할 수도, 대기열에 넣을 수도 없으면 Overloaded (자리를 잡지는 않음, 스트리밍 응답 시작 전 확인용)"""
+        if self.has_free_slot(lane):
+            return
+        reason = self._reject_reason(lane)
+        if reason is not None:
+            raise self._reject(lane, reason)
+
+    async def acquire(self, max_wait: Optional[float] = None, lane: str = LANE_HIGH):
+        """자리 확보 (빈자리가 없으면 레인 대기열에서 도착 순서대로 대기)"""
+        state = self.lanes[lane]
+        if self.has_free_slot(lane):
+            state.in_flight += 1
+            state.admitted += 1
+            observe(f"admission.{self.name}.{lane}", 0.0)
+            return
+
+        reason = self._reject_reason(lane)
+        if reason is not None:
+            raise self._reject(lane, reason)
+
+        wait = state.max_wait if max_wait is None else max(0.0, min(state.max_wait, max_wait))
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        state.queued += 1
+        wait_start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, timeout=wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # 포기하는 순간 자리를 넘겨받았으면 다음 대기자에게 넘김
+                state.in_flight -= 1
+                self._dispatch()
+            else:
+                waiter.cancel()
+                try:
+                    state.waiters.remove(waiter)
+                except ValueError:
+                    pass
+            waited = time.perf_counter() - wait_start
+            observe(f"admission.{self.name}.{lane}", waited, error=True)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self._reject(lane, "wait_timeout") from None
+
+        # _dispatch()가 이 레인의 in_flight를 올린 뒤 넘겨줌
+        waited = time.perf_counter() - wait_start
+        state.admitted += 1
+        state.max_wait_seen = max(state.max_wait_seen, waited)
+        observe(f"admission.{self.name}.{lane}", waited)
+
+    def release(self, held_seconds: float, lane: str = LANE_HIGH):
+        self._hold_ewma = 0.8 * self._hold_ewma + 0.2 * held_seconds
+        self.lanes[lane].in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """빈자리를 high 대기자부터, low 대기자는 low 한도 안에서 넘겨줌"""
+        for state in self.lanes.values():
+            while state.waiters and state.waiters[0].done():
+                state.waiters.popleft()
+
+        while self.in_flight < self.concurrency:
+            high, low = self.lanes[LANE_HIGH], self.lanes[LANE_LOW]
+            if high.waiters:
+                state = high
+            elif low.waiters and low.in_flight < self._lane_limit(LANE_LOW):
+                state = low
+            else:
+                return
+            waiter = state.waiters.popleft()
+            if waiter.done():
+                continue
+            state.in_flight += 1
+            waiter.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "reserved_high": self.reserved_high,
+            "in_flight": self.in_flight,
+            "hold_ewma": round(self._hold_ewma, 3),
+            "lanes": {
+                name: {**state.stats(), "limit": self._lane_limit(name), "retry_after": self.retry_after(name)}
+                for name, state in self.lanes.items()
+            },
+        }
+
+
+def _upstream_from_env(
+    name: str,
+    concurrency: int,
+    queue_size: int,
+    max_wait: float,
+    reserved_high: int = 0,
+    low_queue_size: Optional[int] = None,
+    low_max_wait: Optional[float] = None,
+) -> Upstream:
+    prefix = f"ADMISSION_{name.upper()}"
+    low_queue_size = os.getenv(f"{prefix}_LOW_QUEUE_SIZE", "" if low_queue_size is None else str(low_queue_size))
+    low_max_wait = os.getenv(f"{prefix}_LOW_MAX_WAIT", "" if low_max_wait is None else str(low_max_wait))
+    return Upstream(
+        name,
+        concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", str(concurrency))),
+        queue_size=int(os.getenv(f"{prefix}_QUEUE_SIZE", str(queue_size))),
+        max_wait=float(os.getenv(f"{prefix}_MAX_WAIT", str(max_wait))),
+        reserved_high=int(os.getenv(f"{prefix}_RESERVED_HIGH", str(reserved_high))),
+        low_queue_size=int(low_queue_size) if low_queue_size else None,
+        low_max_wait=float(low_max_wait) if low_max_wait else None,
+    )
+
+
+# llm: LLM을 호출하는 그래프 실행 1건 단위 (요청당 LLM 호출 수는 budget 모듈의 한도로 제한됨)
+# - 32자리 중 8자리는 위치/재난 대응 질문 전용, 일반 대화/지식 질문은 대기열도 짧게
+UPSTREAMS: Dict[str, Upstream] = {
+    "llm": _upstream_from_env(
+        "llm", concurrency=32, queue_size=64, max_wait=5.0, reserved_high=8, low_queue_size=16, low_max_wait=2.0
+    ),
+    # embeddings: 캐시/FAQ 조회용 임베딩 호출 (자리가 없으면 오래 기다리지 않고 캐시 미스로 처리)
+    "embeddings": _upstream_from_env("embeddings", concurrency=32, queue_size=64, max_wait=1.0),
+    "kakao": _upstream_from_env("kakao", concurrency=16, queue_size=64, max_wait=2.0),
+    "tmap": _upstream_from_env("tmap", concurrency=8, queue_size=32, max_wait=3.0),
+}
+
+# 과부하로 정상 처리하지 못한 요청의 결과 (레인별)
+_degraded_stats = {lane: {"stale_exact": 0, "semantic": 0, "rejected": 0} for lane in LANES}
+
+
+@asynccontextmanager
+async def admit(upstream: str, max_wait: Optional[float] = None, lane: str = LANE_HIGH):
+    """
+    외부 API 자리 확보 후 실행 (끝나면 반납)
+
+    예: async with admit("llm", max_wait=remaining(deadline), lane=priority_lane(query)): ...
+    """
+    limiter = UPSTREAMS[upstream]
+    await limiter.acquire(max_wait, lane)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        limiter.release(time.perf_counter() - start, lane)
+
+
+def has_free_slot(upstream: str, lane: str = LANE_HIGH) -> bool:
+    """기다리지 않고 바로 실행할 수 있는지 (선행 실행 같은 부가 작업 판단용)"""
+    return UPSTREAMS[upstream].has_free_slot(lane)
+
+
+def check_admission(upstream: str, lane: str = LANE_HIGH):
+    """바로 실행할 수도 대기열에 넣을 수도 없으면 Overloaded"""
+    UPSTREAMS[upstream].check(lane)
+
+
+def record_overload(e: Overloaded, outcome: str):
+    """과부하 처리 결과 집계 (stale_exact / semantic / rejected)"""
+    _degraded_stats[e.lane][outcome] += 1
+    logger.warning(
+        "🚦 [과부하] %s/%s %s → %s (Retry-After %d초)",
+        e.upstream,
+        e.lane,
+        e.reason,
+        outcome,
+        e.retry_after,
+        extra={"upstream": e.upstream, "lane": e.lane, "overload": e.reason, "outcome": outcome},
+    )
+
+
+def admission_stats() -> dict:
+    return {
+        "upstreams": {name: limiter.stats() for name, limiter in UPSTREAMS.items()},
+        "overload_outcomes": {lane: dict(outcomes) for lane, outcomes in _degraded_stats.items()},
+    }
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+요청 시간 예산 / 에이전트 루프 한도 모듈
+- 요청마다 마감 시각(time.monotonic 기준)을 정해 그래프 State로 전달하고,
+  LLM 호출/도구 실행/외부 HTTP 호출은 남은 시간만큼만 기다림
+- 에이전트 반복 횟수, 도구 호출 횟수 상한
+- 예산을 다 쓰면 지금까지 얻은 가장 나은 답변(도구 결과 등)으로 종료
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Awaitable, List, Optional, TypeVar
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+# 요청 1건의 전체 시간 예산 (초)
+AGENT_TIME_BUDGET_SECONDS = float(os.getenv("AGENT_TIME_BUDGET_SECONDS", "20"))
+# 요청 1건에서 에이전트 LLM 노드를 실행할 최대 횟수
+AGENT_MAX_ITERATIONS = int(os.getenv("AGENT_MAX_ITERATIONS", "3"))
+# 요청 1건에서 실행할 최대 도구 호출 수
+AGENT_MAX_TOOL_CALLS = int(os.getenv("AGENT_MAX_TOOL_CALLS", "4"))
+
+# 답변으로 쓸 만한 도구 결과 최소 길이 (should_continue_after_tools의 "충분한 답변" 기준과 동일)
+MIN_ANSWER_CHARS = 50
+
+BUDGET_EXHAUSTED_MESSAGE = "⏱️ 답변을 준비하는 데 시간이 너무 오래 걸리고 있습니다. 잠시 후 다시 질문해주세요."
+TOOL_SKIPPED_MESSAGE = "⏱️ 처리 시간 한도를 넘어 실행하지 않았습니다."
+
+T = TypeVar("T")
+
+_stats_lock = threading.Lock()
+_stats = {
+    "deadline": 0,  # 마감 시각 초과로 중단
+    "max_iterations": 0,  # 에이전트 반복 한도 도달
+    "max_tool_calls": 0,  # 도구 호출 한도 도달
+    "best_answer_from_tool": 0,  # 중단 시 도구 결과를 답변으로 사용
+    "fallback_message": 0,  # 쓸 만한 결과가 없어 안내 문구로 응답
+}
+
+
+def new_deadline(budget_seconds: Optional[float] = None) -> float:
+    """지금부터 예산만큼 뒤의 마감 시각"""
+    return time.monotonic() + (AGENT_TIME_BUDGET_SECONDS if budget_seconds is None else budget_seconds)
+
+
+def remaining(deadline: Optional[float]) -> Optional[float]:
+    """마감까지 남은 시간 (초, 마감이 없으면 None)"""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def expired(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def http_timeout(deadline: Optional[float], default: float) -> float:
+    """외부 HTTP 호출 타임아웃 (기본값과 남은 시간 중 작은 값, 최소 0.1초)"""
+    left = remaining(deadline)
+    return default if left is None else max(0.1, min(default, left))
+
+
+async def run_with_deadline(awaitable: Awaitable[T], deadline: Optional[float]) -> T:
+    """마감 시각까지만 기다림 (초과하면 작업을 취소하고 TimeoutError)"""
+    left = remaining(deadline)
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        # 시작하지 않은 코루틴이 경고를 남기지 않도록 닫고 바로 실패
+        close = getattr(awaitable, "close", None)
+        if close is not None:
+            close()
+        raise TimeoutError("request deadline exceeded")
+    return await asyncio.wait_for(awaitable, timeout=left)
+
+
+def record_exhausted(reason: str):
+    """예산 소진 사유 집계 (deadline / max_iterations / max_tool_calls)"""
+    with _stats_lock:
+        _stats[reason] += 1
+
+
+def best_answer_so_far(messages: List[BaseMessage]) -> str:
+    """
+    이번 질문(마지막 HumanMessage) 이후 메시지 중 가장 나은 답변
+    - 최근 도구 결과(충분한 길이) → 도구 호출이 없는 AI 답변 → 안내 문구 순
+    """
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        content = message.content if isinstance(message.content, str) else ""
+        if isinstance(message, ToolMessage) and len(content) > MIN_ANSWER_CHARS:
+            with _stats_lock:
+                _stats["best_answer_from_tool"] += 1
+            return content
+        if isinstance(message, AIMessage) and content.strip() and not message.tool_calls:
+            return content
+
+    with _stats_lock:
+        _stats["fallback_message"] += 1
+    return BUDGET_EXHAUSTED_MESSAGE
+
+
+def skipped_tool_messages(message: BaseMessage) -> List[ToolMessage]:
+    """실행하지 않은 도구 호출에 대한 응답 (대화 기록에 짝 없는 tool_call이 남지 않도록)"""
+    return [
+        ToolMessage(content=TOOL_SKIPPED_MESSAGE, tool_call_id=tool_call["id"], name=tool_call["name"])
+        for tool_call in getattr(message, "tool_calls", None) or []
+    ]
+
+
+def budget_stats() -> dict:
+    with _stats_lock:
+        exhausted = dict(_stats)
+    return {
+        "exhausted": exhausted,
+        "limits": {
+            "time_budget_seconds": AGENT_TIME_BUDGET_SECONDS,
+            "max_iterations": AGENT_MAX_ITERATIONS,
+            "max_tool_calls": AGENT_MAX_TOOL_CALLS,
+        },
+    }
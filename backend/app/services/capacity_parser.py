@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+수용인원 질의 파서 / 인덱스 모듈
+- 미리 컴파일한 토크나이저 정규식 하나로 질문을 한 번만 훑어
+  숫자(1000, 1,000, 천, 1천, 1만5천, 천오백), 비교 표현(이상/이하/초과/미만/사이),
+  불필요한 요청 표현, 위치 단어를 동시에 분류
+- 결과는 CapacityQuery(하한/상한 + 위치)로 반환하고,
+  수용인원 오름차순으로 정렬해 둔 CapacityIndex에서 bisect로 범위 조회
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+_KOREAN_DIGITS = {"일": 1, "이": 2, "삼": 3, "사": 4, "오": 5, "육": 6, "칠": 7, "팔": 8, "구": 9}
+_SMALL_UNITS = {"십": 10, "백": 100, "천": 1000}
+_BIG_UNITS = {"만": 10000, "억": 100000000}
+
+_DIGITS = r"\d[\d,]*(?:\.\d+)?"
+_UNIT_CHARS = "십백천만억"
+_KOREAN_DIGIT_CHARS = "일이삼사오육칠팔구"
+_NUMBER_PART = rf"(?:(?:{_DIGITS}|[{_KOREAN_DIGIT_CHARS}])?[{_UNIT_CHARS}])"  # "1천", "오백", "만"
+
+# 비교 표현 → (연산자 종류, 포함 여부)
+_OPERATORS = {
+    "이상": ("min", True),
+    "부터": ("min", True),
+    "초과": ("min", False),
+    "넘는": ("min", False),
+    "넘게": ("min", False),
+    "넘어": ("min", False),
+    "이하": ("max", True),
+    "까지": ("max", True),
+    "이내": ("max", True),
+    "미만": ("max", False),
+}
+_COMPARATIVES = {"많": ("min", False), "크": ("min", False), "적": ("max", False), "작": ("max", False)}
+_PREFIX_OPERATORS = {"최소": ("min", True), "적어도": ("min", True), "최대": ("max", True)}
+
+# 수용인원 조건과 무관한 요청 표현 (위치 단어에서 제외)
+_FILLERS = [
+    r"수용\s*인원\s*(?:이|가)?",
+    r"수용\s*할?\s*수\s*있는",
+    r"수용\s*가능한?",
+    r"최대\s*수용",
+    r"인원\s*(?:이|가|을|를)?",
+    r"대피소\s*(?:를|을|이|가)?",
+    r"찾아\s*줘?",
+    r"알려\s*줘?",
+    r"있어\??",
+    r"있니\??",
+    r"있나요\??",
+    r"규모(?:의|가)?",
+    r"되는",
+    r"곳",
+]
+
+# 숫자/비교 표현/요청 표현/조사의 첫 글자 (이 글자들에서만 토큰 대안을 시도)
+_TOKEN_START_CHARS = "".join(
+    sorted(
+        set("0123456789~〜-–사보에의" + _UNIT_CHARS + _KOREAN_DIGIT_CHARS)
+        | {word[0] for word in [*_OPERATORS, *_PREFIX_OPERATORS]}
+        | set("수최인대찾알있규되곳")
+    )
+)
+
+# 토큰 정규식 (앞에서부터 먼저 맞는 대안을 채택)
+_TOKEN_PATTERN = re.compile(
+    "|".join(
+        [
+            # 숫자: 앞이 한글/숫자가 아니어야 함 ("인천", "청계천" 제외)
+            # 한글로만 된 숫자는 뒤에 단위/비교 표현이 올 때만 인정 ("천호동", "이천시" 제외)
+            rf"(?P<num>(?<![가-힣\d.,])(?:"
+            rf"{_DIGITS}(?:[{_UNIT_CHARS}]{_NUMBER_PART}*(?:{_DIGITS})?)?"
+            rf"|{_NUMBER_PART}+(?:{_DIGITS})?(?=\s*(?:명|인|{'|'.join(_OPERATORS)}|보다|사이|에서|~|-|$))))",
+            # 단위: 숫자 바로 뒤의 명/인 (+ "명인 곳", "명의 대피소"의 어미)
+            rf"(?P<unit>(?<=[\d{_UNIT_CHARS}])\s*(?:명|인)(?:(?:인|의)(?![가-힣]))?)",
+            r"(?P<range>~|〜|-|–)",
+            r"(?P<between>사이(?:의|에|인)?)",
+            r"(?P<comparative>보다\s*(?P<comp>많|크|적|작)\S*)",
+            rf"(?P<op>(?<=[\s\d{_UNIT_CHARS}명인])(?:{'|'.join(_OPERATORS)})(?:인|의|로|으로)?)",
+            rf"(?P<filler>{'|'.join(_FILLERS)})",
+            rf"(?P<prefix>(?:{'|'.join(_PREFIX_OPERATORS)})(?=\s*[\d{_UNIT_CHARS}{_KOREAN_DIGIT_CHARS}]))",
+            # 단어 끝 조사 (에서는 숫자 사이면 범위 구분자로 사용)
+            r"(?P<particle>(?<=[가-힣\d])(?:에서의|에서|에|의)(?=\s|$|[?!.,]|\d))",
+            r"(?P<space>[\s?!.,]+)",
+            # 다른 토큰의 첫 글자가 될 수 없는 글자는 한 번에 묶음 (위치 단어)
+            rf"(?P<char>[^\s?!.,{re.escape(_TOKEN_START_CHARS)}]+|.)",
+        ]
+    )
+)
+
+
+class CapacityQuery(NamedTuple):
+    """수용인원 조건 (하한/상한은 None이면 제한 없음)"""
+
+    minimum: Optional[int] = None
+    maximum: Optional[int] = None
+    min_inclusive: bool = True
+    max_inclusive: bool = True
+    location: str = ""
+
+    @property
+    def is_empty(self) -> bool:
+        return self.minimum is None and self.maximum is None
+
+    def matches(self, capacity: int) -> bool:
+        if self.minimum is not None:
+            if capacity < self.minimum or (capacity == self.minimum and not self.min_inclusive):
+                return False
+        if self.maximum is not None:
+            if capacity > self.maximum or (capacity == self.maximum and not self.max_inclusive):
+                return False
+        return True
+
+    def describe(self) -> str:
+        """응답용 조건 문구 (예: "1,000명 이상", "500~1,000명")"""
+        if self.minimum is not None and self.maximum is not None:
+            return f"{self.minimum:,}~{self.maximum:,}명"
+        if self.minimum is not None:
+            return f"{self.minimum:,}명 {'이상' if self.min_inclusive else '초과'}"
+        if self.maximum is not None:
+            return f"{self.maximum:,}명 {'이하' if self.max_inclusive else '미만'}"
+        return ""
+
+
+def parse_korean_number(text: str) -> Optional[int]:
+    """숫자 표현을 정수로 변환 (예: "1,000" → 1000, "1천" → 1000, "1만5천" → 15000, "천오백" → 1500)"""
+    plain = text.replace(",", "")
+    if plain.isdigit():
+        value = int(plain)
+        return value if value > 0 else None
+
+    total = 0  # 만/억 단위로 확정된 값
+    section = 0  # 만 미만 누적값
+    current: Optional[float] = None  # 단위를 기다리는 숫자
+    index = 0
+    length = len(text)
+
+    while index < length:
+        char = text[index]
+        if char.isdigit():
+            end = index
+            while end < length and (text[end].isdigit() or text[end] in ",."):
+                end += 1
+            try:
+                current = float(text[index:end].replace(",", ""))
+            except ValueError:
+                return None
+            index = end
+            continue
+
+        if char in _KOREAN_DIGITS:
+            current = _KOREAN_DIGITS[char]
+        elif char in _SMALL_UNITS:
+            section += (1 if current is None else current) * _SMALL_UNITS[char]
+            current = None
+        elif char in _BIG_UNITS:
+            section += 0 if current is None else current
+            total += (section or 1) * _BIG_UNITS[char]
+            section = 0
+            current = None
+        else:
+            return None
+        index += 1
+
+    value = total + section + (current or 0)
+    return int(value) if value > 0 else None
+
+
+def tokenize(text: str) -> List[Tuple[str, str, Optional[str]]]:
+    """질문을 (종류, 원문, 비교 표현 어간) 토큰 목록으로 분해"""
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == "comparative":
+            tokens.append((kind, match.group(kind), match.group("comp")))
+        else:
+            tokens.append((kind, match.group(kind), None))
+    return tokens
+
+
+def _skip(tokens: List[Tuple[str, str, Optional[str]]], index: int, kinds: Tuple[str, ...]) -> int:
+    while index < len(tokens) and tokens[index][0] in kinds:
+        index += 1
+    return index
+
+
+def parse_capacity_query(text: str) -> CapacityQuery:
+    """
+    수용인원 질문을 한 번의 토큰 순회로 CapacityQuery로 변환
+    - "천 명 이상", "300명 이하", "500명 초과", "100명 미만"
+    - "500~1000명", "500명에서 1000명 사이", "500명 이상 1000명 이하"
+    - 비교 표현이 없으면 "이상"으로 간주 (기존 동작 유지)
+    """
+    tokens = tokenize(text)
+    minimum = maximum = None
+    min_inclusive = max_inclusive = True
+    words: List[str] = []
+    word = ""
+    prefix = None
+
+    index = 0
+    count = len(tokens)
+    while index < count:
+        kind, raw, comp = tokens[index]
+        index += 1
+
+        if kind == "char":
+            word += raw
+            continue
+        if word:
+            words.append(word)
+            word = ""
+
+        if kind == "prefix":
+            prefix = _PREFIX_OPERATORS[raw]
+            continue
+        if kind != "num":
+            # 숫자와 묶이지 않은 조사/비교 표현/요청 표현은 버림
+            continue
+
+        value = parse_korean_number(raw)
+        if value is None:
+            words.append(raw)
+            continue
+
+        index = _skip(tokens, index, ("unit", "space"))
+
+        # 범위: NUM (~|-|에서) NUM [사이] [비교 표현]
+        if index < count and (tokens[index][0] == "range" or tokens[index][1] == "에서"):
+            upper_index = _skip(tokens, index + 1, ("space",))
+            upper = parse_korean_number(tokens[upper_index][1]) if upper_index < count and tokens[upper_index][0] == "num" else None
+            if upper is not None:
+                minimum, maximum = sorted((value, upper))
+                min_inclusive = max_inclusive = True
+                index = _skip(tokens, upper_index + 1, ("unit", "space", "between"))
+                # "500~1000명 미만"처럼 상한에만 붙은 비교 표현
+                if index < count and tokens[index][0] == "op":
+                    op_kind, op_inclusive = _OPERATORS[tokens[index][1][:2]]
+                    if op_kind == "max":
+                        max_inclusive = op_inclusive
+                    index += 1
+                prefix = None
+                continue
+
+        # 단일 값: NUM [비교 표현]
+        operator = None
+        if index < count:
+            next_kind = tokens[index][0]
+            if next_kind == "op":
+                operator = _OPERATORS[tokens[index][1][:2]]
+                index += 1
+            elif next_kind == "comparative":
+                operator = _COMPARATIVES[tokens[index][2]]
+                index += 1
+        op_kind, op_inclusive = operator or prefix or ("min", True)
+        prefix = None
+        if op_kind == "min":
+            minimum, min_inclusive = value, op_inclusive
+        else:
+            maximum, max_inclusive = value, op_inclusive
+
+    if word:
+        words.append(word)
+
+    return CapacityQuery(minimum, maximum, min_inclusive, max_inclusive, " ".join(words))
+
+
+class CapacityIndex:
+    """수용인원 오름차순으로 정렬한 대피소 메타데이터 (범위 조회는 bisect)"""
+
+    def __init__(self, metadatas: Iterable[dict]):
+        entries = sorted(
+            ((int(metadata.get("capacity", 0) or 0), metadata) for metadata in metadatas),
+            key=lambda entry: entry[0],
+        )
+        self._capacities = [capacity for capacity, _ in entries]
+        self._metadatas = [metadata for _, metadata in entries]
+
+    def __len__(self) -> int:
+        return len(self._capacities)
+
+    def range(self, query: CapacityQuery) -> List[Tuple[int, dict]]:
+        """조건을 만족하는 (수용인원, 메타데이터) 목록 (수용인원 내림차순)"""
+        low = 0
+        high = len(self._capacities)
+        if query.minimum is not None:
+            bisect_fn = bisect_left if query.min_inclusive else bisect_right
+            low = bisect_fn(self._capacities, query.minimum)
+        if query.maximum is not None:
+            bisect_fn = bisect_right if query.max_inclusive else bisect_left
+            high = bisect_fn(self._capacities, query.maximum)
+        return [(self._capacities[i], self._metadatas[i]) for i in range(high - 1, low - 1, -1)]
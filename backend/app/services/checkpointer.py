@@ -0,0 +1,837 @@
+# -*- coding: utf-8 -*-
+"""
+대화 체크포인트 저장소 모듈
+MemorySaver 대신 사용하는 체크포인터
+- BoundedMemorySaver: 메모리 상한이 있는 단일 워커용 저장소
+- SQLiteCheckpointSaver: 여러 워커/호스트가 공유하는 SQLite(WAL) 저장소
+
+공통:
+- 스레드(세션)마다 최신 체크포인트 1개만 보관 (과거 체크포인트 이력은 버림)
+- 스레드당 메시지 개수 상한 (사용자 질문 경계에서 잘라 도구 호출/결과 쌍이 깨지지 않도록)
+- 일정 시간 사용되지 않은 스레드 만료
+"""
+
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_metadata,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def trim_messages_at_turn_boundary(messages: list, max_messages: int) -> list:
+    """
+    최근 max_messages개만 남기되, 사용자 질문(HumanMessage)에서 시작하도록 자름
+    (앞부분이 ToolMessage 등으로 시작하면 LLM 호출이 실패하므로)
+    """
+    if max_messages <= 0 or len(messages) <= max_messages:
+        return messages
+
+    start = len(messages) - max_messages
+    for index in range(start, len(messages)):
+        if isinstance(messages[index], HumanMessage):
+            return messages[index:]
+
+    # 한 턴이 상한보다 길면 마지막 질문부터 유지
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            return messages[index:]
+    return messages[start:]
+
+
+def next_channel_version(current) -> str:
+    """MemorySaver와 같은 형식의 채널 버전 ("단조 증가 정수.난수")"""
+    if current is None:
+        current_v = 0
+    elif isinstance(current, int):
+        current_v = current
+    else:
+        current_v = int(current.split(".")[0])
+    return f"{current_v + 1:032}.{random.random():016}"
+
+
+class BoundedMemorySaver(BaseCheckpointSaver):
+    """
+    메모리 상한이 있는 인메모리 체크포인터
+
+    - thread_id → {checkpoint_ns → 최신 체크포인트(직렬화된 bytes) + 대기 중인 쓰기}
+    - 직렬화된 크기로 보관 중인 바이트 수를 계산해 메모리 예산 적용
+    """
+
+    def __init__(
+        self,
+        max_messages: int = 20,
+        idle_ttl_seconds: float = 1800,
+        max_bytes: int = 64 * 1024 * 1024,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.max_messages = max_messages
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_bytes = max_bytes
+
+        # thread_id -> {"namespaces": {ns: record}, "last_access": float, "bytes": int}
+        self._threads: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._total_bytes = 0
+
+        self.trimmed_messages = 0
+        self.lru_evictions = 0
+        self.ttl_evictions = 0
+
+    # ------------------------------------------------------------------
+    # 내부 도우미
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _record_size(record: dict) -> int:
+        size = len(record["checkpoint"][1]) + len(record["metadata"][1])
+        for _, _, (_, value_bytes), _ in record["writes"].values():
+            size += len(value_bytes)
+        return size
+
+    def _refresh_size(self, thread_id: str):
+        entry = self._threads[thread_id]
+        new_size = sum(self._record_size(record) for record in entry["namespaces"].values())
+        self._total_bytes += new_size - entry["bytes"]
+        entry["bytes"] = new_size
+
+    def _touch(self, thread_id: str) -> dict:
+        entry = self._threads.get(thread_id)
+        if entry is None:
+            entry = {"namespaces": {}, "last_access": time.monotonic(), "bytes": 0}
+            self._threads[thread_id] = entry
+        entry["last_access"] = time.monotonic()
+        self._threads.move_to_end(thread_id)
+        return entry
+
+    def _drop(self, thread_id: str):
+        entry = self._threads.pop(thread_id, None)
+        if entry is not None:
+            self._total_bytes -= entry["bytes"]
+
+    def _evict(self, keep_thread_id: Optional[str] = None):
+        """만료된 스레드 제거 → 메모리 예산 초과분은 오래 사용 안 된 순으로 제거"""
+        now = time.monotonic()
+        expired = [
+            thread_id
+            for thread_id, entry in self._threads.items()
+            if now - entry["last_access"] > self.idle_ttl_seconds and thread_id != keep_thread_id
+        ]
+        for thread_id in expired:
+            self._drop(thread_id)
+            self.ttl_evictions += 1
+
+        while self._total_bytes > self.max_bytes and len(self._threads) > 1:
+            thread_id = next(iter(self._threads))
+            if thread_id == keep_thread_id:
+                break
+            self._drop(thread_id)
+            self.lru_evictions += 1
+
+    def _trim_checkpoint(self, checkpoint: Checkpoint) -> Checkpoint:
+        messages = checkpoint.get("channel_values", {}).get("messages")
+        if not isinstance(messages, list) or len(messages) <= self.max_messages:
+            return checkpoint
+
+        trimmed = trim_messages_at_turn_boundary(messages, self.max_messages)
+        self.trimmed_messages += len(messages) - len(trimmed)
+        return {
+            **checkpoint,
+            "channel_values": {**checkpoint["channel_values"], "messages": trimmed},
+        }
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, record: dict) -> CheckpointTuple:
+        parent_id = record["parent_id"]
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": record["checkpoint_id"],
+                }
+            },
+            checkpoint=self.serde.loads_typed(record["checkpoint"]),
+            metadata=self.serde.loads_typed(record["metadata"]),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed(value))
+                for task_id, channel, value, _ in record["writes"].values()
+            ],
+        )
+
+    # ------------------------------------------------------------------
+    # BaseCheckpointSaver 구현
+    # ------------------------------------------------------------------
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        configurable = config["configurable"]
+        thread_id = str(configurable["thread_id"])
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = configurable.get("checkpoint_id")
+
+        with self._lock:
+            entry = self._threads.get(thread_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry["last_access"] > self.idle_ttl_seconds:
+                self._drop(thread_id)
+                self.ttl_evictions += 1
+                return None
+
+            record = entry["namespaces"].get(checkpoint_ns)
+            # 최신 체크포인트만 보관하므로 과거 checkpoint_id 요청은 없음으로 처리
+            if record is None or (checkpoint_id and checkpoint_id != record["checkpoint_id"]):
+                return None
+
+            self._touch(thread_id)
+            return self._to_tuple(thread_id, checkpoint_ns, record)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            if config is not None:
+                thread_ids = [str(config["configurable"]["thread_id"])]
+                namespace = config["configurable"].get("checkpoint_ns")
+            else:
+                thread_ids = list(self._threads.keys())
+                namespace = None
+            before_id = before["configurable"].get("checkpoint_id") if before else None
+
+            results = []
+            for thread_id in thread_ids:
+                entry = self._threads.get(thread_id)
+                if entry is None:
+                    continue
+                for checkpoint_ns, record in entry["namespaces"].items():
+                    if namespace is not None and checkpoint_ns != namespace:
+                        continue
+                    if before_id and record["checkpoint_id"] >= before_id:
+                        continue
+                    checkpoint_tuple = self._to_tuple(thread_id, checkpoint_ns, record)
+                    if filter and not all(
+                        checkpoint_tuple.metadata.get(key) == value for key, value in filter.items()
+                    ):
+                        continue
+                    results.append(checkpoint_tuple)
+
+        if limit is not None:
+            results = results[:limit]
+        yield from results
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        configurable = config["configurable"]
+        thread_id = str(configurable["thread_id"])
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+
+        checkpoint = self._trim_checkpoint(checkpoint)
+        record = {
+            "checkpoint_id": checkpoint["id"],
+            "parent_id": configurable.get("checkpoint_id"),
+            "checkpoint": self.serde.dumps_typed(checkpoint),
+            "metadata": self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+            "writes": {},
+        }
+
+        with self._lock:
+            entry = self._touch(thread_id)
+            # 이전 체크포인트와 그 대기 쓰기는 새 체크포인트에 반영되었으므로 교체
+            entry["namespaces"][checkpoint_ns] = record
+            self._refresh_size(thread_id)
+            self._evict(keep_thread_id=thread_id)
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        configurable = config["configurable"]
+        thread_id = str(configurable["thread_id"])
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = configurable.get("checkpoint_id")
+
+        with self._lock:
+            entry = self._threads.get(thread_id)
+            record = entry["namespaces"].get(checkpoint_ns) if entry else None
+            if record is None or record["checkpoint_id"] != checkpoint_id:
+                return
+
+            for index, (channel, value) in enumerate(writes):
+                key = (task_id, WRITES_IDX_MAP.get(channel, index))
+                if key[1] >= 0 and key in record["writes"]:
+                    continue
+                record["writes"][key] = (task_id, channel, self.serde.dumps_typed(value), task_path)
+
+            self._touch(thread_id)
+            self._refresh_size(thread_id)
+            self._evict(keep_thread_id=thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._drop(str(thread_id))
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for checkpoint_tuple in self.list(config, filter=filter, before=before, limit=limit):
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        return next_channel_version(current)
+
+    # ------------------------------------------------------------------
+    # 지표
+    # ------------------------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "threads": len(self._threads),
+                "retained_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "max_messages": self.max_messages,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "trimmed_messages": self.trimmed_messages,
+                "lru_evictions": self.lru_evictions,
+                "ttl_evictions": self.ttl_evictions,
+            }
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver):
+    """
+    SQLite(WAL) 기반 공유 체크포인터
+
+    - 같은 DB 파일을 여러 uvicorn 워커(공유 볼륨이면 여러 호스트)가 함께 사용
+    - 체크포인트/쓰기는 serde.dumps_typed(msgpack)로 직렬화해 BLOB 저장
+    - 쓰기는 메모리 버퍼에 모았다가 백그라운드 스레드가 flush_interval마다 한 트랜잭션으로 기록
+      (같은 스레드의 중간 체크포인트는 최신 것만 남기고 합침, synchronous=NORMAL로 커밋마다 fsync 안 함)
+    - 같은 프로세스의 읽기는 버퍼와 커밋 중인 배치를 먼저 확인 (기록 전 데이터도 읽힘)
+    """
+
+    def __init__(
+        self,
+        path: str = "./checkpoints.sqlite",
+        max_messages: int = 20,
+        idle_ttl_seconds: float = 1800,
+        flush_interval: float = 0.05,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.max_messages = max_messages
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.flush_interval = flush_interval
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._read_conn = self._connect()
+        self._write_conn = self._connect()
+        self._create_tables()
+
+        # 기록 대기 버퍼: (thread_id, ns) -> 최신 체크포인트 행 / 쓰기 행 목록
+        self._pending_checkpoints: Dict[Tuple[str, str], tuple] = {}
+        self._pending_writes: list = []
+        # 버퍼에서 꺼내 커밋 중인 배치 (커밋이 끝날 때까지 읽기에 보이도록 유지)
+        self._inflight_checkpoints: Dict[Tuple[str, str], tuple] = {}
+        self._inflight_writes: list = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+        self.trimmed_messages = 0
+        self.flushes = 0
+        self.checkpoints_written = 0
+        self.checkpoints_coalesced = 0
+        self.writes_written = 0
+        self.expired_threads = 0
+        self._last_cleanup = time.time()
+
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="checkpoint-flusher", daemon=True)
+        self._flusher.start()
+
+    # ------------------------------------------------------------------
+    # SQLite 연결/스키마
+    # ------------------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _create_tables(self):
+        with self._write_conn:
+            self._write_conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL,
+                    checkpoint_id TEXT NOT NULL,
+                    parent_id TEXT,
+                    checkpoint_type TEXT NOT NULL,
+                    checkpoint BLOB NOT NULL,
+                    metadata_type TEXT NOT NULL,
+                    metadata BLOB NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (thread_id, checkpoint_ns)
+                )
+                """
+            )
+            self._write_conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS writes (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL,
+                    checkpoint_id TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    channel TEXT NOT NULL,
+                    value_type TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    task_path TEXT NOT NULL,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+                )
+                """
+            )
+            self._write_conn.execute(
+                "CREATE INDEX IF NOT EXISTS checkpoints_updated_at ON checkpoints (updated_at)"
+            )
+
+    # ------------------------------------------------------------------
+    # 배치 기록
+    # ------------------------------------------------------------------
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("[체크포인트] 기록 실패: %s", e)
+
+    def flush(self):
+        """버퍼에 모인 체크포인트/쓰기를 한 트랜잭션으로 기록 (동시에 하나만 실행)"""
+        with self._flush_lock:
+            with self._buffer_lock:
+                self._inflight_checkpoints = self._pending_checkpoints
+                self._inflight_writes = self._pending_writes
+                self._pending_checkpoints = {}
+                self._pending_writes = []
+            try:
+                self._commit(list(self._inflight_checkpoints.values()), self._inflight_writes)
+            finally:
+                with self._buffer_lock:
+                    self._inflight_checkpoints = {}
+                    self._inflight_writes = []
+
+        if time.time() - self._last_cleanup > 60:
+            self._cleanup_expired()
+
+    def _commit(self, checkpoints: list, writes: list):
+        """꺼낸 배치를 한 트랜잭션으로 기록"""
+        # 같은 배치에서 대체된 이전 체크포인트의 쓰기는 버림
+        latest_ids = {(row[0], row[1]): row[2] for row in checkpoints}
+        writes = [
+            (row, replace)
+            for row, replace in writes
+            if latest_ids.get((row[0], row[1]), row[2]) == row[2]
+        ]
+
+        if checkpoints or writes:
+            with self._write_lock, self._write_conn:
+                self._write_conn.executemany(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    checkpoints,
+                )
+                # 새 체크포인트에 반영된 이전 체크포인트의 쓰기 정리
+                self._write_conn.executemany(
+                    "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id != ?",
+                    [row[:3] for row in checkpoints],
+                )
+                for row, replace in writes:
+                    verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+                    self._write_conn.execute(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+            self.flushes += 1
+            self.checkpoints_written += len(checkpoints)
+            self.writes_written += len(writes)
+
+    def _cleanup_expired(self):
+        """유휴 TTL이 지난 스레드 삭제"""
+        self._last_cleanup = time.time()
+        cutoff = self._last_cleanup - self.idle_ttl_seconds
+        with self._write_lock, self._write_conn:
+            expired = [
+                row[0]
+                for row in self._write_conn.execute(
+                    "SELECT DISTINCT thread_id FROM checkpoints WHERE updated_at < ?", (cutoff,)
+                )
+            ]
+            for thread_id in expired:
+                self._write_conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                self._write_conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+        self.expired_threads += len(expired)
+
+    def close(self):
+        """백그라운드 기록 중지 + 남은 버퍼 기록"""
+        self._stop.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+        self._read_conn.close()
+        self._write_conn.close()
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def _load_row(self, thread_id: str, checkpoint_ns: str) -> Optional[tuple]:
+        key = (thread_id, checkpoint_ns)
+        with self._buffer_lock:
+            row = self._pending_checkpoints.get(key) or self._inflight_checkpoints.get(key)
+            # 커밋 중인 배치 → 버퍼 순 (뒤의 것이 최신)
+            pending_writes = [
+                write
+                for write, _ in (*self._inflight_writes, *self._pending_writes)
+                if write[0] == thread_id and write[1] == checkpoint_ns
+            ]
+        if row is None:
+            with self._read_lock:
+                row = self._read_conn.execute(
+                    "SELECT * FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+        if row is None:
+            return None
+
+        checkpoint_id = row[2]
+        with self._read_lock:
+            stored_writes = self._read_conn.execute(
+                "SELECT * FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+                "ORDER BY task_id, idx",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchall()
+
+        # 버퍼의 쓰기가 최신이므로 같은 키면 덮어씀
+        writes = {(write[3], write[4]): write for write in stored_writes}
+        for write in pending_writes:
+            if write[2] == checkpoint_id:
+                writes[(write[3], write[4])] = write
+        return row, list(writes.values())
+
+    def _to_tuple(self, row: tuple, writes: list) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id = row[:4]
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed((row[4], row[5])),
+            metadata=self.serde.loads_typed((row[6], row[7])),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=[
+                (write[3], write[5], self.serde.loads_typed((write[6], write[7]))) for write in writes
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        configurable = config["configurable"]
+        thread_id = str(configurable["thread_id"])
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = configurable.get("checkpoint_id")
+
+        loaded = self._load_row(thread_id, checkpoint_ns)
+        if loaded is None:
+            return None
+
+        row, writes = loaded
+        if time.time() - row[8] > self.idle_ttl_seconds:
+            return None
+        # 최신 체크포인트만 보관하므로 과거 checkpoint_id 요청은 없음으로 처리
+        if checkpoint_id and checkpoint_id != row[2]:
+            return None
+        return self._to_tuple(row, writes)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        self.flush()
+
+        query = "SELECT thread_id, checkpoint_ns FROM checkpoints"
+        params: list = []
+        if config is not None:
+            query += " WHERE thread_id = ?"
+            params.append(str(config["configurable"]["thread_id"]))
+            if config["configurable"].get("checkpoint_ns") is not None:
+                query += " AND checkpoint_ns = ?"
+                params.append(config["configurable"]["checkpoint_ns"])
+        query += " ORDER BY updated_at DESC"
+
+        with self._read_lock:
+            keys = self._read_conn.execute(query, params).fetchall()
+
+        before_id = before["configurable"].get("checkpoint_id") if before else None
+        count = 0
+        for thread_id, checkpoint_ns in keys:
+            if limit is not None and count >= limit:
+                break
+            loaded = self._load_row(thread_id, checkpoint_ns)
+            if loaded is None:
+                continue
+            row, writes = loaded
+            if before_id and row[2] >= before_id:
+                continue
+            checkpoint_tuple = self._to_tuple(row, writes)
+            if filter and not all(checkpoint_tuple.metadata.get(key) == value for key, value in filter.items()):
+                continue
+            count += 1
+            yield checkpoint_tuple
+
+    # ------------------------------------------------------------------
+    # 저장
+    # ------------------------------------------------------------------
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        configurable = config["configurable"]
+        thread_id = str(configurable["thread_id"])
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+
+        messages = checkpoint.get("channel_values", {}).get("messages")
+        if isinstance(messages, list) and len(messages) > self.max_messages:
+            trimmed = trim_messages_at_turn_boundary(messages, self.max_messages)
+            self.trimmed_messages += len(messages) - len(trimmed)
+            checkpoint = {
+                **checkpoint,
+                "channel_values": {**checkpoint["channel_values"], "messages": trimmed},
+            }
+
+        checkpoint_type, checkpoint_bytes = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_bytes = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        row = (
+            thread_id,
+            checkpoint_ns,
+            checkpoint["id"],
+            configurable.get("checkpoint_id"),
+            checkpoint_type,
+            checkpoint_bytes,
+            metadata_type,
+            metadata_bytes,
+            time.time(),
+        )
+
+        with self._buffer_lock:
+            if (thread_id, checkpoint_ns) in self._pending_checkpoints:
+                # 아직 기록 전인 중간 체크포인트는 최신 것으로 대체
+                self.checkpoints_coalesced += 1
+            self._pending_checkpoints[(thread_id, checkpoint_ns)] = row
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        configurable = config["configurable"]
+        thread_id = str(configurable["thread_id"])
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = configurable["checkpoint_id"]
+
+        rows = []
+        for index, (channel, value) in enumerate(writes):
+            write_index = WRITES_IDX_MAP.get(channel, index)
+            value_type, value_bytes = self.serde.dumps_typed(value)
+            row = (thread_id, checkpoint_ns, checkpoint_id, task_id, write_index, channel, value_type, value_bytes, task_path)
+            # 일반 쓰기는 최초 기록 유지, 특수 채널(오류/인터럽트 등)은 덮어씀
+            rows.append((row, write_index < 0))
+
+        with self._buffer_lock:
+            self._pending_writes.extend(rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        thread_id = str(thread_id)
+        with self._buffer_lock:
+            self._pending_checkpoints = {
+                key: row for key, row in self._pending_checkpoints.items() if key[0] != thread_id
+            }
+            self._pending_writes = [write for write in self._pending_writes if write[0][0] != thread_id]
+        # 커밋 중인 배치가 삭제 뒤에 기록되지 않도록 끝날 때까지 대기
+        with self._flush_lock, self._write_lock, self._write_conn:
+            self._write_conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self._write_conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoint_tuples = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint_tuple in checkpoint_tuples:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        # 직렬화 후 버퍼에 넣기만 하므로 이벤트 루프에서 바로 실행
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        return next_channel_version(current)
+
+    # ------------------------------------------------------------------
+    # 지표
+    # ------------------------------------------------------------------
+    def stats(self) -> dict:
+        with self._read_lock:
+            threads, retained_bytes = self._read_conn.execute(
+                "SELECT COUNT(DISTINCT thread_id), COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) "
+                "FROM checkpoints"
+            ).fetchone()
+        with self._buffer_lock:
+            pending = len(self._pending_checkpoints) + len(self._pending_writes)
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "threads": threads,
+            "retained_bytes": retained_bytes,
+            "pending_rows": pending,
+            "max_messages": self.max_messages,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "flush_interval": self.flush_interval,
+            "flushes": self.flushes,
+            "checkpoints_written": self.checkpoints_written,
+            "checkpoints_coalesced": self.checkpoints_coalesced,
+            "writes_written": self.writes_written,
+            "trimmed_messages": self.trimmed_messages,
+            "expired_threads": self.expired_threads,
+        }
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+에이전트 컨텍스트 윈도우 관리 모듈
+LLM 호출 전에 대화 기록을 토큰 예산 안으로 줄임
+- 최근 N턴은 그대로 유지
+- 그 이전 턴의 도구 결과(긴 행동요령/대피소 목록)는 첫 줄 위주의 짧은 요약으로 교체
+- 예산을 넘으면 현재 턴을 뺀 모든 턴의 도구 결과를 요약하고,
+  그래도 넘으면 오래된 턴부터 통째로 제거 (현재 턴은 항상 유지)
+"""
+
+import threading
+from functools import lru_cache
+from typing import List, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
+
+# 메시지당 역할/구분자 오버헤드 (OpenAI chat 포맷 기준 근사치)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_stats_lock = threading.Lock()
+_stats = {
+    "calls": 0,
+    "prompt_tokens_total": 0,
+    "prompt_tokens_max": 0,
+    "prompt_tokens_last": 0,
+    "tokens_saved_total": 0,
+    "dropped_turns": 0,
+    "summarized_tool_messages": 0,
+}
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")  # gpt-4o 계열 토크나이저
+    except Exception:
+        return None
+
+
+def count_text_tokens(text: str) -> int:
+    """텍스트 토큰 수 (tiktoken이 없으면 글자 수 기반 근사)"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return max(1, len(text) // 2)
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(messages: List[BaseMessage]) -> int:
+    """메시지 목록의 대략적인 프롬프트 토큰 수 (도구 호출 인자 포함)"""
+    total = 0
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        total += count_text_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            total += count_text_tokens(f"{tool_call['name']}{tool_call['args']}")
+    return total
+
+
+def split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """사용자 질문(HumanMessage)을 기준으로 턴 단위 분할"""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def summarize_tool_message(message: ToolMessage, max_chars: int) -> ToolMessage:
+    """도구 결과를 첫 줄 위주의 짧은 요약으로 교체 (tool_call_id는 유지해 호출/결과 쌍 보존)"""
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    if len(content) <= max_chars:
+        return message
+
+    lines = [line for line in content.splitlines() if line.strip()]
+    summary = lines[0] if lines else ""
+    if len(summary) > max_chars:
+        summary = summary[:max_chars]
+    summary += f" …(이전 도구 결과 요약, 원문 {len(content):,}자)"
+    return message.model_copy(update={"content": summary})
+
+
+def _summarize_turn(turn: List[BaseMessage], max_chars: int) -> Tuple[List[BaseMessage], int]:
+    new_turn = []
+    count = 0
+    for message in turn:
+        if isinstance(message, ToolMessage):
+            compact = summarize_tool_message(message, max_chars)
+            if compact is not message:
+                count += 1
+            message = compact
+        new_turn.append(message)
+    return new_turn, count
+
+
+def apply_context_window(
+    messages: List[BaseMessage],
+    keep_turns: int = 3,
+    max_tokens: int = 6000,
+    tool_summary_chars: int = 200,
+    reserved_tokens: int = 0,
+) -> Tuple[List[BaseMessage], dict]:
+    """
+    대화 기록을 윈도우 정책에 맞게 축소
+
+    Args:
+        messages: 시스템 프롬프트를 제외한 대화 기록
+        keep_turns: 원문 그대로 유지할 최근 턴 수
+        max_tokens: 프롬프트 토큰 예산 (reserved_tokens 포함)
+        tool_summary_chars: 이전 턴 도구 결과 요약 길이
+        reserved_tokens: 시스템 프롬프트 등 항상 붙는 부분의 토큰 수
+
+    Returns:
+        (축소된 메시지 목록, {"tokens_before", "tokens_after", "dropped_turns", "summarized_tool_messages"})
+    """
+    tokens_before = count_message_tokens(messages) + reserved_tokens
+    turns = split_turns(messages)
+
+    # 1단계: 최근 keep_turns 이전 턴의 도구 결과 요약
+    summarized = 0
+    for index in range(max(0, len(turns) - keep_turns)):
+        turns[index], count = _summarize_turn(turns[index], tool_summary_chars)
+        summarized += count
+
+    # 2단계: 예산 초과 시 현재 턴을 제외한 모든 턴의 도구 결과 요약
+    if count_message_tokens([m for turn in turns for m in turn]) + reserved_tokens > max_tokens:
+        for index in range(len(turns) - 1):
+            turns[index], count = _summarize_turn(turns[index], tool_summary_chars)
+            summarized += count
+
+    # 3단계: 그래도 초과하면 오래된 턴부터 제거 (현재 턴은 유지)
+    turn_tokens = [count_message_tokens(turn) for turn in turns]
+    total = sum(turn_tokens) + reserved_tokens
+    dropped = 0
+    while total > max_tokens and len(turns) > 1:
+        total -= turn_tokens.pop(0)
+        turns.pop(0)
+        dropped += 1
+
+    trimmed = [message for turn in turns for message in turn]
+    info = {
+        "tokens_before": tokens_before,
+        "tokens_after": total,
+        "dropped_turns": dropped,
+        "summarized_tool_messages": summarized,
+    }
+
+    with _stats_lock:
+        _stats["tokens_saved_total"] += tokens_before - total
+        _stats["dropped_turns"] += dropped
+        _stats["summarized_tool_messages"] += summarized
+
+    return trimmed, info
+
+
+def record_prompt_tokens(prompt_tokens: int):
+    """LLM 호출 1회의 실제 프롬프트 토큰 기록"""
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["prompt_tokens_total"] += prompt_tokens
+        _stats["prompt_tokens_last"] = prompt_tokens
+        _stats["prompt_tokens_max"] = max(_stats["prompt_tokens_max"], prompt_tokens)
+
+
+def context_window_stats() -> dict:
+    with _stats_lock:
+        calls = _stats["calls"]
+        return {
+            **_stats,
+            "prompt_tokens_avg": round(_stats["prompt_tokens_total"] / calls, 1) if calls else 0.0,
+        }
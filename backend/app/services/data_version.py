@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+데이터 버전 모듈
+대피소/행동요령 데이터를 재적재할 때마다 버전 스탬프를 갱신하고,
+캐시가 이전 데이터로 만든 응답을 쓰지 않도록 현재 버전을 제공
+"""
+
+import json
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DATA_VERSION_FILE = "data_version.json"
+
+# 스탬프 파일 mtime 기준 캐시 (요청마다 파일을 읽지 않도록)
+_cached_version = {"path": None, "mtime": None, "version": None}
+
+
+def bump_data_version(persist_directory: str) -> str:
+    """재적재 완료 시 새 데이터 버전 기록"""
+    version = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    path = Path(persist_directory) / DATA_VERSION_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "created_at": time.time()}, f)
+    os.replace(tmp_path, path)
+
+    logger.info("데이터 버전 갱신: %s", version)
+    return version
+
+
+def read_data_version(persist_directory: str) -> str:
+    """현재 데이터 버전 (스탬프가 없으면 'initial')"""
+    path = Path(persist_directory) / DATA_VERSION_FILE
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return "initial"
+
+    if _cached_version["path"] == path and _cached_version["mtime"] == mtime:
+        return _cached_version["version"]
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            version = json.load(f).get("version", "initial")
+    except (OSError, ValueError):
+        return "initial"
+
+    _cached_version.update({"path": path, "mtime": mtime, "version": version})
+    return version
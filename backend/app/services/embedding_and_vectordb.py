@@ -10,6 +10,13 @@ from typing import List
 from dotenv import load_dotenv
 import os
 
+from backend.app.services.data_version import bump_data_version
+from backend.app.services.guideline_cards import (
+    build_guideline_cards,
+    build_guideline_index,
+    save_guideline_cards,
+)
+
 load_dotenv()  # .env 파일에서 환경 변수 로드
 
 
@@ -35,4 +42,11 @@ def create_embeddings_and_vectordb(documents: List[Document]):
     )
 
     print(f"VectorDB 생성 완료: {len(documents)}개 문서 저장")
+
+    # 데이터 버전 갱신 → 실행 중인 서버의 응답 캐시 무효화
+    version = bump_data_version("./chroma_db")
+
+    # 행동요령 답변 카드 + 조건별 색인을 같은 버전으로 미리 생성 (서버는 벡터DB 조회 없이 사용)
+    entries = [(doc.page_content, doc.metadata) for doc in documents]
+    save_guideline_cards(build_guideline_cards(entries), "./chroma_db", version, build_guideline_index(entries))
     return embeddings, vectorstore
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+재난 일반 지식 FAQ 초기 데이터
+자주 묻는 "○○이 뭐야" 질문의 검수된 답변 (일반 지식 프롬프트의 답변 형식과 동일)
+- question: 대표 질문, aliases: 같은 답을 쓰는 다른 표현
+"""
+
+CURATED_FAQS = [
+    {
+        "question": "지진이 뭐야",
+        "aliases": ["지진이란", "지진의 정의", "지진은 왜 일어나"],
+        "answer": (
+            "지진은 땅속 암반이 갑자기 깨지거나 어긋나면서 생긴 진동이 땅을 따라 전달되어 지표면이 흔들리는 현상입니다.\n"
+            "- 원인: 판의 움직임으로 쌓인 힘이 단층에서 한꺼번에 풀리며 발생\n"
+            "- 규모: 지진이 낸 에너지의 크기 (리히터 규모)\n"
+            "- 진도: 특정 장소에서 느끼는 흔들림의 세기"
+        ),
+    },
+    {
+        "question": "쓰나미가 뭐야",
+        "aliases": ["쓰나미란", "지진해일이 뭐야", "지진해일이란", "해일이 뭐야"],
+        "answer": (
+            "쓰나미(지진해일)는 바다 밑에서 일어난 지진·화산 폭발·해저 산사태로 바닷물이 크게 출렁이며 해안으로 밀려오는 큰 파도입니다.\n"
+            "- 먼바다에서는 낮지만 해안에 가까워질수록 높아짐\n"
+            "- 여러 차례 반복해서 밀려오며 첫 파도보다 뒤의 파도가 더 클 수 있음\n"
+            "- 해안에서 강한 흔들림을 느끼면 즉시 높은 곳으로 대피"
+        ),
+    },
+    {
+        "question": "태풍이 뭐야",
+        "aliases": ["태풍이란", "태풍의 정의"],
+        "answer": (
+            "태풍은 따뜻한 열대 바다에서 발생해 중심 최대풍속이 초속 17m 이상으로 발달한 열대저기압입니다.\n"
+            "- 강한 바람, 많은 비, 높은 파도와 해일을 함께 동반\n"
+            "- 우리나라에는 주로 7~9월에 영향\n"
+            "- 진행 방향의 오른쪽(위험반원)이 바람이 더 강함"
+        ),
+    },
+    {
+        "question": "호우가 뭐야",
+        "aliases": ["호우란", "집중호우가 뭐야", "집중호우란", "게릴라성 호우가 뭐야"],
+        "answer": (
+            "호우는 짧은 시간에 많은 양의 비가 내리는 현상이고, 좁은 지역에 특히 강하게 쏟아지는 경우를 집중호우라고 합니다.\n"
+            "- 호우주의보: 3시간 강우량 60mm 이상 또는 12시간 110mm 이상 예상\n"
+            "- 호우경보: 3시간 강우량 90mm 이상 또는 12시간 180mm 이상 예상\n"
+            "- 침수, 하천 범람, 산사태로 이어질 수 있음"
+        ),
+    },
+    {
+        "question": "홍수가 뭐야",
+        "aliases": ["홍수란", "침수가 뭐야", "범람이 뭐야"],
+        "answer": (
+            "홍수는 많은 비나 눈 녹은 물로 하천의 물이 불어나 넘치거나, 배수가 안 되어 땅과 건물이 물에 잠기는 현상입니다.\n"
+            "- 하천 범람: 강·하천의 물이 둑을 넘는 경우\n"
+            "- 도시 침수: 빗물이 하수도 용량을 넘어 도로·지하 공간이 잠기는 경우\n"
+            "- 지하 공간과 저지대가 특히 위험"
+        ),
+    },
+    {
+        "question": "산사태가 뭐야",
+        "aliases": ["산사태란", "토석류가 뭐야", "산사태는 왜 일어나"],
+        "answer": (
+            "산사태는 많은 비나 지진으로 경사면의 흙·돌·나무가 약해져 한꺼번에 아래로 무너져 내리는 현상입니다.\n"
+            "- 토석류: 흙과 돌이 물과 섞여 빠르게 흘러내리는 형태\n"
+            "- 전조: 경사면의 균열, 갑자기 흐려지거나 멈추는 계곡물, 나무 쓰러지는 소리\n"
+            "- 장마·태풍 뒤 땅이 물을 머금었을 때 위험"
+        ),
+    },
+    {
+        "question": "화산 폭발이 뭐야",
+        "aliases": ["화산이 뭐야", "화산 폭발이란", "화산 분화가 뭐야", "분화란"],
+        "answer": (
+            "화산 폭발은 땅속 깊은 곳의 마그마가 압력이 높아져 지표로 분출하는 현상입니다.\n"
+            "- 용암, 화산가스, 화산재, 화산탄 등이 함께 분출\n"
+            "- 화산재는 호흡기·눈 건강과 항공 운항에 피해\n"
+            "- 우리나라에서는 백두산이 대표적인 활화산"
+        ),
+    },
+    {
+        "question": "화산재가 뭐야",
+        "aliases": ["화산재란"],
+        "answer": (
+            "화산재는 화산 폭발 때 잘게 부서진 암석과 유리질 조각으로, 지름 2mm 이하의 가루 형태입니다.\n"
+            "- 바람을 타고 수백 km까지 퍼질 수 있음\n"
+            "- 호흡기·눈을 자극하고 쌓이면 지붕 붕괴나 정전을 일으킴\n"
+            "- 외출 시 마스크와 보안경 착용"
+        ),
+    },
+    {
+        "question": "방사능이 뭐야",
+        "aliases": ["방사능이란", "방사선이 뭐야", "방사선이란", "방사능 누출이 뭐야"],
+        "answer": (
+            "방사능은 불안정한 원자가 붕괴하면서 방사선을 내보내는 성질이고, 방사선은 그때 나오는 에너지입니다.\n"
+            "- 원전 사고 등으로 방사성 물질이 새어 나오면 공기·물·음식을 통해 노출될 수 있음\n"
+            "- 노출량은 시버트(Sv) 단위로 측정\n"
+            "- 사고 시 실내로 대피하고 창문을 닫는 것이 기본"
+        ),
+    },
+    {
+        "question": "댐 붕괴가 뭐야",
+        "aliases": ["댐붕괴란", "댐 붕괴란"],
+        "answer": (
+            "댐 붕괴는 폭우로 물이 넘치거나 구조물이 약해져 댐이 무너지면서 저장된 물이 한꺼번에 하류로 쏟아지는 재난입니다.\n"
+            "- 하류 지역이 짧은 시간에 넓게 침수될 수 있음\n"
+            "- 대피 경보가 나오면 하천에서 멀리, 높은 곳으로 이동\n"
+            "- 댐 방류 알림도 하류 주민에게는 중요한 경보"
+        ),
+    },
+    {
+        "question": "가스 누출이 뭐야",
+        "aliases": ["가스 누출이란", "가스 폭발이 뭐야"],
+        "answer": (
+            "가스 누출은 배관·용기·연결부의 손상으로 도시가스나 LPG가 새어 나오는 사고로, 불꽃이 닿으면 폭발이나 화재로 이어질 수 있습니다.\n"
+            "- 도시가스(LNG)는 공기보다 가벼워 위로, LPG는 무거워 바닥에 고임\n"
+            "- 냄새가 나면 밸브를 잠그고 창문을 열어 환기\n"
+            "- 전기 스위치·불꽃 사용 금지"
+        ),
+    },
+    {
+        "question": "산불이 뭐야",
+        "aliases": ["산불이란"],
+        "answer": (
+            "산불은 산림에서 발생해 나무와 낙엽 등을 태우며 번지는 불로, 건조하고 바람이 강한 봄철에 특히 자주 발생합니다.\n"
+            "- 주요 원인: 입산자 실화, 쓰레기·논밭두렁 소각\n"
+            "- 바람을 타고 빠르게 번지고 불씨가 멀리 날아감\n"
+            "- 산불이 나면 바람이 불어오는 반대 방향, 이미 탄 곳으로 대피"
+        ),
+    },
+    {
+        "question": "화재가 뭐야",
+        "aliases": ["화재란", "불이 나는 원인"],
+        "answer": (
+            "화재는 사람의 의도와 관계없이 발생하거나 번진 불로, 재산과 인명에 피해를 주는 연소 현상입니다.\n"
+            "- 연소의 3요소: 탈 물질, 산소, 열(점화원)\n"
+            "- 인명 피해의 대부분은 불보다 유독가스와 연기 때문\n"
+            "- 화재 시 낮은 자세로 코와 입을 막고 대피"
+        ),
+    },
+    {
+        "question": "민방위 대피소가 뭐야",
+        "aliases": ["대피소란", "대피소가 뭐야", "민방위 대피시설이란"],
+        "answer": (
+            "민방위 대피소는 전쟁이나 대형 재난 때 주민이 몸을 피할 수 있도록 지정된 시설로, 주로 지하철역·건물 지하 공간 등이 지정됩니다.\n"
+            "- 행정안전부와 지자체가 지정·관리\n"
+            "- 평소 집·직장 근처 대피소 위치를 미리 확인\n"
+            "- 안전디딤돌 앱이나 국민재난안전포털에서 조회 가능"
+        ),
+    },
+    {
+        "question": "재난문자가 뭐야",
+        "aliases": ["재난문자란", "긴급재난문자가 뭐야", "안전안내문자가 뭐야"],
+        "answer": (
+            "재난문자는 정부와 지자체가 재난 발생 시 해당 지역 휴대전화로 보내는 경보 문자입니다.\n"
+            "- 위급재난문자: 공습경보 등 (60dB 이상, 수신 거부 불가)\n"
+            "- 긴급재난문자: 자연·사회재난 (40dB 이상)\n"
+            "- 안전안내문자: 주의 안내 (일반 문자 알림)"
+        ),
+    },
+    {
+        "question": "진도와 규모의 차이가 뭐야",
+        "aliases": ["규모와 진도 차이", "진도가 뭐야", "규모가 뭐야"],
+        "answer": (
+            "규모는 지진 자체가 낸 에너지의 크기이고, 진도는 특정 장소에서 사람이 느끼거나 건물이 받은 흔들림의 정도입니다.\n"
+            "- 규모: 한 지진에 하나의 값 (예: 규모 5.8)\n"
+            "- 진도: 관측 지점마다 다름 (진앙에서 멀수록 작아짐)\n"
+            "- 규모가 1 커지면 에너지는 약 32배"
+        ),
+    },
+]
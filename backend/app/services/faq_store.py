@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+재난 일반 지식 FAQ 저장소
+"지진이 뭐야" 같은 자주 묻는 일반 지식 질문은 답이 거의 바뀌지 않으므로
+검수된 FAQ(faq_seed.py)와 이전에 생성한 답변을 저장해 두고 LLM 호출 없이 답함
+- 1차: 정규화한 질문 핵심어 정확 일치 ("지진이란?" = "지진 이 뭐야" → "지진")
+- 2차: 질문 임베딩 코사인 유사도 (임계값 이상)
+- 둘 다 실패하면 LLM으로 생성하고, 생성한 답변을 저장소에 추가
+- 파일에는 생성한 답변과 질문 임베딩을 함께 기록 (재시작 후 재임베딩 없음), 기록은 모아서 한 번에
+"""
+
+import asyncio
+import atexit
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.app.services.admission import Overloaded, admit
+from backend.app.services.faq_seed import CURATED_FAQS
+from backend.app.services.response_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# 질문 끝의 요청 표현 (긴 것부터 반복 제거)
+QUESTION_SUFFIXES = sorted(
+    [
+        "에대해서알려줘", "에대해알려줘", "알려주세요", "알려줘", "설명해주세요", "설명해줘",
+        "궁금해요", "궁금해", "무엇인가요", "무엇이야", "무엇인지", "무엇", "뭔가요", "뭐예요",
+        "뭐에요", "뭐야", "뭐임", "뭐지", "뭔데", "이란", "란", "의정의", "의뜻", "의의미",
+        "정의", "뜻", "에대해서", "에대해",
+    ],
+    key=len,
+    reverse=True,
+)
+# 요청 표현을 뗀 뒤 한 번만 제거하는 조사
+TRAILING_PARTICLES = ("이", "가", "은", "는")
+
+_stats_lock = threading.Lock()
+_stats = {
+    "entries": 0,
+    "curated": 0,
+    "generated": 0,
+    "exact_hits": 0,
+    "similar_hits": 0,
+    "misses": 0,
+    "writes": 0,
+    "saves": 0,
+    "restored_vectors": 0,
+    "evictions": 0,
+}
+
+
+def faq_key(text: str) -> str:
+    """질문 핵심어 (예: "지진이 뭐야?" → "지진", "쓰나미란" → "쓰나미")"""
+    key = normalize_query(text).replace(" ", "")
+    changed = True
+    while changed:
+        changed = False
+        for suffix in QUESTION_SUFFIXES:
+            if key.endswith(suffix) and len(key) > len(suffix):
+                key = key[: -len(suffix)]
+                changed = True
+                break
+    for particle in TRAILING_PARTICLES:
+        if key.endswith(particle) and len(key) > len(particle) + 1:
+            return key[: -len(particle)]
+    return key
+
+
+class FAQStore:
+    """
+    일반 지식 FAQ 저장소
+
+    - 검수된 FAQ는 코드(faq_seed.py)에서, 생성된 답변은 persist_path 파일에서 로드
+    - 생성된 답변은 max_generated 개까지 유지 (오래된 것부터 제거)
+    - 임베딩은 첫 유사도 검색 때 한 번에 계산해 행렬로 보관 (파일에 저장된 임베딩은 그대로 사용)
+    - 파일 기록은 save_batch 개가 쌓이거나 save_interval 초가 지났을 때만 (남은 것은 종료 시 기록)
+    """
+
+    def __init__(
+        self,
+        embeddings=None,
+        persist_path: Optional[str] = None,
+        threshold: float = 0.9,
+        max_generated: int = 500,
+        save_batch: int = 20,
+        save_interval: float = 30.0,
+    ):
+        self.embeddings = embeddings
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.threshold = threshold
+        self.max_generated = max_generated
+        self.save_batch = save_batch
+        self.save_interval = save_interval
+        # 저장된 임베딩은 같은 모델일 때만 재사용
+        self.embedding_model = getattr(embeddings, "model", None)
+
+        # entry: {"question", "answer", "source", "created_at", "vector"}
+        self._entries: List[dict] = []
+        self._keys: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        # 검색용 행렬과 각 행의 항목 (변경 시 재구성)
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_entries: List[dict] = []
+        self._dirty = True
+
+        # 파일에 아직 기록하지 않은 변경 수 / 마지막 기록 시각
+        self._unsaved = 0
+        self._last_save = time.time()
+
+        for faq in CURATED_FAQS:
+            self._add(faq["question"], faq["answer"], "curated", aliases=faq.get("aliases", ()))
+        self._load()
+        self._update_stats()
+        if self.persist_path is not None:
+            atexit.register(self.flush)
+
+    def _add(self, question: str, answer: str, source: str, aliases=(), created_at: float = None, vector=None):
+        entry_id = len(self._entries)
+        self._entries.append(
+            {
+                "question": question,
+                "answer": answer,
+                "source": source,
+                "created_at": created_at or time.time(),
+                "vector": vector,
+            }
+        )
+        for text in (question, *aliases):
+            # 검수된 FAQ 키는 생성된 답변으로 덮어쓰지 않음
+            key = faq_key(text)
+            if key and self._keys.get(key) is None:
+                self._keys[key] = entry_id
+        self._dirty = True
+        return entry_id
+
+    def _load(self):
+        if self.persist_path is None or not self.persist_path.exists():
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("⚠️ FAQ 저장소 로드 실패: %s", e)
+            return
+        same_model = self.embedding_model is not None and data.get("embedding_model") == self.embedding_model
+        curated_vectors = data.get("curated_vectors", {}) if same_model else {}
+        restored = 0
+        for entry in self._entries:
+            vector = self._decode_vector(curated_vectors.get(entry["question"]))
+            if vector is not None:
+                entry["vector"] = vector
+                restored += 1
+        for item in data.get("entries", []):
+            vector = self._decode_vector(item.get("vector")) if same_model else None
+            restored += vector is not None
+            self._add(item["question"], item["answer"], "generated", created_at=item.get("created_at"), vector=vector)
+        with _stats_lock:
+            _stats["restored_vectors"] = restored
+        logger.info("[FAQ] 생성된 답변 %d개 로드 (임베딩 %d개 재사용)", len(data.get("entries", [])), restored)
+
+    @staticmethod
+    def _encode_vector(vector: Optional[np.ndarray]) -> Optional[str]:
+        if vector is None:
+            return None
+        return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+
+    @staticmethod
+    def _decode_vector(encoded: Optional[str]) -> Optional[np.ndarray]:
+        if not encoded:
+            return None
+        try:
+            return np.frombuffer(base64.b64decode(encoded), dtype=np.float32).copy()
+        except ValueError:
+            return None
+
+    def save(self):
+        """생성된 답변과 임베딩을 파일에 저장 (원자적 교체)"""
+        if self.persist_path is None:
+            return
+        with self._lock:
+            generated = [
+                {
+                    "question": e["question"],
+                    "answer": e["answer"],
+                    "created_at": e["created_at"],
+                    "vector": self._encode_vector(e["vector"]),
+                }
+                for e in self._entries
+                if e["source"] == "generated"
+            ]
+            curated_vectors = {
+                e["question"]: self._encode_vector(e["vector"])
+                for e in self._entries
+                if e["source"] == "curated" and e["vector"] is not None
+            }
+            self._unsaved = 0
+            self._last_save = time.time()
+        data = {"embedding_model": self.embedding_model, "curated_vectors": curated_vectors, "entries": generated}
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.persist_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.persist_path)
+        with _stats_lock:
+            _stats["saves"] += 1
+
+    def flush(self):
+        """기록하지 않은 변경이 있으면 저장 (종료 시 호출)"""
+        if self._unsaved:
+            try:
+                self.save()
+            except OSError as e:
+                logger.warning("⚠️ FAQ 저장소 기록 실패: %s", e)
+
+    def _save_due(self) -> bool:
+        return self._unsaved >= self.save_batch or time.time() - self._last_save >= self.save_interval
+
+    @staticmethod
+    def _normalize(raw_vector) -> np.ndarray:
+        vector = np.asarray(raw_vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    async def _ensure_vectors(self):
+        """임베딩이 없는 항목을 한 번의 배치 호출로 계산"""
+        missing = [entry for entry in self._entries if entry["vector"] is None]
+        if missing:
+            vectors = await self.embeddings.aembed_documents([entry["question"] for entry in missing])
+            for entry, vector in zip(missing, vectors):
+                entry["vector"] = self._normalize(vector)
+            self._dirty = True
+            # 새로 계산한 임베딩도 파일에 남겨 재시작 후 재계산하지 않음
+            with self._lock:
+                self._unsaved += 1
+        if self._dirty:
+            # 임베딩을 기다리는 동안 추가된 항목은 다음 검색 때 반영
+            self._matrix_entries = [entry for entry in self._entries if entry["vector"] is not None]
+            self._matrix = np.vstack([entry["vector"] for entry in self._matrix_entries])
+            self._dirty = False
+
+    async def alookup(self, query: str) -> Tuple[Optional[dict], Optional[np.ndarray]]:
+        """
+        FAQ 답변 검색
+
+        Returns:
+        - (항목 또는 None, 질문 임베딩) - 임베딩은 astore()에서 재사용
+        """
+        entry_id = self._keys.get(faq_key(query))
+        if entry_id is not None:
+            entry = self._entries[entry_id]
+            with _stats_lock:
+                _stats["exact_hits"] += 1
+            logger.debug("[FAQ] 정확 일치: '%s' = '%s' (%s)", query, entry["question"], entry["source"])
+            return entry, None
+
+        if self.embeddings is None or not self._entries:
+            with _stats_lock:
+                _stats["misses"] += 1
+            return None, None
+
+        try:
+            # 임베딩 호출도 과부하 제어 대상 (자리가 없으면 FAQ 미스로 처리)
+            async with admit("embeddings"):
+                await self._ensure_vectors()
+                vector = self._normalize(await self.embeddings.aembed_query(query))
+        except Overloaded:
+            logger.debug("[FAQ] 임베딩 자리 없음 → LLM 답변")
+            with _stats_lock:
+                _stats["misses"] += 1
+            return None, None
+        except Exception as e:
+            logger.warning("⚠️ FAQ 임베딩 실패 → LLM 답변: %s", e)
+            with _stats_lock:
+                _stats["misses"] += 1
+            return None, None
+
+        scores = self._matrix @ vector
+        best = int(np.argmax(scores))
+        similarity = float(scores[best])
+        if similarity < self.threshold:
+            with _stats_lock:
+                _stats["misses"] += 1
+            return None, vector
+
+        entry = self._matrix_entries[best]
+        with _stats_lock:
+            _stats["similar_hits"] += 1
+        logger.debug("[FAQ] 유사 질문: '%s' ≈ '%s' (유사도 %.3f, %s)", query, entry["question"], similarity, entry["source"])
+        return entry, vector
+
+    async def astore(self, query: str, answer: str, vector: Optional[np.ndarray] = None):
+        """LLM이 생성한 답변 저장 (다음 같은/비슷한 질문부터 LLM 호출 생략)"""
+        if not answer.strip() or not faq_key(query):
+            return
+
+        with self._lock:
+            self._add(query, answer, "generated", vector=vector)
+            self._evict()
+            self._unsaved += 1
+            save_due = self._save_due()
+        self._update_stats(writes=1)
+
+        if not save_due:
+            return
+        try:
+            await asyncio.to_thread(self.save)
+        except OSError as e:
+            logger.warning("⚠️ FAQ 저장소 기록 실패: %s", e)
+
+    def _evict(self):
+        """생성된 답변이 상한을 넘으면 오래된 것부터 제거 (키 색인 재구성)"""
+        generated = [i for i, entry in enumerate(self._entries) if entry["source"] == "generated"]
+        overflow = len(generated) - self.max_generated
+        if overflow <= 0:
+            return
+
+        removed = set(generated[:overflow])
+        kept = [entry for i, entry in enumerate(self._entries) if i not in removed]
+        aliases = {faq["question"]: faq.get("aliases", ()) for faq in CURATED_FAQS}
+        self._entries = []
+        self._keys = {}
+        for entry in kept:
+            self._add(
+                entry["question"],
+                entry["answer"],
+                entry["source"],
+                aliases=aliases.get(entry["question"], ()) if entry["source"] == "curated" else (),
+                created_at=entry["created_at"],
+                vector=entry["vector"],
+            )
+        with _stats_lock:
+            _stats["evictions"] += overflow
+
+    def _update_stats(self, writes: int = 0):
+        with _stats_lock:
+            _stats["entries"] = len(self._entries)
+            _stats["curated"] = sum(1 for e in self._entries if e["source"] == "curated")
+            _stats["generated"] = _stats["entries"] - _stats["curated"]
+            _stats["writes"] += writes
+
+
+def faq_stats() -> dict:
+    with _stats_lock:
+        total = _stats["exact_hits"] + _stats["similar_hits"] + _stats["misses"]
+        hits = _stats["exact_hits"] + _stats["similar_hits"]
+        return {**_stats, "hit_rate": round(hits / total, 4) if total else 0.0}
@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+"""
+재난 행동요령 답변 카드 모듈
+행동요령 데이터는 작고 재적재 전까지 바뀌지 않으므로,
+적재 시점에 (재난 키워드, 상황)별 답변 본문/출처/순서를 미리 만들어 두고
+요청 시에는 벡터DB 조회 없이 메모리 dict에서 바로 꺼내 씀
+- 카드 파일(guideline_cards.json)에 데이터 버전을 함께 기록
+- 버전이 맞지 않거나 파일이 없으면 벡터DB에서 한 번 읽어 다시 생성
+
+문서 단위로는 (키워드 × 시점 × 장소 × 대상) 색인도 함께 만들어,
+"지진 났을 때 실내에서", "아이랑 있을 때 홍수 대비"처럼 조건이 붙은 질문에
+유사도 검색 없이 해당 조각만 골라 답함
+- 시점: before(사전 대비) / during(발생 시) / after(발생 후)
+- 장소: indoor(실내) / outdoor(실외)
+- 대상: guardian(보호자·어린이·노약자) / general
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.app.services.data_version import read_data_version
+
+logger = logging.getLogger(__name__)
+
+GUIDELINE_CARDS_FILE = "guideline_cards.json"
+
+# 카드 하나에 넣을 문서 수 (기존 도구의 상위 3개 통합과 동일)
+CARD_DOCUMENT_LIMIT = 3
+
+# 상황 구분 없이 키워드 전체를 대표하는 카드 / 색인의 "조건 없음"
+ALL_SITUATIONS = "*"
+ANY = "*"
+
+# 색인 조회 시 조각 본문 합계 상한 (프롬프트가 과도하게 길어지지 않도록, 최소 1개는 포함)
+SLICE_MAX_CHARS = 2500
+
+# 문서 분류용 표현 (상황 키/제목/경로 기준, 앞에 있는 시점부터 판정)
+PHASE_DOC_WORDS = [
+    ("after", ["발생 후", "발생후", "이후", "사후", "복구", "후 행동"]),
+    ("before", ["사전", "대비", "예방", "평상시", "평소", "준비"]),
+    ("during", ["발생 시", "발생시", "발생 중", "발생중", "도중", "시 행동", "긴급"]),
+]
+# 질문 분류용 표현 (앞에 있는 시점부터 판정: "대비할 때"는 before)
+PHASE_QUERY_WORDS = [
+    ("after", ["발생 후", "발생후", "이후", "후에", "끝나", "끝난", "그치", "그친", "지나간", "지나가", "멈추", "멈춘", "복구"]),
+    ("before", ["대비", "미리", "평소", "평상시", "예방", "준비", "사전"]),
+    ("during", ["발생 시", "발생시", "발생하면", "났", "나면", "때", "중에", "지금", "당장", "흔들", "오면", "왔"]),
+]
+# "집중호우", "산불"처럼 재난명에 섞인 글자에 걸리지 않도록 조사까지 포함
+SETTING_WORDS = [
+    ("indoor", ["실내", "집에", "집 안", "집안", "건물", "엘리베이터", "승강기", "학교", "사무실", "지하", "아파트", "극장", "백화점", "상가", "안에 있"]),
+    ("outdoor", ["실외", "야외", "밖", "외출", "길에", "길거리", "도로", "산에", "산속", "등산", "해안", "바닷가", "해변", "운전", "차량", "자동차", "차 안", "계곡"]),
+]
+GUARDIAN_DOC_WORDS = ["보호자", "어린이", "유아", "노약자", "장애인", "임산부", "영유아"]
+GUARDIAN_QUERY_WORDS = [
+    "아이", "아기", "애기", "자녀", "아들", "딸", "어린이", "유아", "보호자",
+    "노약자", "어르신", "부모님", "할머니", "할아버지", "장애인", "임산부",
+]
+
+_stats_lock = threading.Lock()
+_stats = {
+    "version": None,  # 메모리에 올라온 카드의 데이터 버전
+    "keywords": 0,
+    "cards": 0,
+    "hits": 0,
+    "situation_hits": 0,  # 그중 상황별 카드로 답한 횟수
+    "facet_hits": 0,  # 그중 시점/장소/대상 색인 조각으로 답한 횟수
+    "indexed_chunks": 0,
+    "misses": 0,
+    "builds": 0,  # 벡터DB에서 카드를 생성한 횟수
+    "loads": 0,  # 카드 파일에서 읽은 횟수
+}
+
+
+def build_guideline_cards(entries: Iterable[Tuple[str, dict]]) -> Dict[str, Dict[str, dict]]:
+    """
+    (본문, 메타데이터) 목록으로 {키워드: {상황: 카드}} 생성 (적재 순서 유지)
+
+    카드: {"keyword", "situation", "title", "text", "sources", "paths"}
+    """
+    grouped: Dict[str, Dict[str, List[Tuple[str, dict]]]] = {}
+    for text, metadata in entries:
+        if metadata.get("type") != "disaster_guideline":
+            continue
+        keyword = metadata.get("keyword", "")
+        if not keyword:
+            continue
+        situations = grouped.setdefault(keyword, {ALL_SITUATIONS: []})
+        situations[ALL_SITUATIONS].append((text, metadata))
+        situation = metadata.get("situation") or ""
+        if situation:
+            situations.setdefault(situation, []).append((text, metadata))
+
+    cards: Dict[str, Dict[str, dict]] = {}
+    for keyword, situations in grouped.items():
+        cards[keyword] = {}
+        for situation, documents in situations.items():
+            selected = documents[:CARD_DOCUMENT_LIMIT]
+            # 상황 제목 = 경로의 두 번째 단계 ("지진 > 지진 발생 시 > ...")
+            path = selected[0][1].get("path", "")
+            parts = path.split(" > ")
+            cards[keyword][situation] = {
+                "keyword": keyword,
+                "situation": situation,
+                "title": parts[1] if situation != ALL_SITUATIONS and len(parts) > 1 else keyword,
+                "text": "\n\n".join(text for text, _ in selected),
+                "sources": list(dict.fromkeys(m.get("source", "") for _, m in selected if m.get("source"))),
+                "paths": [m.get("path", "") for _, m in selected],
+            }
+    return cards
+
+
+def _first_facet(text: str, table) -> Optional[str]:
+    for facet, words in table:
+        if any(word in text for word in words):
+            return facet
+    return None
+
+
+def classify_guideline(text: str, metadata: dict) -> Tuple[Optional[str], Optional[str], str]:
+    """문서의 (시점, 장소, 대상) - 판정할 수 없는 시점/장소는 None (모든 조건에 해당)"""
+    parts = metadata.get("path", "").split(" > ")
+    situation_text = f"{metadata.get('situation', '')} {parts[1] if len(parts) > 1 else ''}"
+    # 세부 항목 제목은 경로가 아닌 title 메타데이터에 있음
+    heading = f"{' '.join(parts[1:])} {metadata.get('title', '')}"
+    phase = _first_facet(situation_text, PHASE_DOC_WORDS)
+    setting = _first_facet(heading, SETTING_WORDS)
+    guardian = "보호자 행동요령" in text or any(word in heading for word in GUARDIAN_DOC_WORDS)
+    return phase, setting, "guardian" if guardian else "general"
+
+
+def detect_query_facets(query: str) -> Tuple[str, str, str]:
+    """질문에서 (시점, 장소, 대상) 조건 추출 (없으면 ANY)"""
+    phase = _first_facet(query, PHASE_QUERY_WORDS) or ANY
+    setting = _first_facet(query, SETTING_WORDS) or ANY
+    audience = "guardian" if any(word in query for word in GUARDIAN_QUERY_WORDS) else ANY
+    return phase, setting, audience
+
+
+def _posting_key(keyword: str, phase: str, setting: str, audience: str) -> str:
+    return f"{keyword}|{phase}|{setting}|{audience}"
+
+
+def build_guideline_index(entries: Iterable[Tuple[str, dict]]) -> dict:
+    """
+    문서 단위 (키워드 × 시점 × 장소 × 대상) 색인 생성
+    {"entries": [문서 조각], "postings": {"키워드|시점|장소|대상": [조각 번호 (적재 순서)]}}
+    - 조건별 목록에 "*"(조건 없음)도 함께 등록해 조회는 dict 조회 한 번
+    - 시점/장소를 판정할 수 없는 문서는 모든 시점/장소 목록에 등록
+    """
+    index_entries: List[dict] = []
+    postings: Dict[str, List[int]] = {}
+
+    for text, metadata in entries:
+        if metadata.get("type") != "disaster_guideline" or not metadata.get("keyword"):
+            continue
+        keyword = metadata["keyword"]
+        phase, setting, audience = classify_guideline(text, metadata)
+        entry_id = len(index_entries)
+        index_entries.append(
+            {
+                "text": text,
+                "keyword": keyword,
+                "situation": metadata.get("situation", ""),
+                "path": metadata.get("path", ""),
+                "title": metadata.get("title", ""),
+                "source": metadata.get("source", ""),
+                "phase": phase,
+                "setting": setting,
+                "audience": audience,
+            }
+        )
+
+        phases = [phase, ANY] if phase else ["before", "during", "after", ANY]
+        settings = [setting, ANY] if setting else ["indoor", "outdoor", ANY]
+        for phase_key in phases:
+            for setting_key in settings:
+                for audience_key in (audience, ANY):
+                    postings.setdefault(_posting_key(keyword, phase_key, setting_key, audience_key), []).append(entry_id)
+
+    return {"entries": index_entries, "postings": postings}
+
+
+def save_guideline_cards(cards: Dict[str, Dict[str, dict]], persist_directory: str, version: str, index: dict = None):
+    """카드 파일 저장 (데이터 버전 + 조건별 색인과 함께, 원자적 교체)"""
+    path = Path(persist_directory) / GUIDELINE_CARDS_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": version, "created_at": time.time(), "cards": cards, "index": index or {}},
+            f,
+            ensure_ascii=False,
+        )
+    os.replace(tmp_path, path)
+    logger.info("행동요령 답변 카드 저장: %d개 (버전 %s)", sum(len(s) for s in cards.values()), version)
+
+
+def _compact(text: str) -> str:
+    return "".join(text.split())
+
+
+class GuidelineCardStore:
+    """데이터 버전별 행동요령 답변 카드 + 조건별 색인 (메모리 dict 조회)"""
+
+    def __init__(self, persist_directory: Optional[str], max_chars: int = SLICE_MAX_CHARS):
+        self.persist_directory = persist_directory
+        self.max_chars = max_chars
+        self.version: Optional[str] = None
+        # (카드, 색인 조각, 색인 키 → 조각 번호) — refresh가 다른 스레드에서 돌므로 한 번에 교체
+        self._data: Tuple[Dict[str, Dict[str, dict]], List[dict], Dict[str, List[int]]] = ({}, [], {})
+        self._lock = threading.Lock()
+
+    def current_version(self) -> str:
+        return read_data_version(self.persist_directory) if self.persist_directory else "initial"
+
+    def is_stale(self) -> bool:
+        return self.version != self.current_version()
+
+    def refresh(self, vectorstore) -> int:
+        """현재 데이터 버전의 카드 로드 (카드 파일이 없거나 버전이 다르면 벡터DB에서 생성)"""
+        with self._lock:
+            version = self.current_version()
+            if self.version == version:
+                return len(self._data[0])
+
+            data = self._load_file(version)
+            if data is None and vectorstore is not None:
+                start = time.perf_counter()
+                all_data = vectorstore.get(
+                    where={"type": "disaster_guideline"}, include=["documents", "metadatas"]
+                )
+                entries = list(zip(all_data["documents"], all_data["metadatas"]))
+                data = {"cards": build_guideline_cards(entries), "index": build_guideline_index(entries)}
+                with _stats_lock:
+                    _stats["builds"] += 1
+                logger.info("⏱️ [행동요령 답변 카드 생성 시간] %.3f초 (%d개 재난)", time.perf_counter() - start, len(data["cards"]))
+                if self.persist_directory:
+                    try:
+                        save_guideline_cards(data["cards"], self.persist_directory, version, data["index"])
+                    except OSError as e:
+                        logger.warning("⚠️ 행동요령 답변 카드 저장 실패: %s", e)
+
+            data = data or {}
+            index = data.get("index") or {}
+            cards = data.get("cards") or {}
+            entries = index.get("entries") or []
+            self._data = (cards, entries, index.get("postings") or {})
+            self.version = version
+            with _stats_lock:
+                _stats["version"] = version
+                _stats["keywords"] = len(cards)
+                _stats["cards"] = sum(len(situations) for situations in cards.values())
+                _stats["indexed_chunks"] = len(entries)
+            return len(cards)
+
+    def _load_file(self, version: str) -> Optional[dict]:
+        if not self.persist_directory:
+            return None
+        path = Path(self.persist_directory) / GUIDELINE_CARDS_FILE
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != version:
+            logger.info("[행동요령 카드] 카드 파일 버전 불일치 (%s ≠ %s) → 재생성", data.get("version"), version)
+            return None
+        if not data.get("index"):
+            # 색인 도입 전에 만든 카드 파일
+            return None
+        with _stats_lock:
+            _stats["loads"] += 1
+        return data
+
+    def _situation_card(self, situations: Dict[str, dict], query: str) -> Optional[dict]:
+        """질문에 상황 이름/제목이 그대로 들어 있으면 해당 상황 카드"""
+        compact_query = _compact(query)
+        best = None
+        best_length = 0
+        for situation, card in situations.items():
+            if situation == ALL_SITUATIONS:
+                continue
+            for name in (situation, card["title"]):
+                name = _compact(name)
+                if name and name != card["keyword"] and name in compact_query and len(name) > best_length:
+                    best, best_length = card, len(name)
+        return best
+
+    def select_chunks(self, keyword: str, facets: Tuple[str, str, str], limit: int = CARD_DOCUMENT_LIMIT) -> Optional[dict]:
+        """
+        조건에 맞는 문서 조각 (가장 구체적인 조건부터 채우고, 부족하면 대상 → 장소 순으로 완화)
+        시점은 해당 시점 조각이 하나도 없을 때만 완화 (다른 시점 조각으로 채우지 않음)
+        """
+        phase, setting, audience = facets
+        _, entries, postings = self._data
+        chain = []
+        for phase_key in dict.fromkeys((phase, ANY)):
+            for setting_key in dict.fromkeys((setting, ANY)):
+                for audience_key in dict.fromkeys((audience, ANY)):
+                    chain.append(_posting_key(keyword, phase_key, setting_key, audience_key))
+
+        selected: List[int] = []
+        total_chars = 0
+        for key in chain:
+            if selected and phase != ANY and key.split("|")[1] == ANY:
+                break
+            for entry_id in postings.get(key, ()):
+                if entry_id in selected:
+                    continue
+                length = len(entries[entry_id]["text"])
+                if selected and total_chars + length > self.max_chars:
+                    continue
+                selected.append(entry_id)
+                total_chars += length
+                if len(selected) >= limit:
+                    break
+            if len(selected) >= limit:
+                break
+
+        if not selected:
+            return None
+
+        chunks = [entries[entry_id] for entry_id in selected]
+        labels = [facet for facet in facets if facet != ANY]
+        return {
+            "keyword": keyword,
+            "situation": "|".join(labels) or ALL_SITUATIONS,
+            "title": chunks[0]["path"].split(" > ")[1] if " > " in chunks[0]["path"] else keyword,
+            "text": "\n\n".join(chunk["text"] for chunk in chunks),
+            "sources": list(dict.fromkeys(chunk["source"] for chunk in chunks if chunk["source"])),
+            "paths": [chunk["path"] for chunk in chunks],
+            "facets": {"phase": phase, "setting": setting, "audience": audience},
+        }
+
+    def lookup(self, keyword: str, query: str = "", limit: int = CARD_DOCUMENT_LIMIT, default_phase: str = ANY) -> Optional[dict]:
+        """
+        행동요령 조회 (모두 dict 조회)
+        1. 질문에 상황 이름/제목이 있으면 해당 상황 카드
+        2. 시점/장소/대상 조건이 있으면 조건별 색인 조각
+        3. 조건이 없으면 키워드 대표 카드 (기존 상위 3개 통합과 동일)
+        """
+        situations = self._data[0].get(keyword)
+        if not situations:
+            with _stats_lock:
+                _stats["misses"] += 1
+            return None
+
+        card = None
+        # 상황 카드는 기존과 같은 분량(상위 3개)일 때만 사용
+        if limit == CARD_DOCUMENT_LIMIT:
+            card = self._situation_card(situations, query)
+            if card is not None:
+                with _stats_lock:
+                    _stats["situation_hits"] += 1
+
+        if card is None:
+            phase, setting, audience = detect_query_facets(query)
+            facets = (default_phase if phase == ANY else phase, setting, audience)
+            if facets != (ANY, ANY, ANY) or limit != CARD_DOCUMENT_LIMIT:
+                card = self.select_chunks(keyword, facets, limit)
+                if card is not None and facets != (ANY, ANY, ANY):
+                    with _stats_lock:
+                        _stats["facet_hits"] += 1
+
+        with _stats_lock:
+            _stats["hits"] += 1
+        return card or situations.get(ALL_SITUATIONS)
+
+
+def guideline_card_stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
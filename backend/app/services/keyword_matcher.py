@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+재난 키워드 매칭 모듈
+재난 키워드 사전을 Aho–Corasick 오토마톤으로 한 번만 컴파일해 두고,
+질문을 한 번 훑어 모든 키워드 위치를 찾은 뒤 가장 긴 키워드를 선택
+(예: "산불" 질문에서 "불"보다 "산불", "지진 대비"에서 "비"보다 "지진")
+"""
+
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# 재난 키워드 매핑 (사용자 입력 → VectorDB 저장명)
+DISASTER_KEYWORD_MAPPING: Dict[str, str] = {
+    # 기상 재난 - 비 관련 (단계별 구분)
+    "비": "호우",
+    "폭우": "호우",
+    "집중호우": "호우",
+    "장마": "호우",
+    "게릴라성 호우": "호우",
+    "많은 비": "호우",
+    "강한 비": "호우",
+
+    # 기상 재난 - 물 관련
+    "홍수": "홍수",
+    "침수": "홍수",
+    "범람": "홍수",
+    "강물이 넘쳤": "홍수",
+    "물이 넘쳤": "홍수",
+    "물난리": "홍수",
+    "수해": "홍수",
+
+    # 기상 재난 - 바람/태풍
+    "태풍": "태풍",
+    "강풍": "태풍",
+    "돌풍": "태풍",
+    "폭풍": "태풍",
+
+    # 지질 재난 - 지진 관련
+    "지진": "지진",
+    "진동": "지진",
+    "땅이 흔들": "지진",
+    "여진": "지진",
+
+    # 지질 재난 - 해양
+    "쓰나미": "지진해일",
+    "해일": "지진해일",
+    "지진해일": "지진해일",
+    "해안 침수": "지진해일",
+
+    # 지질 재난 - 산사태
+    "산사태": "산사태",
+    "토석류": "산사태",
+    "산 무너짐": "산사태",
+    "산 붕괴": "산사태",
+    "낙석": "산사태",
+    "사면 붕괴": "산사태",
+
+    # 화재 재난
+    "화재": "화재",
+    "불": "화재",
+    "화염": "화재",
+    "연기": "화재",
+    "산불": "산불",
+    "산에 불": "산불",
+    "산림 화재": "산불",
+    "들불": "산불",
+
+    # 폭발/가스
+    "폭발": "폭발",
+    "가스": "가스",
+    "가스 누출": "가스",
+    "가스 폭발": "폭발",
+
+    # 화산 재난
+    "화산": "화산폭발",
+    "화산 폭발": "화산폭발",
+    "화산재": "화산재",
+    "분화": "화산폭발",
+
+    # 방사능
+    "방사능": "방사능",
+    "방사선": "방사능",
+    "핵": "방사능",
+    "원전": "방사능",
+
+    # 붕괴 재난
+    "붕괴": "댐붕괴",
+    "댐 붕괴": "댐붕괴",
+    "댐 터짐": "댐붕괴",
+}
+
+
+class KeywordMatch(NamedTuple):
+    keyword: str  # 사용자 입력에 나온 키워드
+    value: str  # 매핑 값 (VectorDB 저장명)
+    start: int
+    end: int
+
+
+class AhoCorasick:
+    """문자 단위 Aho–Corasick 오토마톤 (모든 패턴 위치를 한 번의 순회로 탐색)"""
+
+    def __init__(self, patterns):
+        # 상태별 전이 / 실패 링크 / 해당 상태에서 끝나는 패턴 길이 목록
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Tuple[int, str]]] = [[]]
+
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._build_failure_links()
+
+    def _add(self, pattern: str):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append((len(pattern), pattern))
+
+    def _build_failure_links(self):
+        """실패 링크 계산 후 전이표를 완전한 DFA로 펼침 (검색 시 실패 링크 추적 없음)"""
+        queue = deque(self._goto[0].values())
+        order = []
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # 실패 링크 쪽에서 끝나는 (더 짧은) 패턴도 함께 출력
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+        # BFS 순서로 실패 상태의 전이를 물려받음 (실패 상태가 항상 먼저 완성됨)
+        self._delta: List[Dict[str, int]] = [dict(self._goto[0])] + [None] * (len(self._goto) - 1)
+        for state in order:
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """텍스트의 모든 패턴 출현 (start, end, pattern) - 겹침 포함"""
+        hits = []
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for index, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                for length, pattern in outputs[state]:
+                    hits.append((index + 1 - length, index + 1, pattern))
+        return hits
+
+
+class KeywordMatcher:
+    """키워드 → 값 사전을 오토마톤으로 컴파일한 매처"""
+
+    def __init__(self, mapping: Dict[str, str]):
+        self.mapping = dict(mapping)
+        self._automaton = AhoCorasick(self.mapping)
+
+    def _normalize(self, text: str) -> str:
+        # 소문자 변환으로 길이가 바뀌는 문자가 있으면 위치가 어긋나므로 원문 사용
+        lowered = text.lower()
+        return lowered if len(lowered) == len(text) else text
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """겹치지 않는 키워드 출현 목록 (왼쪽부터, 같은 위치에서는 가장 긴 키워드)"""
+        hits = sorted(self._automaton.find_all(self._normalize(text)), key=lambda hit: (hit[0], -(hit[1] - hit[0])))
+
+        matches: List[KeywordMatch] = []
+        covered_until = 0
+        for start, end, keyword in hits:
+            if start < covered_until:
+                continue
+            matches.append(KeywordMatch(keyword, self.mapping[keyword], start, end))
+            covered_until = end
+        return matches
+
+    def best(self, text: str) -> Optional[KeywordMatch]:
+        """가장 긴 키워드 (길이가 같으면 앞쪽)"""
+        hits = self._automaton.find_all(self._normalize(text))
+        if not hits:
+            return None
+        start, end, keyword = min(hits, key=lambda hit: (-(hit[1] - hit[0]), hit[0]))
+        return KeywordMatch(keyword, self.mapping[keyword], start, end)
+
+    @staticmethod
+    def remove_spans(text: str, matches: List[KeywordMatch]) -> str:
+        """매칭된 구간을 잘라낸 나머지 텍스트 (위치 부분 추출용)"""
+        pieces = []
+        cursor = 0
+        for match in sorted(matches, key=lambda m: m.start):
+            pieces.append(text[cursor:match.start])
+            cursor = max(cursor, match.end)
+        pieces.append(text[cursor:])
+        return " ".join("".join(pieces).split())
+
+
+# 시작 시 한 번만 컴파일해 도구들이 공유
+DISASTER_MATCHER = KeywordMatcher(DISASTER_KEYWORD_MAPPING)
@@ -5,37 +5,77 @@ LangGraph Agent 및 Tools 정의
 """
 
 import os
-import requests
+import asyncio
+import httpx
 import json
-import re
+import logging
 from math import radians, sin, cos, sqrt, atan2
-from typing import TypedDict, Annotated, Optional
+from typing import TypedDict, Annotated, Optional, Tuple
 import time
+import uuid
 
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.tools import tool
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from langchain_core.documents import Document
+from langchain_core.runnables import RunnableConfig
 from langchain_community.retrievers import BM25Retriever
 from langgraph.graph import StateGraph, END, START
 from langgraph.graph.message import add_messages
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import InjectedState, ToolNode
 from pathlib import Path
 from dotenv import load_dotenv
 
+from backend.app.services.admission import Overloaded, admit, has_free_slot
+from backend.app.services.budget import (
+    AGENT_MAX_ITERATIONS,
+    AGENT_MAX_TOOL_CALLS,
+    best_answer_so_far,
+    expired,
+    http_timeout,
+    new_deadline,
+    record_exhausted,
+    remaining,
+    run_with_deadline,
+    skipped_tool_messages,
+)
+from backend.app.services.capacity_parser import CapacityIndex, parse_capacity_query
+from backend.app.services.checkpointer import BoundedMemorySaver, SQLiteCheckpointSaver
+from backend.app.services.context_window import (
+    apply_context_window,
+    count_message_tokens,
+    record_prompt_tokens,
+)
+from backend.app.services.data_version import read_data_version
+from backend.app.services.faq_store import FAQStore
+from backend.app.services.guideline_cards import ALL_SITUATIONS, GuidelineCardStore
+from backend.app.services.keyword_matcher import DISASTER_MATCHER
+from backend.app.services.prompts import (
+    AGENT_SYSTEM_PROMPT,
+    GENERAL_KNOWLEDGE_SYSTEM_PROMPT,
+    INTENT_SYSTEM_PROMPT,
+    QUERY_REWRITE_SYSTEM_PROMPT,
+    static_prompt_tokens,
+)
+from backend.app.services.speculation import SpeculativeGeocoder
+from backend.app.services.tracing import span, traced_node
+
 # .env 파일 로드 (프로젝트 루트 기준)
 project_root = Path(__file__).parent.parent.parent
 env_path = project_root / '.env'
 load_dotenv(dotenv_path=env_path)
 
+logger = logging.getLogger(__name__)
+
 class EnsembleRetriever:
     """간단한 앙상블 리트리버 구현"""
 
-    def __init__(self, retrievers, weights=None):
+    def __init__(self, retrievers, weights=None, name="hybrid"):
         self.retrievers = retrievers
         self.weights = weights or [1.0 / len(retrievers)] * len(retrievers)
+        self.name = name  # span 이름 (retriever.<name>)
 
     def invoke(self, query):
         all_docs = []
@@ -47,6 +87,26 @@ class EnsembleRetriever:
                     all_docs.append(doc)
             except:
                 continue
+        return self._merge(all_docs)
+
+    async def ainvoke(self, query):
+        """비동기 검색 (리트리버들을 동시에 실행)"""
+        with span(f"retriever.{self.name}"):
+            results = await asyncio.gather(
+                *(retriever.ainvoke(query) for retriever in self.retrievers),
+                return_exceptions=True,
+            )
+        all_docs = []
+        for docs, weight in zip(results, self.weights):
+            if isinstance(docs, BaseException):
+                continue
+            for doc in docs:
+                doc.metadata["retriever_weight"] = weight
+                all_docs.append(doc)
+        return self._merge(all_docs)
+
+    @staticmethod
+    def _merge(all_docs):
         # 중복 제거 및 가중치 기반 정렬
         seen = set()
         unique_docs = []
@@ -58,11 +118,121 @@ class EnsembleRetriever:
         return unique_docs[:10]
 
 
+# 의도 → 도구 직접 매핑 (에이전트 LLM의 도구 선택을 생략할 수 있는 의도)
+INTENT_TOOL_MAP = {
+    "hybrid_location_disaster": "search_location_with_disaster",
+    "shelter_info": "search_shelter_by_name",
+    "shelter_search": "search_shelter_by_location",
+    "shelter_count": "count_shelters",
+    "shelter_capacity": "search_shelter_by_capacity",
+    "disaster_guideline": "search_disaster_guideline",
+    "general_knowledge": "answer_general_knowledge",
+}
+
+# 도구 인자에서 제거할 요청 표현 (에이전트가 "강남역 근처 대피소" → "강남역"으로 넘기던 것과 동일한 효과)
+DISPATCH_REMOVE_WORDS = [
+    "근처", "주변", "인근", "대피소", "피난소", "피난처", "몇 개", "몇개", "개수",
+    "알려줘", "찾아줘", "알려주세요", "찾아주세요", "어디", "있어", "?", "!",
+]
+
+DIRECT_DISPATCH_ENABLED = os.getenv("DIRECT_DISPATCH_ENABLED", "true").lower() == "true"
+DIRECT_DISPATCH_MIN_CONFIDENCE = float(os.getenv("DIRECT_DISPATCH_MIN_CONFIDENCE", "0.8"))
+
+SPECULATIVE_GEOCODING_ENABLED = os.getenv("SPECULATIVE_GEOCODING_ENABLED", "true").lower() == "true"
+SPECULATIVE_GEOCODING_MAX = int(os.getenv("SPECULATIVE_GEOCODING_MAX", "2"))
+
+# 에이전트 LLM 컨텍스트 윈도우 (최근 턴 원문 유지 + 이전 도구 결과 요약 + 토큰 예산)
+CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "3"))
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "6000"))
+CONTEXT_TOOL_SUMMARY_CHARS = int(os.getenv("CONTEXT_TOOL_SUMMARY_CHARS", "200"))
+
+# 일반 지식 FAQ 저장소 (검수된 FAQ + 생성 답변 기록, 적중 시 LLM 호출 생략)
+FAQ_STORE_ENABLED = os.getenv("FAQ_STORE_ENABLED", "true").lower() == "true"
+FAQ_STORE_PATH = os.getenv("FAQ_STORE_PATH", "./faq_store.json")
+FAQ_SIMILARITY_THRESHOLD = float(os.getenv("FAQ_SIMILARITY_THRESHOLD", "0.9"))
+FAQ_MAX_GENERATED = int(os.getenv("FAQ_MAX_GENERATED", "500"))
+FAQ_SAVE_BATCH = int(os.getenv("FAQ_SAVE_BATCH", "20"))
+FAQ_SAVE_INTERVAL = float(os.getenv("FAQ_SAVE_INTERVAL", "30"))
+
+# 행동요령 조건별 색인 조각의 본문 합계 상한 (글자 수)
+GUIDELINE_SLICE_MAX_CHARS = int(os.getenv("GUIDELINE_SLICE_MAX_CHARS", "2500"))
+
+
+def get_request_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    """main.py가 요청마다 넣어주는 request_id (없으면 None)"""
+    return ((config or {}).get("configurable") or {}).get("request_id")
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """두 좌표 사이 거리 (km)"""
+    R = 6371
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = (
+        sin(dlat / 2) ** 2
+        + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    )
+    c = 2 * atan2(sqrt(a), sqrt(1 - a))
+    return R * c
+
+
+def build_dispatch_argument(intent: str, message: str) -> str:
+    """의도별 도구 인자 추출 (LLM 없이 규칙 기반)"""
+    # 수용인원/시설명/복합/행동요령/일반지식 도구는 원문에서 직접 조건을 파싱
+    if intent not in ("shelter_search", "shelter_count"):
+        return message.strip()
+
+    argument = message
+    for word in DISPATCH_REMOVE_WORDS:
+        argument = argument.replace(word, " ")
+    argument = " ".join(argument.split()).strip()
+    return argument or message.strip()
+
+
+def is_rewritten_argument(state: Optional[dict], argument: str) -> bool:
+    """
+    State의 재정의 결과가 이 도구 인자에 대한 것인지
+    (query_rewrite_node는 마지막 사용자 질문만 재정의하므로, 인자가 그 질문 원문이나 직접 실행 인자일 때만 재사용)
+    """
+    messages = (state or {}).get("messages") or []
+    last_question = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+    if not isinstance(last_question, str):
+        return False
+    argument = " ".join(argument.split())
+    return argument in (
+        " ".join(last_question.split()),
+        build_dispatch_argument((state or {}).get("intent", ""), last_question),
+    )
+
+
+KAKAO_KEYWORD_SEARCH_URL = "https://dapi.kakao.com/v2/local/search/keyword.json"
+KAKAO_OVERLOADED_MESSAGE = "🚦 지금 위치 검색 요청이 많아 대피소를 찾지 못했습니다. 잠시 후 다시 시도해주세요."
+
+
+async def search_kakao_place(
+    client: httpx.AsyncClient, api_key: str, query: str, timeout: Optional[float] = None
+) -> Optional[dict]:
+    """카카오 키워드 검색 API로 첫 번째 장소 조회 (결과가 없으면 None, timeout 미지정 시 클라이언트 기본값)"""
+    with span("kakao.keyword_search") as kakao_span:
+        response = await client.get(
+            KAKAO_KEYWORD_SEARCH_URL,
+            headers={"Authorization": f"KakaoAK {api_key}"},
+            params={"query": query},
+            timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout,
+        )
+        kakao_span.set(status=response.status_code)
+        data = response.json()
+    if not data.get("documents"):
+        return None
+    return data["documents"][0]
+
+
 def create_hybrid_retrievers(vectorstore):
     """하이브리드 리트리버 생성 (Vector + BM25)"""
     if vectorstore is None:
         return None, None
 
+    start_time = time.perf_counter()
     try:
         # 1. Vector Retriever
         shelter_vector_retriever = vectorstore.as_retriever(
@@ -90,7 +260,7 @@ def create_hybrid_retrievers(vectorstore):
                 bm25_retriever.k = 5
                 return bm25_retriever
             except Exception as e:
-                print(f"⚠️ BM25 Retriever 생성 실패 ({doc_type}): {e}")
+                logger.warning("⚠️ BM25 Retriever 생성 실패 (%s): %s", doc_type, e)
                 return None
 
         shelter_bm25 = create_bm25_retriever("shelter")
@@ -104,6 +274,7 @@ def create_hybrid_retrievers(vectorstore):
                 else [shelter_vector_retriever]
             ),
             weights=[0.6, 0.4] if shelter_bm25 else [1.0],
+            name="shelter",
         )
 
         guideline_hybrid = EnsembleRetriever(
@@ -113,72 +284,67 @@ def create_hybrid_retrievers(vectorstore):
                 else [guideline_vector_retriever]
             ),
             weights=[0.7, 0.3] if guideline_bm25 else [1.0],
+            name="guideline",
         )
 
+        logger.info("⏱️ [하이브리드 리트리버 생성 시간] %.3f초", time.perf_counter() - start_time)
         return shelter_hybrid, guideline_hybrid
 
     except Exception as e:
-        print(f"⚠️ 하이브리드 리트리버 생성 실패: {e}")
+        logger.warning("⚠️ 하이브리드 리트리버 생성 실패: %s", e)
         return None, None
 
 
-def create_langgraph_app(vectorstore):
-    """LangGraph Agent 생성"""
+def create_checkpointer():
+    """
+    대화 체크포인트 생성
+    - memory: 워커별 메모리 (스레드당 메시지 상한 + 유휴 만료 + 메모리 예산 LRU)
+    - sqlite: 여러 워커가 공유하는 SQLite(WAL) 파일 (세션이 워커에 묶이지 않음)
+    """
+    checkpoint_backend = os.getenv("CHECKPOINT_BACKEND", "memory").lower()
+    if checkpoint_backend == "sqlite":
+        return SQLiteCheckpointSaver(
+            path=os.getenv("CHECKPOINT_SQLITE_PATH", "./checkpoints.sqlite"),
+            max_messages=int(os.getenv("CHECKPOINT_MAX_MESSAGES", "20")),
+            idle_ttl_seconds=float(os.getenv("CHECKPOINT_IDLE_TTL", "1800")),
+            flush_interval=float(os.getenv("CHECKPOINT_FLUSH_INTERVAL", "0.05")),
+        )
+    return BoundedMemorySaver(
+        max_messages=int(os.getenv("CHECKPOINT_MAX_MESSAGES", "20")),
+        idle_ttl_seconds=float(os.getenv("CHECKPOINT_IDLE_TTL", "1800")),
+        max_bytes=int(os.getenv("CHECKPOINT_MAX_BYTES", str(64 * 1024 * 1024))),
+    )
+
+
+def create_langgraph_app(vectorstore, retrievers=None):
+    """LangGraph Agent 생성 (대화 기록을 유지하는 앱만 필요할 때)"""
+    return create_langgraph_apps(vectorstore, retrievers)[0]
+
+
+def create_langgraph_apps(vectorstore, retrievers=None):
+    """
+    LangGraph Agent 생성 (같은 그래프/도구를 공유하는 두 가지 컴파일)
+
+    Args:
+        vectorstore: Chroma 벡터DB
+        retrievers: 미리 만든 (shelter_hybrid, guideline_hybrid) - 없으면 여기서 생성
+
+    Returns:
+        (app, stateless_app)
+        - app: 체크포인터 사용 (thread_id별 대화 기록 유지, 챗봇용)
+        - stateless_app: 체크포인터 없음 (기록 조회/저장 없이 한 번 실행, 단발성 질의용)
+    """
+    build_start = time.perf_counter()
 
     # 1. LLM 초기화
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    llm_creative = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)  # 일반 지식용
+    # stream_usage: 스트리밍 호출에서도 토큰 사용량(캐시 적중 포함) 수신
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, stream_usage=True)
+    llm_creative = ChatOpenAI(model="gpt-4o-mini", temperature=0.7, stream_usage=True)  # 일반 지식용
 
-    # 2. 의도 분류 체인
     # 2. 의도 분류 체인
     intent_classification_prompt = ChatPromptTemplate.from_messages(
         [
-            (
-                "system",
-                """당신은 사용자 질문의 의도를 정확하게 분류하는 AI입니다.
-
-    질문을 다음 카테고리 중 하나로 분류하세요:
-
-    1. **hybrid_location_disaster**: 위치 + 재난 상황 복합 질문 ⭐ 우선순위 1
-    - 예: "설악산 근처인데 산사태 발생 시", "강남역에서 지진 나면", "명동 화재"
-    - 키워드: 지명 + (지진/화재/산사태/홍수 등)
-
-    2. **shelter_info**: 특정 대피소의 상세 정보 조회 ⭐ 새로 추가
-    - 예: "동대문맨션 수용인원", "서울역 대피소 정보", "롯데월드 최대 수용"
-    - 키워드: 시설명 + (수용인원/정보/면적 등)
-
-    3. **shelter_search**: 특정 위치의 대피소 찾기
-    - 예: "한라산 근처 대피소", "강남역 대피소"
-    - 키워드: 지명 + (근처/주변/대피소) WITHOUT 재난 키워드
-    
-    4. **shelter_count**: 특정 조건의 대피소 개수 세기
-    - 예: "서울 대피소 개수", "지하 대피소 몇 개"
-    
-    5. **shelter_capacity**: 수용인원 기준 대피소 찾기
-    - 예: "천 명 이상 수용 가능한 대피소"
-    - 키워드: 숫자 + (이상/이하/수용)
-    
-    6. **disaster_guideline**: 재난 행동요령만 질문
-    - 예: "지진 발생 시 행동요령" (위치 정보 없음)
-    
-    7. **general_knowledge**: 재난 관련 일반 지식
-    - 예: "지진이 뭐야", "쓰나미란"
-    
-    8. **general_chat**: 일반 대화
-    - 예: "안녕", "고마워"
-
-    **중요 우선순위**: 
-    - "위치 + 재난"이 함께 있으면 무조건 **hybrid_location_disaster**
-    - "시설명 + 수용인원/정보"는 **shelter_info**
-    - "위치 + 근처/주변"만 있고 재난 없으면 **shelter_search**
-
-    **응답 형식**: JSON
-    {{
-        "intent": "카테고리명",
-        "confidence": 0.95,
-        "reason": "분류 근거"
-    }}""",
-            ),
+            ("system", INTENT_SYSTEM_PROMPT),
             ("user", "{query}"),
         ]
     )
@@ -188,97 +354,206 @@ def create_langgraph_app(vectorstore):
     # 3. 질문 재정의 체인 (검색 정확도 향상)
     query_rewrite_prompt = ChatPromptTemplate.from_messages(
         [
-            (
-                "system",
-                """당신은 검색 쿼리를 최적화하는 전문가입니다.
-
-사용자의 질문을 **검색 시스템별로 최적화**된 형태로 재작성하세요.
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**1️⃣ 카카오 API용 (위치 검색)**
-- **목적**: 정확한 장소 좌표 찾기
-- **원칙**: 
-  ✅ 특정 위치(역, 건물, 매장): 그대로 유지
-     예) "강남역", "롯데월드", "스타벅스 명동점"
-  
-  ✅ 지역명(시/구/동): 행정기관으로 변환
-     예) "서울" → "서울시청"
-     예) "동작구" → "동작구청"
-     예) "송파" → "송파구청"
-     예) "여의도동" → "여의도동 주민센터"
-  
-  ✅ "대피소", "근처", "주변" 등 제거
-  
-- **예시**:
-  * "강남역 근처 대피소" → "강남역"
-  * "서울 대피소" → "서울시청"
-  * "동작구 주변" → "동작구청"
-  * "송파 지하 대피소" → "송파구청"
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**2️⃣ VectorDB용 (의미 검색)**
-- **목적**: 유사한 문서 찾기 (BM25 + Vector)
-- **원칙**:
-  ✅ 핵심 키워드 + 동의어 추가
-  ✅ 지역명 다양한 표현 (서울 → 서울 서울시 서울특별시)
-  ✅ 위치 유형 명확화 (지하 → 지하 지하층)
-  ✅ 최대 10단어 이내
-  
-- **예시**:
-  * "강남역 근처 대피소" → "강남역 강남 대피소 피난처"
-  * "서울 대피소" → "서울 서울시 서울특별시 대피소"
-  * "동작구 지하" → "동작구 동작 지하 지하층 대피소"
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**응답 형식** (JSON):
-{{
-    "kakao": "카카오 API용 쿼리",
-    "vector": "VectorDB용 쿼리",
-    "location_type": "specific" or "region"
-}}
-
-**location_type 판단 기준**:
-- "specific": 역명, 건물명, 매장명 등 구체적 장소
-- "region": 시/구/동 등 행정구역""",
-            ),
+            ("system", QUERY_REWRITE_SYSTEM_PROMPT),
             ("user", "{original_query}"),
         ]
     )
 
     query_rewrite_chain = query_rewrite_prompt | llm | StrOutputParser()
 
-    # 4. 하이브리드 리트리버 생성
-    shelter_hybrid, guideline_hybrid = create_hybrid_retrievers(vectorstore)
+    def parse_rewritten_query(rewritten: str, original_query: str) -> Optional[dict]:
+        """재정의 체인의 JSON 출력을 파싱 (실패 시 None)"""
+        try:
+            parsed = json.loads(rewritten)
+        except (json.JSONDecodeError, TypeError):
+            return None
+        if not isinstance(parsed, dict):
+            return None
+        return {
+            "kakao_query": parsed.get("kakao", original_query),
+            "vector_query": parsed.get("vector", original_query),
+            "location_type": parsed.get("location_type", "specific"),
+        }
+
+    async def resolve_rewritten_query(query: str, state: dict, argument: Optional[str] = None) -> Optional[dict]:
+        """
+        query_rewrite_node가 State에 저장한 재정의 결과를 재사용
+        - 도구 인자(argument, 기본값 query)가 재정의한 질문과 같을 때만 재사용
+          (후속 질문에서 에이전트가 채운 인자, 한 턴에 여러 장소를 나눠 호출한 인자는 직접 재정의)
+        - State에 결과가 없을 때(일반 대화로 분류된 뒤 도구가 호출된 경우 등)도 LLM으로 재정의
+        """
+        kakao_query = (state or {}).get("kakao_query")
+        if kakao_query and is_rewritten_argument(state, argument or query):
+            return {
+                "kakao_query": kakao_query,
+                "vector_query": state.get("rewritten_query") or query,
+                "location_type": state.get("location_type") or "specific",
+            }
+
+        rewritten = await query_rewrite_chain.ainvoke({"original_query": query})
+        return parse_rewritten_query(rewritten, query)
+
+    # 4. 하이브리드 리트리버 (lifespan에서 만든 것 재사용, BM25 인덱스 중복 생성 방지)
+    if retrievers is None:
+        retrievers = create_hybrid_retrievers(vectorstore)
+    shelter_hybrid, guideline_hybrid = retrievers
+
+    # 일반 지식 답변 체인 (프롬프트 템플릿은 한 번만 생성)
+    general_knowledge_prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", GENERAL_KNOWLEDGE_SYSTEM_PROMPT),
+            ("user", "질문: {query}"),
+        ]
+    )
+    general_knowledge_chain = general_knowledge_prompt | llm_creative
+
+    # 재난 행동요령 답변 카드 + 조건별 색인 (적재 시 생성된 카드 파일 로드, 없으면 벡터DB에서 한 번 생성)
+    guideline_cards = GuidelineCardStore(
+        getattr(vectorstore, "_persist_directory", None), max_chars=GUIDELINE_SLICE_MAX_CHARS
+    )
+    if vectorstore is not None:
+        try:
+            guideline_cards.refresh(vectorstore)
+        except Exception as e:
+            logger.warning("⚠️ 행동요령 답변 카드 로드 실패: %s", e)
+
+    # 일반 지식 FAQ 저장소 (임베딩은 벡터DB와 같은 모델 사용)
+    faq_store = (
+        FAQStore(
+            embeddings=getattr(vectorstore, "embeddings", None),
+            persist_path=FAQ_STORE_PATH,
+            threshold=FAQ_SIMILARITY_THRESHOLD,
+            max_generated=FAQ_MAX_GENERATED,
+            save_batch=FAQ_SAVE_BATCH,
+            save_interval=FAQ_SAVE_INTERVAL,
+        )
+        if FAQ_STORE_ENABLED
+        else None
+    )
+
+    # 카카오 API 비동기 HTTP 클라이언트 (커넥션 재사용)
+    KAKAO_TIMEOUT_SECONDS = 10.0
+    kakao_client = httpx.AsyncClient(timeout=KAKAO_TIMEOUT_SECONDS)
+
+    async def find_nearest_shelters(user_lat: float, user_lon: float, k: int):
+        """좌표 기준 가까운 대피소 k곳과 전체 대피소 수"""
+        with span("chroma.get_shelters") as chroma_span:
+            all_data = await asyncio.to_thread(vectorstore.get, where={"type": "shelter"})
+        logger.debug("⏱️ [ChromaDB 검색 시간] %.3f초", chroma_span.elapsed)
+
+        shelters = []
+        for metadata in all_data["metadatas"]:
+            try:
+                lat = float(metadata.get("lat", 0))
+                lon = float(metadata.get("lon", 0))
+                if lat == 0 or lon == 0:
+                    continue
+
+                distance = haversine(user_lat, user_lon, lat, lon)
+                shelters.append(
+                    {
+                        "name": metadata.get("facility_name", "N/A"),
+                        "address": metadata.get("address", "N/A"),
+                        "lat": lat,
+                        "lon": lon,
+                        "distance": distance,
+                        "capacity": int(metadata.get("capacity", 0)),
+                        "shelter_type": metadata.get("shelter_type", "N/A"),
+                        "facility_type": metadata.get("facility_type", "N/A"),
+                    }
+                )
+            except Exception:
+                continue
+
+        # 거리순 정렬
+        shelters.sort(key=lambda x: x["distance"])
+        return shelters[:k], len(all_data["metadatas"])
+
+    # 수용인원 인덱스 (첫 조회 시 생성, 데이터 재적재로 버전이 바뀌면 재생성)
+    capacity_index_state = {"version": None, "index": None}
+    persist_directory = getattr(vectorstore, "_persist_directory", None)
+
+    async def get_capacity_index() -> CapacityIndex:
+        version = read_data_version(persist_directory) if persist_directory else "initial"
+        if capacity_index_state["index"] is None or capacity_index_state["version"] != version:
+            with span("chroma.capacity_index") as index_span:
+                all_data = await asyncio.to_thread(
+                    vectorstore.get, where={"type": "shelter"}, include=["metadatas"]
+                )
+                capacity_index_state["index"] = CapacityIndex(all_data["metadatas"])
+            capacity_index_state["version"] = version
+            logger.info(
+                "⏱️ [수용인원 인덱스 생성 시간] %.3f초 (%d곳, 버전 %s)",
+                index_span.elapsed,
+                len(capacity_index_state["index"]),
+                version,
+            )
+        return capacity_index_state["index"]
+
+    async def locate_and_find_shelters(kakao_query: str, k: int = 5, deadline: Optional[float] = None) -> dict:
+        """
+        카카오 좌표 검색 → 가까운 대피소 k곳 (카카오 호출은 요청 마감 시각까지만 대기)
+        카카오 동시 호출 수가 가득 차면 자리를 기다리고, 대기열이 넘치면 Overloaded
+        Returns: {"place": 카카오 장소 또는 None, "shelters": [...], "total_count": int}
+        """
+        api_start = time.perf_counter()
+        async with admit("kakao", max_wait=remaining(deadline)):
+            place = await search_kakao_place(
+                kakao_client,
+                os.getenv("KAKAO_REST_API_KEY"),
+                kakao_query,
+                timeout=http_timeout(deadline, KAKAO_TIMEOUT_SECONDS),
+            )
+        logger.debug("⏱️ [카카오 API 호출 시간] %.3f초", time.perf_counter() - api_start)
+
+        if place is None:
+            return {"place": None, "shelters": [], "total_count": 0}
+
+        shelters, total_count = await find_nearest_shelters(float(place["y"]), float(place["x"]), k)
+        return {"place": place, "shelters": shelters, "total_count": total_count}
+
+    async def locate_with_speculation(
+        config: RunnableConfig, kakao_query: str, deadline: Optional[float] = None
+    ) -> dict:
+        """선행 실행된 위치 검색 결과가 있으면 재사용, 없으면 직접 검색"""
+        located = await speculative_geocoder.consume(get_request_id(config), kakao_query)
+        if located is None:
+            located = await locate_and_find_shelters(kakao_query, deadline=deadline)
+        return located
+
+    # 질문 도착 즉시 지명 후보의 위치 검색을 시작하는 투기 실행기
+    speculative_geocoder = SpeculativeGeocoder(
+        locate_and_find_shelters,
+        max_candidates=SPECULATIVE_GEOCODING_MAX,
+        enabled=SPECULATIVE_GEOCODING_ENABLED,
+    )
 
     # 5. Tools 정의
-    @tool
-    def search_shelter_by_location(query: str) -> dict:
+    @tool(response_format="content_and_artifact")
+    async def search_shelter_by_location(
+        query: str, state: Annotated[dict, InjectedState], config: RunnableConfig
+    ) -> Tuple[str, Optional[dict]]:
         """
         특정 위치의 대피소를 검색합니다.
         - 특정 장소(역, 건물): 해당 위치 중심으로 검색
         - 지역명(시/구): 행정기관(시청/구청) 중심으로 검색
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
-            # ⭐ 질문 재정의로 location_type 판단
-            vector_query = query_rewrite_chain.invoke({"original_query": query})
-            
-            try:
-                import json
-                parsed = json.loads(vector_query)
-                kakao_query = parsed.get("kakao", query)
-                vector_query = parsed.get("vector", query)
-                location_type = parsed.get("location_type", "specific")
+            # ⭐ query_rewrite_node의 재정의 결과로 location_type 판단
+            parsed = await resolve_rewritten_query(query, state)
+
+            if parsed:
+                kakao_query = parsed["kakao_query"]
+                vector_query = parsed["vector_query"]
+                location_type = parsed["location_type"]
                 
-                print(f"[search_shelter_by_location] 위치 유형: {location_type}")
-                print(f"[search_shelter_by_location] 카카오용: '{kakao_query}'")
-                print(f"[search_shelter_by_location] Vector용: '{vector_query}'")
+                logger.debug("[search_shelter_by_location] 위치 유형: %s", location_type)
+                logger.debug("[search_shelter_by_location] 카카오용: '%s'", kakao_query)
+                logger.debug("[search_shelter_by_location] Vector용: '%s'", vector_query)
                 
-            except:
+            else:
                 # JSON 파싱 실패 시 기본값
                 kakao_query = query
                 location_type = "specific"
@@ -291,97 +566,35 @@ def create_langgraph_app(vectorstore):
                 
                 kakao_query = " ".join(kakao_query.split()).strip()
         
-            # 카카오 API 호출
-            api_start = time.time()
+            # 카카오 API 호출 + 근처 대피소 검색 (선행 실행 결과 재사용)
             kakao_api_key = os.getenv("KAKAO_REST_API_KEY")
             if not kakao_api_key:
-                return {"text": "카카오 API 키가 설정되지 않았습니다.", "structured_data": None}
-
-            headers = {"Authorization": f"KakaoAK {kakao_api_key}"}
-            url = "https://dapi.kakao.com/v2/local/search/keyword.json"
-            params = {"query": kakao_query}
+                return "카카오 API 키가 설정되지 않았습니다.", None
 
             try:
-                response = requests.get(url, headers=headers, params=params)
-                data = response.json()
+                located = await locate_with_speculation(config, kakao_query, state.get("deadline"))
+                place = located["place"]
 
-                if not data.get("documents"):
-                    return {
-                        "text": f"'{kakao_query}' 위치를 찾을 수 없습니다.",
-                        "structured_data": None,
-                    }
+                if place is None:
+                    return f"'{kakao_query}' 위치를 찾을 수 없습니다.", None
 
-                place = data["documents"][0]
                 user_lat = float(place["y"])
                 user_lon = float(place["x"])
                 place_name = place["place_name"]
                 
                 location_desc = f"{place_name} ({location_type})"
-                print(f"[카카오 API] 장소 확인: {location_desc} ({user_lat}, {user_lon})")
+                logger.debug("[카카오 API] 장소 확인: %s (%s, %s)", location_desc, user_lat, user_lon)
 
+            except Overloaded:
+                return KAKAO_OVERLOADED_MESSAGE, None
             except Exception as e:
-                print(f"[카카오 API 오류] {e}")
-                return {
-                    "text": f"카카오 API 호출 중 오류가 발생했습니다: {str(e)}",
-                    "structured_data": None,
-                }
-            
-            api_time = time.time() - api_start
-            print(f"⏱️ [카카오 API 호출 시간] {api_time:.3f}초")
-            
-            # VectorDB 검색 (기존 로직)
-            vector_start = time.time()
-            all_data = vectorstore.get(where={"type": "shelter"})
-            vector_time = time.time() - vector_start
-            print(f"⏱️ [ChromaDB 검색 시간] {vector_time:.3f}초")
-            
-            # 거리 계산
-            calc_start = time.time()
-            def haversine(lat1, lon1, lat2, lon2):
-                R = 6371
-                dlat = radians(lat2 - lat1)
-                dlon = radians(lon2 - lon1)
-                a = (
-                    sin(dlat / 2) ** 2
-                    + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
-                )
-                c = 2 * atan2(sqrt(a), sqrt(1 - a))
-                return R * c
-
-            shelters = []
-
-            for metadata in all_data["metadatas"]:
-                try:
-                    lat = float(metadata.get("lat", 0))
-                    lon = float(metadata.get("lon", 0))
-                    if lat == 0 or lon == 0:
-                        continue
-
-                    distance = haversine(user_lat, user_lon, lat, lon)
-                    shelters.append(
-                        {
-                            "name": metadata.get("facility_name", "N/A"),
-                            "address": metadata.get("address", "N/A"),
-                            "lat": lat,
-                            "lon": lon,
-                            "distance": distance,
-                            "capacity": int(metadata.get("capacity", 0)),
-                            "shelter_type": metadata.get("shelter_type", "N/A"),
-                            "facility_type": metadata.get("facility_type", "N/A"),
-                        }
-                    )
-                except Exception:
-                    continue
+                logger.warning("[카카오 API 오류] %s", e)
+                return f"카카오 API 호출 중 오류가 발생했습니다: {str(e)}", None
 
-            # 거리순 정렬
-            shelters.sort(key=lambda x: x["distance"])
-            top_5 = shelters[:5]
+            top_5 = located["shelters"][:5]
 
             if not top_5:
-                return {
-                    "text": f"'{place_name}' 근처에 대피소를 찾을 수 없습니다.",
-                    "structured_data": None,
-                }
+                return f"'{place_name}' 근처에 대피소를 찾을 수 없습니다.", None
 
             # 텍스트 결과 포맷팅
             location_text = "지역" if location_type == "region" else "위치"
@@ -400,22 +613,20 @@ def create_langgraph_app(vectorstore):
                 "user_coordinates": [user_lat, user_lon],
                 "coordinates": [user_lat, user_lon],
                 "shelters": top_5,
-                "total_count": len(all_data["metadatas"]),
+                "total_count": located["total_count"],
             }
 
-            total_time = time.time() - start_time
-            print(f"⏱️ [search_shelter_by_location 총 시간] {total_time:.3f}초")
+            total_time = time.perf_counter() - start_time
+            logger.debug("⏱️ [search_shelter_by_location 총 시간] %.3f초", total_time)
             
-            return {"text": result_text.strip(), "structured_data": structured_data}
+            return result_text.strip(), structured_data
 
         except Exception as e:
-            print(f"[ERROR] search_shelter_by_location: {e}")
-            import traceback
-            traceback.print_exc()
-            return {"text": f"검색 중 오류 발생: {str(e)}", "structured_data": None}
+            logger.exception("[ERROR] search_shelter_by_location: %s", e)
+            return f"검색 중 오류 발생: {str(e)}", None
 
-    @tool
-    def count_shelters(query: str) -> dict:
+    @tool(response_format="content_and_artifact")
+    async def count_shelters(query: str, state: Annotated[dict, InjectedState]) -> Tuple[str, Optional[dict]]:
         """
         특정 조건(지역, 위치유형 등)에 맞는 대피소 개수를 셉니다.
         지도 표시용 구조화된 데이터를 포함합니다.
@@ -424,21 +635,20 @@ def create_langgraph_app(vectorstore):
             query: 검색 조건 (예: "서울 지하", "부산 민방위")
 
         Returns:
-            dict: {"text": str, "structured_data": dict} 형식
+            tuple: (응답 텍스트, 지도 표시용 structured_data) 형식
         """
         try:
-            # 쿼리 재정의
-            rewritten = query_rewrite_chain.invoke({"original_query": query})
-            print(f"[count_shelters] 재정의: {query} → {rewritten}")
+            # 쿼리 재정의 (query_rewrite_node 결과 재사용)
+            parsed = await resolve_rewritten_query(query, state)
+            rewritten = parsed["vector_query"] if parsed else query
+            logger.debug("[count_shelters] 재정의: %s → %s", query, rewritten)
 
             if shelter_hybrid is None:
-                return {
-                    "text": "검색 시스템이 초기화되지 않았습니다.",
-                    "structured_data": None,
-                }
+                return "검색 시스템이 초기화되지 않았습니다.", None
 
             # 1단계: VectorDB 전체에서 매칭되는 대피소 찾기 (전체 개수 카운트용)
-            all_data = vectorstore.get(where={"type": "shelter"})
+            with span("chroma.get_shelters"):
+                all_data = await asyncio.to_thread(vectorstore.get, where={"type": "shelter"})
             all_shelters = []
 
             # 검색 키워드 추출 (공백으로 분리)
@@ -471,7 +681,7 @@ def create_langgraph_app(vectorstore):
             total_count = len(all_shelters)
 
             # 2단계: 하이브리드 검색으로 상위 결과 추출 (지도 표시용)
-            results = shelter_hybrid.invoke(rewritten)
+            results = await shelter_hybrid.ainvoke(rewritten)
 
             # 중복 제거 및 대피소 정보 수집
             seen = set()
@@ -496,10 +706,7 @@ def create_langgraph_app(vectorstore):
                         break
 
             if total_count == 0:
-                return {
-                    "text": f"'{query}' 조건에 맞는 대피소를 찾을 수 없습니다.",
-                    "structured_data": None,
-                }
+                return f"'{query}' 조건에 맞는 대피소를 찾을 수 없습니다.", None
 
             # 중심 좌표 계산 (평균)
             display_shelters = top_shelters if top_shelters else all_shelters[:10]
@@ -523,124 +730,44 @@ def create_langgraph_app(vectorstore):
                 "total_count": total_count,  # VectorDB 전체 매칭 개수
             }
 
-            return {
-                "text": f"**'{query}'** 조건에 맞는 대피소는 총 **{total_count}개**입니다. 📊",
-                "structured_data": structured_data,
-            }
+            return f"**'{query}'** 조건에 맞는 대피소는 총 **{total_count}개**입니다. 📊", structured_data
 
         except Exception as e:
-            print(f"[ERROR] count_shelters: {e}")
-            import traceback
-
-            traceback.print_exc()
-            return {"text": f"검색 중 오류 발생: {str(e)}", "structured_data": None}
+            logger.exception("[ERROR] count_shelters: %s", e)
+            return f"검색 중 오류 발생: {str(e)}", None
 
-    @tool
-    def search_shelter_by_capacity(query: str) -> dict:
+    @tool(response_format="content_and_artifact")
+    async def search_shelter_by_capacity(query: str) -> Tuple[str, Optional[dict]]:
         """
         수용인원 기준으로 대피소를 검색합니다.
         위치 조건이 있으면 해당 지역 내에서만 검색합니다.
-        "이상"과 "이하"를 구분하여 필터링합니다.
+        "이상/이하/초과/미만"과 범위("500~1000명")를 구분하여 필터링합니다.
 
         Args:
-            query: 수용인원 조건 (예: "천 명 이상", "300명 이하", "서울 동작구 천명 이상")
+            query: 수용인원 조건 (예: "천 명 이상", "300명 이하", "서울 동작구 500~1000명")
 
         Returns:
-            dict: {"text": str, "structured_data": dict} 형식
+            tuple: (응답 텍스트, 지도 표시용 structured_data) 형식
         """
         try:
-            # 1단계: "이상" vs "이하" 판단
-            is_minimum = True  # 기본값: 이상
-            if "이하" in query:
-                is_minimum = False
-
-            # 2단계: 숫자 단위 먼저 처리 (천, 만)
-            capacity_value = 0
-
-            # "천명", "천 명", "1천명" 등 처리
-            if "천" in query or "1000" in query:
-                # 천 앞의 숫자 찾기
-                thousand_pattern = re.search(r"(\d+)\s*천", query)
-                if thousand_pattern:
-                    capacity_value = int(thousand_pattern.group(1)) * 1000
-                else:
-                    capacity_value = 1000  # 숫자 없이 "천명"만 있는 경우
-            elif "만" in query or "10000" in query:
-                # 만 앞의 숫자 찾기
-                ten_thousand_pattern = re.search(r"(\d+)\s*만", query)
-                if ten_thousand_pattern:
-                    capacity_value = int(ten_thousand_pattern.group(1)) * 10000
-                else:
-                    capacity_value = 10000  # 숫자 없이 "만명"만 있는 경우
-            else:
-                # 일반 숫자 추출
-                numbers = re.findall(r"\d+", query)
-                if numbers:
-                    capacity_value = int(numbers[0])
-
-            if capacity_value == 0:
-                return {
-                    "text": "수용인원을 명확히 입력해주세요. (예: 1000명 이상, 천명 이상)",
-                    "structured_data": None,
-                }
-
-            # 2단계: 위치 키워드 추출
-            location_query = query
-
-            # 수용인원 관련 부분 완전 제거
-            remove_patterns = [
-                r"\d+\s*천\s*명?\s*(이상|이하)?",  # "1천명 이상", "천명"
-                r"\d+\s*만\s*명?\s*(이상|이하)?",  # "1만명 이상", "만명"
-                r"\d+\s*명\s*(이상|이하)?",  # "53600명 이상", "1000명"
-                r"천\s*명?\s*(이상|이하)?",  # "천명 이상"
-                r"만\s*명?\s*(이상|이하)?",  # "만명 이상"
-                r"수용\s*인원\s*(이|가)?",  # "수용인원이", "수용인원"
-                r"수용\s*할?\s*수\s*있는",  # "수용할 수 있는"
-                r"수용\s*가능한?",  # "수용가능한"
-                r"최대\s*수용",  # "최대수용"
-                r"인원\s*(이|가|을|를)?",  # "인원이", "인원을"
-                r"대피소\s*(를|을|이|가)?",  # "대피소를", "대피소"
-                r"찾아\s*줘?",
-                r"알려\s*줘?",
-                r"있어\??",
-                r"있니\??",
-                r"있나요\??",
-            ]
-
-            for pattern in remove_patterns:
-                location_query = re.sub(
-                    pattern, " ", location_query, flags=re.IGNORECASE
-                )
-
-            # "에서", "의" 등 조사 제거
-            location_query = re.sub(r"\s*(에서|에|의|에서의)\s*", " ", location_query)
-
-            # 공백 정리
-            location_query = " ".join(location_query.split()).strip()
-
-            condition_text = "이상" if is_minimum else "이하"
-            print(
-                f"[search_shelter_by_capacity] 수용인원: {capacity_value}명 {condition_text}"
-            )
-            print(f"[search_shelter_by_capacity] 위치 필터: '{location_query}'")
-
-            # 모든 대피소 가져오기
-            all_data = vectorstore.get(where={"type": "shelter"})
+            # 1단계: 수용인원 조건 + 위치 키워드를 한 번의 토큰 순회로 파싱
+            capacity_query = parse_capacity_query(query)
+            if capacity_query.is_empty:
+                return "수용인원을 명확히 입력해주세요. (예: 1000명 이상, 천명 이상)", None
+
+            location_query = capacity_query.location
+            condition_text = capacity_query.describe()
+            logger.debug("[search_shelter_by_capacity] 수용인원: %s", condition_text)
+            logger.debug("[search_shelter_by_capacity] 위치 필터: '%s'", location_query)
+
+            # 2단계: 수용인원 인덱스에서 범위 조회 (내림차순) 후 위치 조건 체크
+            index = await get_capacity_index()
+            location_keywords = location_query.lower().split()
             shelters = []
 
-            for metadata in all_data["metadatas"]:
-                capacity = int(metadata.get("capacity", 0))
-
-                # 수용인원 조건 체크 (이상 vs 이하)
-                if is_minimum:
-                    if capacity < capacity_value:
-                        continue
-                else:
-                    if capacity > capacity_value:
-                        continue
-
+            for capacity, metadata in index.range(capacity_query):
                 # 위치 조건 체크 (위치 키워드가 있으면)
-                if location_query:
+                if location_keywords:
                     facility_name = metadata.get("facility_name", "").lower()
                     address = metadata.get("address", "").lower()
                     shelter_type = metadata.get("shelter_type", "").lower()
@@ -649,12 +776,7 @@ def create_langgraph_app(vectorstore):
                     search_text = f"{facility_name} {address} {shelter_type}"
 
                     # 위치 키워드의 모든 부분이 포함되어야 매칭
-                    location_keywords = location_query.split()
-                    if not all(
-                        keyword in search_text
-                        for keyword in location_keywords
-                        if keyword
-                    ):
+                    if not all(keyword in search_text for keyword in location_keywords):
                         continue
 
                 shelters.append(
@@ -669,23 +791,17 @@ def create_langgraph_app(vectorstore):
                     }
                 )
 
-            # 수용인원 내림차순 정렬
-            shelters.sort(key=lambda x: x["capacity"], reverse=True)
+            # 인덱스가 이미 수용인원 내림차순
             top_10 = shelters[:10]
 
             if not top_10:
                 location_text = (
                     f"'{location_query}' 지역에서 " if location_query else ""
                 )
-                condition_text = "이상" if is_minimum else "이하"
-                return {
-                    "text": f"{location_text}{capacity_value:,}명 {condition_text} 수용 가능한 대피소를 찾을 수 없습니다.",
-                    "structured_data": None,
-                }
+                return f"{location_text}{condition_text} 수용 가능한 대피소를 찾을 수 없습니다.", None
 
             location_text = f"**{location_query}** 지역 " if location_query else ""
-            condition_text = "이상" if is_minimum else "이하"
-            result = f"📊 {location_text}**{capacity_value:,}명 {condition_text}** 수용 가능한 대피소 **{len(shelters)}곳** 중 상위 10곳\n\n"
+            result = f"📊 {location_text}**{condition_text}** 수용 가능한 대피소 **{len(shelters)}곳** 중 상위 10곳\n\n"
             for i, s in enumerate(top_10, 1):
                 result += f"{i}. **{s['name']}** ({s['capacity']:,}명)\n"
                 result += f"   📍 {s['address']}\n"
@@ -707,26 +823,25 @@ def create_langgraph_app(vectorstore):
 
             structured_data = {
                 "location": (
-                    f"{location_query} {capacity_value:,}명 {condition_text}"
+                    f"{location_query} {condition_text}"
                     if location_query
-                    else f"{capacity_value:,}명 {condition_text} 수용 가능"
+                    else f"{condition_text} 수용 가능"
                 ),
                 "coordinates": (avg_lat, avg_lon) if avg_lat != 0 else None,
                 "shelters": top_10,
                 "total_count": len(shelters),
             }
 
-            return {"text": result.strip(), "structured_data": structured_data}
+            return result.strip(), structured_data
 
         except Exception as e:
-            print(f"[ERROR] search_shelter_by_capacity: {e}")
-            import traceback
-
-            traceback.print_exc()
-            return {"text": f"검색 중 오류 발생: {str(e)}", "structured_data": None}
+            logger.exception("[ERROR] search_shelter_by_capacity: %s", e)
+            return f"검색 중 오류 발생: {str(e)}", None
 
-    @tool
-    def search_disaster_guideline(query: str) -> dict:
+    @tool(response_format="content_and_artifact")
+    async def search_disaster_guideline(
+        query: str, state: Annotated[dict, InjectedState]
+    ) -> Tuple[str, Optional[dict]]:
         """
         재난 행동요령을 검색합니다.
 
@@ -734,142 +849,49 @@ def create_langgraph_app(vectorstore):
             query: 재난 유형 (예: "지진", "화재", "산사태")
 
         Returns:
-            dict: {"text": str, "structured_data": None} 형식
+            tuple: (응답 텍스트, None) 형식
         """
         try:
-            # 쿼리 재정의
-            rewritten = query_rewrite_chain.invoke({"original_query": query})
-            print(f"[search_disaster_guideline] 재정의: {query} → {rewritten}")
-
-            # ⭐ 재난 키워드 매핑 (사용자 입력 → VectorDB 저장명)
-            disaster_keyword_mapping = {
-            # 기상 재난 - 비 관련 (단계별 구분)
-            "비": "호우",
-            "폭우": "호우",
-            "집중호우": "호우",
-            "장마": "호우",
-            "게릴라성 호우": "호우",
-            "많은 비": "호우",
-            "강한 비": "호우",
-            
-            # 기상 재난 - 물 관련
-            "홍수": "홍수",
-            "침수": "홍수",
-            "범람": "홍수",
-            "강물이 넘쳤": "홍수",
-            "물이 넘쳤": "홍수",
-            "물난리": "홍수",
-            "수해": "홍수",
-            
-            # 기상 재난 - 바람/태풍
-            "태풍": "태풍",
-            "강풍": "태풍",
-            "돌풍": "태풍",
-            "폭풍": "태풍",
-            
-            # 지질 재난 - 지진 관련
-            "지진": "지진",
-            "진동": "지진",
-            "땅이 흔들": "지진",
-            "여진": "지진",
-            
-            # 지질 재난 - 해양
-            "쓰나미": "지진해일",
-            "해일": "지진해일",
-            "지진해일": "지진해일",
-            "해안 침수": "지진해일",
-            
-            # 지질 재난 - 산사태
-            "산사태": "산사태",
-            "토석류": "산사태",
-            "산 무너짐": "산사태",
-            "산 붕괴": "산사태",
-            "낙석": "산사태",
-            "사면 붕괴": "산사태",
-            
-            # 화재 재난
-            "화재": "화재",
-            "불": "화재",
-            "화염": "화재",
-            "연기": "화재",
-            "산불": "산불",
-            "산에 불": "산불",
-            "산림 화재": "산불",
-            "들불": "산불",
-            
-            # 폭발/가스
-            "폭발": "폭발",
-            "가스": "가스",
-            "가스 누출": "가스",
-            "가스 폭발": "폭발",
-            
-            # 화산 재난
-            "화산": "화산폭발",
-            "화산 폭발": "화산폭발",
-            "화산재": "화산재",
-            "분화": "화산폭발",
-            
-            # 방사능
-            "방사능": "방사능",
-            "방사선": "방사능",
-            "핵": "방사능",
-            "원전": "방사능",
-            
-            # 붕괴 재난
-            "붕괴": "댐붕괴",
-            "댐 붕괴": "댐붕괴",
-            "댐 터짐": "댐붕괴",
-            }
-
-            # 사용자 입력에서 재난 키워드 추출
+            # ⭐ 재난 키워드 추출 (사용자 입력 → VectorDB 저장명, 가장 긴 키워드 우선)
             detected_keyword = None
             detected_disaster = None
 
-            for keyword, mapped_name in disaster_keyword_mapping.items():
-                if keyword in query.lower():
-                    detected_keyword = keyword  # 사용자 입력 원본
-                    detected_disaster = mapped_name  # VectorDB 검색용
-                    break
+            match = DISASTER_MATCHER.best(query)
+            if match:
+                detected_keyword = match.keyword  # 사용자 입력 원본
+                detected_disaster = match.value  # VectorDB 검색용
 
             if not detected_disaster:
-                # 매핑 실패 시 재정의된 쿼리 그대로 사용
+                # 매핑 실패 시에만 쿼리 재정의 (query_rewrite_node 결과 재사용) 후 그대로 사용
+                parsed = await resolve_rewritten_query(query, state)
+                rewritten = parsed["vector_query"] if parsed else query
+                logger.debug("[search_disaster_guideline] 재정의: %s → %s", query, rewritten)
                 detected_disaster = rewritten
                 detected_keyword = query
 
-            print(f"[search_disaster_guideline] 검색 키워드: '{detected_disaster}' (입력: '{detected_keyword}')")
+            logger.debug("[search_disaster_guideline] 검색 키워드: '%s' (입력: '%s')", detected_disaster, detected_keyword)
 
-            # ⭐ VectorDB에서 keyword 필드로 정확히 필터링 ($and 연산자 사용)
-            all_data = vectorstore.get(
-                where={
-                    "$and": [  # 논리 연산자로 감싸기
-                        {"type": "disaster_guideline"},
-                        {"keyword": detected_disaster}
-                    ]
-                }
-            )
+            # ⭐ 적재 시 만들어 둔 답변 카드 조회 (데이터 재적재로 버전이 바뀌었을 때만 다시 로드)
+            if guideline_cards.is_stale():
+                with span("chroma.guideline_refresh"):
+                    await asyncio.to_thread(guideline_cards.refresh, vectorstore)
+            card = guideline_cards.lookup(detected_disaster, query)
 
-            if not all_data or not all_data.get("documents"):
-                return {
-                    "text": f"'{detected_keyword}' 관련 행동요령을 찾을 수 없습니다.",
-                    "structured_data": None,
-                }
+            if card is None:
+                return f"'{detected_keyword}' 관련 행동요령을 찾을 수 없습니다.", None
 
-            # 상위 3개 결과 통합
-            combined = "\n\n".join(all_data["documents"][:3])
+            combined = card["text"]
+            if card["situation"] != ALL_SITUATIONS:
+                logger.debug("[search_disaster_guideline] 상황/조건별 카드: %s (%s)", card["situation"], card["title"])
 
-            return {
-                "text": f"🚨 **{detected_keyword} 행동요령**\n\n{combined}",
-                "structured_data": None,
-            }
+            return f"🚨 **{detected_keyword} 행동요령**\n\n{combined}", None
 
         except Exception as e:
-            print(f"[ERROR] search_disaster_guideline: {e}")
-            import traceback
-            traceback.print_exc()
-            return {"text": f"검색 중 오류 발생: {str(e)}", "structured_data": None}
+            logger.exception("[ERROR] search_disaster_guideline: %s", e)
+            return f"검색 중 오류 발생: {str(e)}", None
 
-    @tool
-    def answer_general_knowledge(query: str) -> dict:
+    @tool(response_format="content_and_artifact")
+    async def answer_general_knowledge(query: str) -> Tuple[str, Optional[dict]]:
         """
         재난 관련 일반 지식 질문에 답변합니다. (정의, 원인, 특징 등)
         VectorDB에 없는 정보는 LLM의 사전 학습 지식을 활용합니다.
@@ -878,39 +900,33 @@ def create_langgraph_app(vectorstore):
             query: 일반 지식 질문 (예: "지진이 뭐야", "쓰나미란")
 
         Returns:
-            dict: {"text": str, "structured_data": None} 형식
+            tuple: (응답 텍스트, None) 형식
         """
         try:
-            print(f"[answer_general_knowledge] 질문: {query}")
-
-            # LLM에게 직접 질문 (사전 학습 지식 활용)
-            prompt = f"""당신은 재난 안전 전문가입니다.
-다음 질문에 정확하고 간결하게 답변하세요.
+            logger.debug("[answer_general_knowledge] 질문: %s", query)
 
-질문: {query}
+            # FAQ 저장소 조회 (검수된 FAQ + 이전 생성 답변, 적중하면 LLM 호출 생략)
+            vector = None
+            if faq_store is not None:
+                entry, vector = await faq_store.alookup(query)
+                if entry is not None:
+                    return f"💡 **{query}**\n\n{entry['answer']}", None
 
-답변 형식:
-- 핵심 정의를 2-3문장으로 설명
-- 주요 특징이나 원인을 불릿 포인트로 정리
-- 전문 용어는 쉽게 풀어서 설명
-- 최대 200자 이내로 간결하게"""
+            # LLM에게 직접 질문 (사전 학습 지식 활용)
+            response = await general_knowledge_chain.ainvoke({"query": query})
 
-            response = llm_creative.invoke([HumanMessage(content=prompt)])
+            # 생성한 답변을 저장소에 기록 (다음 같은/비슷한 질문은 저장소에서 응답)
+            if faq_store is not None:
+                await faq_store.astore(query, response.content, vector)
 
-            return {
-                "text": f"💡 **{query}**\n\n{response.content}",
-                "structured_data": None,  # 일반 지식은 위치 정보 없음
-            }
+            return f"💡 **{query}**\n\n{response.content}", None  # 일반 지식은 위치 정보 없음
 
         except Exception as e:
-            print(f"[ERROR] answer_general_knowledge: {e}")
-            return {
-                "text": "죄송합니다. 답변 생성 중 오류가 발생했습니다.",
-                "structured_data": None,
-            }
+            logger.exception("[ERROR] answer_general_knowledge: %s", e)
+            return "죄송합니다. 답변 생성 중 오류가 발생했습니다.", None
 
-    @tool
-    def search_shelter_by_name(query: str) -> dict:
+    @tool(response_format="content_and_artifact")
+    async def search_shelter_by_name(query: str) -> Tuple[str, Optional[dict]]:
         """
         특정 대피소의 상세 정보를 시설명으로 검색합니다.
         위치 조건이 있으면 해당 지역 내에서만 검색합니다.
@@ -921,14 +937,14 @@ def create_langgraph_app(vectorstore):
             query: 대피소 시설명 (예: "동대문맨션", "제주도 동아아파트", "서울 롯데월드")
 
         Returns:
-            dict: {"text": str, "structured_data": dict} 형식
+            tuple: (응답 텍스트, 지도 표시용 structured_data) 형식
 
         Examples:
             - "동대문맨션 수용인원" → search_shelter_by_name("동대문맨션")
             - "제주도 동아아파트 정보" → search_shelter_by_name("제주도 동아아파트")
         """
         try:
-            print(f"[search_shelter_by_name] 검색 시작: '{query}'")
+            logger.debug("[search_shelter_by_name] 검색 시작: '%s'", query)
 
             # 1단계: 위치와 시설명 분리
             original_query = query.strip().lower()
@@ -1008,10 +1024,8 @@ def create_langgraph_app(vectorstore):
             for loc in location_keywords:
                 if loc in original_query:
                     location_filter = loc
-                    print(f"[DEBUG] 위치 키워드 '{loc}' 매칭됨")
                     break
 
-            print(f"[DEBUG] 최종 location_filter: '{location_filter}'")
 
             # 2단계: 검색어 정제 (불필요한 단어 제거)
             search_term = original_query
@@ -1051,11 +1065,12 @@ def create_langgraph_app(vectorstore):
                 " ".join(search_term.split()).strip().lower()
             )  # 소문자 변환 추가
 
-            print(f"[search_shelter_by_name] 정제된 검색어: '{search_term}'")
-            print(f"[search_shelter_by_name] 위치 필터: '{location_filter}'")
+            logger.debug("[search_shelter_by_name] 정제된 검색어: '%s'", search_term)
+            logger.debug("[search_shelter_by_name] 위치 필터: '%s'", location_filter)
 
             # VectorStore에서 shelter 타입 문서 가져오기
-            all_data = vectorstore.get(where={"type": "shelter"})
+            with span("chroma.get_shelters"):
+                all_data = await asyncio.to_thread(vectorstore.get, where={"type": "shelter"})
 
             # 3단계: 시설명 매칭 (부분 일치)
             matches = []
@@ -1089,8 +1104,12 @@ def create_langgraph_app(vectorstore):
                         )
 
                         if match_attempt <= 3:
-                            print(
-                                f"[DEBUG] 시설명 매칭: '{facility_name}', 주소: '{address[:30]}...', filter_lower: '{filter_lower}', filter_core: '{filter_core}', 포함여부: {filter_core in address}"
+                            logger.debug(
+                                "[search_shelter_by_name] 시설명 매칭: '%s', 주소: '%s...', filter_core: '%s', 포함여부: %s",
+                                facility_name,
+                                address[:30],
+                                filter_core,
+                                filter_core in address,
                             )
 
                         if filter_core not in address:
@@ -1109,18 +1128,13 @@ def create_langgraph_app(vectorstore):
                             "distance": 0,  # 시설명 검색은 거리 정보 없음
                         }
                     )
-                    print(
-                        f"[search_shelter_by_name] 매칭됨: {facility_name} ({metadata.get('address', 'N/A')})"
-                    )
+                    logger.debug("[search_shelter_by_name] 매칭됨: %s (%s)", facility_name, metadata.get("address", "N/A"))
 
-            print(f"[DEBUG] 총 매칭된 대피소 개수: {len(matches)}")
+            logger.debug("[search_shelter_by_name] 매칭된 대피소: %d개", len(matches))
 
             if not matches:
                 location_text = f"{location_filter} " if location_filter else ""
-                return {
-                    "text": f"❌ '{location_text}{search_term}' 시설을 찾을 수 없습니다.\n시설명을 정확히 입력해주세요.",
-                    "structured_data": None,
-                }
+                return f"❌ '{location_text}{search_term}' 시설을 찾을 수 없습니다.\n시설명을 정확히 입력해주세요.", None
 
             # 결과 반환
             if len(matches) == 1:
@@ -1141,11 +1155,10 @@ def create_langgraph_app(vectorstore):
                     "total_count": 1,
                 }
 
-                return {"text": text, "structured_data": structured_data}
+                return text, structured_data
 
             else:
                 # 여러 개 발견 시
-                print(f"[DEBUG] 여러 개 발견 분기 진입: {len(matches)}개")
                 text = (
                     f"📍 **'{search_term}'** 관련 대피소 **{len(matches)}곳** 발견\n\n"
                 )
@@ -1179,17 +1192,16 @@ def create_langgraph_app(vectorstore):
                     "total_count": len(matches),
                 }
 
-                return {"text": text.strip(), "structured_data": structured_data}
+                return text.strip(), structured_data
 
         except Exception as e:
-            print(f"[ERROR] search_shelter_by_name: {e}")
-            import traceback
-
-            traceback.print_exc()
-            return {"text": f"❌ 검색 중 오류 발생: {str(e)}", "structured_data": None}
+            logger.exception("[ERROR] search_shelter_by_name: %s", e)
+            return f"❌ 검색 중 오류 발생: {str(e)}", None
 
-    @tool
-    def search_location_with_disaster(query: str) -> dict:
+    @tool(response_format="content_and_artifact")
+    async def search_location_with_disaster(
+        query: str, state: Annotated[dict, InjectedState], config: RunnableConfig
+    ) -> Tuple[str, Optional[dict]]:
         """
         특정 위치에서 재난 발생 시 대피소와 행동요령을 함께 제공합니다.
         위치 기반 대피소 검색 + 재난 행동요령을 통합하여 반환합니다.
@@ -1199,243 +1211,157 @@ def create_langgraph_app(vectorstore):
             query: 위치 + 재난 상황 (예: "설악산 근처 산사태", "강남역에서 지진")
 
         Returns:
-            dict: {"text": str, "structured_data": dict} 형식
+            tuple: (응답 텍스트, 지도 표시용 structured_data) 형식
 
         Examples:
             - "설악산 근처인데 산사태 발생 시" → 설악산 대피소 + 산사태 행동요령
             - "명동에서 지진 나면" → 명동 대피소 + 지진 행동요령
         """
         try:
-            print(f"[search_location_with_disaster] 복합 질문 처리: {query}")
-
-           # 1단계: 재난 유형 감지
-            # 키워드 매핑: 사용자 입력 → VectorDB 저장명
-            disaster_keyword_mapping = {
-            # 기상 재난 - 비 관련 (단계별 구분)
-            "비": "호우",
-            "폭우": "호우",
-            "집중호우": "호우",
-            "장마": "호우",
-            "게릴라성 호우": "호우",
-            "많은 비": "호우",
-            "강한 비": "호우",
-            
-            # 기상 재난 - 물 관련
-            "홍수": "홍수",
-            "침수": "홍수",
-            "범람": "홍수",
-            "강물이 넘쳤": "홍수",
-            "물이 넘쳤": "홍수",
-            "물난리": "홍수",
-            "수해": "홍수",
-            
-            # 기상 재난 - 바람/태풍
-            "태풍": "태풍",
-            "강풍": "태풍",
-            "돌풍": "태풍",
-            "폭풍": "태풍",
-            
-            # 지질 재난 - 지진 관련
-            "지진": "지진",
-            "진동": "지진",
-            "땅이 흔들": "지진",
-            "여진": "지진",
-            
-            # 지질 재난 - 해양
-            "쓰나미": "지진해일",
-            "해일": "지진해일",
-            "지진해일": "지진해일",
-            "해안 침수": "지진해일",
-            
-            # 지질 재난 - 산사태
-            "산사태": "산사태",
-            "토석류": "산사태",
-            "산 무너짐": "산사태",
-            "산 붕괴": "산사태",
-            "낙석": "산사태",
-            "사면 붕괴": "산사태",
-            
-            # 화재 재난
-            "화재": "화재",
-            "불": "화재",
-            "화염": "화재",
-            "연기": "화재",
-            "산불": "산불",
-            "산에 불": "산불",
-            "산림 화재": "산불",
-            "들불": "산불",
-            
-            # 폭발/가스
-            "폭발": "폭발",
-            "가스": "가스",
-            "가스 누출": "가스",
-            "가스 폭발": "폭발",
-            
-            # 화산 재난
-            "화산": "화산폭발",
-            "화산 폭발": "화산폭발",
-            "화산재": "화산재",
-            "분화": "화산폭발",
-            
-            # 방사능
-            "방사능": "방사능",
-            "방사선": "방사능",
-            "핵": "방사능",
-            "원전": "방사능",
-            
-            # 붕괴 재난
-            "붕괴": "댐붕괴",
-            "댐 붕괴": "댐붕괴",
-            "댐 터짐": "댐붕괴",
-            }
+            logger.debug("[search_location_with_disaster] 복합 질문 처리: %s", query)
 
+            # 1단계: 재난 유형 감지 (가장 긴 키워드 우선, 키워드 구간을 잘라 위치 부분 추출)
             detected_disaster = None
             detected_keyword = None  # 사용자가 입력한 키워드
             location_query = query
 
-            for keyword, mapped_name in disaster_keyword_mapping.items():
-                if keyword in query:
-                    detected_keyword = keyword  # 원본 키워드
-                    detected_disaster = mapped_name  # VectorDB 검색용
-                    location_query = location_query.replace(keyword, "")
-                    break
+            match = DISASTER_MATCHER.best(query)
+            if match:
+                detected_keyword = match.keyword  # 원본 키워드
+                detected_disaster = match.value  # VectorDB 검색용
+                location_query = DISASTER_MATCHER.remove_spans(query, [match])
 
             # "발생", "나면", "났을 때" 등 제거
-            for word in ["발생", "발생하면", "발생 시", "났을 때", "나면", "때", "근처인데", "에서", "어떻게", "대처", "행동요령"]:
+            disaster_filler_words = ["발생", "발생하면", "발생 시", "났을 때", "나면", "때", "근처인데", "에서", "어떻게", "대처", "행동요령"]
+            for word in disaster_filler_words:
                 location_query = location_query.replace(word, "")
 
             location_query = location_query.strip()
             
             if not detected_disaster:
-                return {
-                    "text": "재난 유형을 파악할 수 없습니다. 예: '설악산 산사태', '강남역 지진', '양양 쓰나미'",
-                    "structured_data": None,
-                }
+                return "재난 유형을 파악할 수 없습니다. 예: '설악산 산사태', '강남역 지진', '양양 쓰나미'", None
 
-            print(f"[search_location_with_disaster] 위치: '{location_query}', 재난: '{detected_disaster}' (입력: '{detected_keyword}')")
+            logger.debug(
+                "[search_location_with_disaster] 위치: '%s', 재난: '%s' (입력: '%s')",
+                location_query,
+                detected_disaster,
+                detected_keyword,
+            )
 
 
-            # 2단계: 질문 재정의로 위치 유형 판단 (search_shelter_by_location과 동일)
-            rewritten = query_rewrite_chain.invoke({"original_query": location_query})
-            
-            kakao_query = location_query
-            location_type = "specific"
-            
-            try:
-                import json
-                parsed = json.loads(rewritten)
-                kakao_query = parsed.get("kakao", location_query)
-                vector_query = parsed.get("vector", location_query)
-                location_type = parsed.get("location_type", "specific")
-                
-                print(f"[search_location_with_disaster] 위치 유형: {location_type}")
-                print(f"[search_location_with_disaster] 카카오용: '{kakao_query}'")
-                print(f"[search_location_with_disaster] Vector용: '{vector_query}'")
-                
-            except:
-                # JSON 파싱 실패 시 기존 정제 로직
-                remove_words = ["근처", "주변", "인근", "대피소", "피난소", "피난처"]
-                for word in remove_words:
-                    kakao_query = kakao_query.replace(word, "")
-                kakao_query = " ".join(kakao_query.split()).strip()
+            # 위치 처리 체인 (재정의 → 카카오 좌표 → 가까운 대피소)과 행동요령 검색은 서로 독립
+            # → 두 갈래를 동시에 실행하고 결과만 합침
+            async def resolve_location() -> dict:
+                """2~4단계: 위치 유형 판단 → 좌표 검색 → 근처 대피소 (실패 시 {"error": 메시지})"""
+                # 2단계: 질문 재정의로 위치 유형 판단 (query_rewrite_node 결과 재사용)
+                parsed = await resolve_rewritten_query(location_query, state, argument=query)
 
-            print(f"[search_location_with_disaster] 최종 카카오 검색어: '{kakao_query}' ({location_type})")
+                kakao_query = location_query
+                location_type = "specific"
 
-            # 3단계: 카카오 API로 좌표 검색 (search_shelter_by_location과 동일)
-            kakao_api_key = os.getenv("KAKAO_REST_API_KEY")
-            if not kakao_api_key:
-                return {"text": "카카오 API 키가 설정되지 않았습니다.", "structured_data": None}
+                if parsed:
+                    # 전체 문장을 재정의한 결과이므로 재난 키워드가 남아 있으면 제거
+                    kakao_query = parsed["kakao_query"]
+                    if detected_keyword:
+                        kakao_query = kakao_query.replace(detected_keyword, "")
+                    for word in disaster_filler_words:
+                        kakao_query = kakao_query.replace(word, "")
+                    kakao_query = " ".join(kakao_query.split()).strip() or location_query
+                    vector_query = parsed["vector_query"]
+                    location_type = parsed["location_type"]
+
+                    logger.debug("[search_location_with_disaster] 위치 유형: %s", location_type)
+                    logger.debug("[search_location_with_disaster] 카카오용: '%s'", kakao_query)
+                    logger.debug("[search_location_with_disaster] Vector용: '%s'", vector_query)
 
-            headers = {"Authorization": f"KakaoAK {kakao_api_key}"}
-            url = "https://dapi.kakao.com/v2/local/search/keyword.json"
-            params = {"query": kakao_query}
+                else:
+                    # JSON 파싱 실패 시 기존 정제 로직
+                    remove_words = ["근처", "주변", "인근", "대피소", "피난소", "피난처"]
+                    for word in remove_words:
+                        kakao_query = kakao_query.replace(word, "")
+                    kakao_query = " ".join(kakao_query.split()).strip()
 
-            try:
-                response = requests.get(url, headers=headers, params=params)
-                data = response.json()
+                logger.debug("[search_location_with_disaster] 최종 카카오 검색어: '%s' (%s)", kakao_query, location_type)
 
-                if not data.get("documents"):
-                    return {
-                        "text": f"'{kakao_query}' 위치를 찾을 수 없습니다.",
-                        "structured_data": None,
-                    }
+                # 3단계: 카카오 API로 좌표 검색 (search_shelter_by_location과 동일)
+                kakao_api_key = os.getenv("KAKAO_REST_API_KEY")
+                if not kakao_api_key:
+                    return {"error": "카카오 API 키가 설정되지 않았습니다."}
 
-                place = data["documents"][0]
-                user_lat = float(place["y"])
-                user_lon = float(place["x"])
-                place_name = place["place_name"]
-                
-                location_desc = f"{place_name} ({location_type})"
-                print(f"[search_location_with_disaster] 장소 확인: {location_desc} ({user_lat}, {user_lon})")
+                try:
+                    located = await locate_with_speculation(config, kakao_query, state.get("deadline"))
+                    place = located["place"]
 
-            except Exception as e:
-                print(f"[search_location_with_disaster] 카카오 API 오류: {e}")
-                return {
-                    "text": f"카카오 API 호출 중 오류가 발생했습니다: {str(e)}",
-                    "structured_data": None,
-                }
+                    if place is None:
+                        return {"error": f"'{kakao_query}' 위치를 찾을 수 없습니다."}
 
-            # 4단계: 근처 대피소 검색 (거리 계산)
-            def haversine(lat1, lon1, lat2, lon2):
-                from math import radians, sin, cos, sqrt, atan2
-                R = 6371
-                dlat = radians(lat2 - lat1)
-                dlon = radians(lon2 - lon1)
-                a = (
-                    sin(dlat / 2) ** 2
-                    + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
-                )
-                c = 2 * atan2(sqrt(a), sqrt(1 - a))
-                return R * c
+                    user_lat = float(place["y"])
+                    user_lon = float(place["x"])
+                    place_name = place["place_name"]
 
-            all_data = vectorstore.get(where={"type": "shelter"})
-            shelters = []
+                    location_desc = f"{place_name} ({location_type})"
+                    logger.debug("[search_location_with_disaster] 장소 확인: %s (%s, %s)", location_desc, user_lat, user_lon)
 
-            for metadata in all_data["metadatas"]:
-                try:
-                    lat = float(metadata.get("lat", 0))
-                    lon = float(metadata.get("lon", 0))
-                    if lat == 0 or lon == 0:
-                        continue
+                except Overloaded:
+                    return {"error": KAKAO_OVERLOADED_MESSAGE}
+                except Exception as e:
+                    logger.warning("[search_location_with_disaster] 카카오 API 오류: %s", e)
+                    return {"error": f"카카오 API 호출 중 오류가 발생했습니다: {str(e)}"}
 
-                    distance = haversine(user_lat, user_lon, lat, lon)
-                    shelters.append(
-                        {
-                            "name": metadata.get("facility_name", "N/A"),
-                            "address": metadata.get("address", "N/A"),
-                            "lat": lat,
-                            "lon": lon,
-                            "distance": distance,
-                            "capacity": int(metadata.get("capacity", 0)),
-                            "shelter_type": metadata.get("shelter_type", "N/A"),
-                            "facility_type": metadata.get("facility_type", "N/A"),
-                        }
-                    )
-                except Exception:
-                    continue
+                # 4단계: 근처 대피소 (가장 가까운 3곳만)
+                top_3 = located["shelters"][:3]
 
-            shelters.sort(key=lambda x: x["distance"])
-            top_3 = shelters[:3]  # 가장 가까운 3곳만
+                if not top_3:
+                    return {"error": f"'{place_name}' 근처에 대피소를 찾을 수 없습니다."}
 
-            if not top_3:
                 return {
-                    "text": f"'{place_name}' 근처에 대피소를 찾을 수 없습니다.",
-                    "structured_data": None,
+                    "place_name": place_name,
+                    "location_type": location_type,
+                    "user_lat": user_lat,
+                    "user_lon": user_lon,
+                    "shelters": top_3,
+                    "total_count": located["total_count"],
                 }
 
-            # 5단계: 재난 행동요령 검색
-            guideline_text = ""
-            if guideline_hybrid:
+            async def fetch_guideline_text() -> str:
+                """5단계: 재난 행동요령 검색 (재난 유형에만 의존)"""
+                # 조건별 색인에서 "발생 시" 조각 2개 (질문에 장소/대상/시점이 있으면 그 조건 우선)
+                if guideline_cards.is_stale():
+                    with span("chroma.guideline_refresh"):
+                        await asyncio.to_thread(guideline_cards.refresh, vectorstore)
+                card = guideline_cards.lookup(detected_disaster, query, limit=2, default_phase="during")
+                if card is not None:
+                    logger.debug("[search_location_with_disaster] 행동요령 색인 조각: %s (%d개)", card["situation"], len(card["paths"]))
+                    return card["text"]
+
+                # 색인에 없는 재난 유형만 하이브리드 검색
+                if not guideline_hybrid:
+                    return ""
                 try:
-                    guideline_results = guideline_hybrid.invoke(detected_disaster)
+                    guideline_results = await guideline_hybrid.ainvoke(detected_disaster)
                     if guideline_results:
                         # 상위 2개 결과만 사용 (간결하게)
-                        guideline_text = "\n\n".join(
+                        return "\n\n".join(
                             [doc.page_content for doc in guideline_results[:2]]
                         )
+                    return ""
                 except Exception as e:
-                    print(f"[search_location_with_disaster] 가이드라인 검색 실패: {e}")
-                    guideline_text = f"{detected_disaster} 관련 행동요령을 찾을 수 없습니다."
+                    logger.warning("[search_location_with_disaster] 가이드라인 검색 실패: %s", e)
+                    return f"{detected_disaster} 관련 행동요령을 찾을 수 없습니다."
+
+            parallel_start = time.perf_counter()
+            location, guideline_text = await asyncio.gather(
+                resolve_location(), fetch_guideline_text()
+            )
+            logger.debug("⏱️ [search_location_with_disaster 병렬 처리 시간] %.3f초", time.perf_counter() - parallel_start)
+
+            if "error" in location:
+                return location["error"], None
+
+            place_name = location["place_name"]
+            location_type = location["location_type"]
+            user_lat, user_lon = location["user_lat"], location["user_lon"]
+            top_3 = location["shelters"]
 
             ## 6단계: 통합 결과 생성
             location_text = "지역" if location_type == "region" else "위치"
@@ -1472,19 +1398,14 @@ def create_langgraph_app(vectorstore):
                 "user_coordinates": [user_lat, user_lon],  # 사용자 위치 (길찾기용)
                 "coordinates": [user_lat, user_lon],
                 "shelters": top_3,
-                "total_count": len(all_data["metadatas"]),
+                "total_count": location["total_count"],
             }
 
-            return {"text": result.strip(), "structured_data": structured_data}
+            return result.strip(), structured_data
 
         except Exception as e:
-            print(f"[ERROR] search_location_with_disaster: {e}")
-            import traceback
-            traceback.print_exc()
-            return {
-                "text": f"복합 검색 중 오류 발생: {str(e)}",
-                "structured_data": None,
-            }
+            logger.exception("[ERROR] search_location_with_disaster: %s", e)
+            return f"복합 검색 중 오류 발생: {str(e)}", None
 
     # 6. Tools 리스트
     tools = [
@@ -1497,205 +1418,285 @@ def create_langgraph_app(vectorstore):
         search_location_with_disaster,
     ]
 
-    # 7. LLM에 Tools 바인딩
+    # 7. LLM에 Tools 바인딩 + 도구 실행기 (요청마다 만들지 않고 공유)
     llm_with_tools = llm.bind_tools(tools)
+    tool_node = ToolNode(tools)
 
     # 8. State 정의
     class AgentState(TypedDict):
         messages: Annotated[list[BaseMessage], add_messages]
         intent: str
         rewritten_query: str
+        kakao_query: Optional[str]  # 카카오 API용 재정의 쿼리 (도구에서 재사용)
+        location_type: Optional[str]  # "specific" 또는 "region"
+        intent_confidence: float  # 의도분류 신뢰도 (직접 도구 실행 판단용)
         structured_data: Optional[dict]  # 지도 표시용 구조화된 데이터
+        deadline: Optional[float]  # 요청 마감 시각 (time.monotonic 기준)
+        agent_iterations: int  # 이번 요청에서 에이전트 노드 실행 횟수
+        tool_calls_used: int  # 이번 요청에서 실행한 도구 호출 수
+        budget_exhausted: Optional[str]  # 예산 소진 사유 (deadline / max_iterations / max_tool_calls)
 
-    # 9. 시스템 프롬프트
-    SYSTEM_PROMPT = """당신은 대한민국의 재난 안전 전문 AI 도우미입니다.
-
-**핵심 원칙**:
-1. **정확성 우선**: 제공된 도구 결과만 사용하고, 없는 정보는 지어내지 마세요
-2. **의도 파악**: 사용자 질문의 의도를 정확히 분류하고 적절한 도구를 선택하세요
-3. **복합 질문 처리**: 여러 의도가 섞인 질문은 순차적으로 처리하세요
-
-**도구 선택 가이드**:
-- 위치 + 재난 복합 질문 → search_location_with_disaster
-   - "설악산 근처인데 산사태 발생 시" → search_location_with_disaster("설악산 산사태")
-   - "강남역에서 지진 나면" → search_location_with_disaster("강남역 지진")
-   - "명동 화재 났을 때" → search_location_with_disaster("명동 화재")
-   
-- 특정 시설명이 포함된 질문 → search_shelter_by_name
-   - "동대문맨션 수용인원" → search_shelter_by_name("동대문맨션")
-   - "서울역 대피소 정보" → search_shelter_by_name("서울역")
-   
-- "근처", "주변" 키워드만 → search_shelter_by_location
-   - "강남역 근처 대피소" → search_shelter_by_location("강남역")
-   - "명동 주변 피난소" → search_shelter_by_location("명동")
-
-- "X명 이상/이하" 조건 → search_shelter_by_capacity
-   - "1000명 이상 수용 가능한 대피소" → search_shelter_by_capacity("1000명 이상")
-
-- "개수", "몇 개" → count_shelters
-   - "서울 지하 대피소 몇 개?" → count_shelters("서울 지하")
-
-- 재난 행동요령만 → search_disaster_guideline
-   - "지진 발생 시 행동요령" → search_disaster_guideline("지진")
-   - (위치 정보 없이 행동요령만 필요한 경우)
-
-- 재난 일반 지식 → answer_general_knowledge
-   - "지진이 뭐야?" → answer_general_knowledge("지진이 뭐야")
-
-**중요 판단 기준**:
-- 질문에 "위치 + 재난"이 함께 있으면 → search_location_with_disaster
-- 질문에 "시설명 + 정보 요청"이 있으면 → search_shelter_by_name
-- 질문에 "위치 + 근처/주변"만 있으면 → search_shelter_by_location
-
-**응답 형식**:
-- 구체적이고 실용적인 정보 제공
-- 중요 정보는 **볼드체** 강조
-- 숫자는 쉼표 구분 (1,000명)
-- 이모지 적절히 활용 (📍🚨💡📊)
-"""
+    # 9. 시스템 프롬프트 (정적 접두사 - 매 호출 동일)
+    system_message = SystemMessage(content=AGENT_SYSTEM_PROMPT)
+    system_prompt_tokens = count_message_tokens([system_message])
 
     # 10. 노드 함수들
-    def intent_classifier_node(state: AgentState):
+    async def intent_classifier_node(state: AgentState, config: RunnableConfig):
         """의도 분류 노드 (LLM만 사용)"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         messages = state["messages"]
         last_message = messages[-1].content
 
-        print(f"\n[의도분류 노드] 입력: {last_message}")
+        logger.debug("[의도분류 노드] 입력: %s", last_message)
+
+        # 요청 마감 시각 (API가 요청 시작 시 정한 값, 없으면 지금부터 기본 예산) + 반복/도구 호출 수 초기화
+        deadline = (config.get("configurable") or {}).get("deadline") or new_deadline()
+        budget = {"deadline": deadline, "agent_iterations": 0, "tool_calls_used": 0, "budget_exhausted": None}
+
+        # 의도분류/질문재정의 LLM을 기다리는 동안 지명 후보의 위치 검색을 미리 시작
+        # (카카오 자리가 없으면 생략 - 선행 작업이 실제 도구 호출의 자리를 차지하지 않도록)
+        if has_free_slot("kakao"):
+            speculative_geocoder.start(get_request_id(config), last_message)
 
         try:
             # LLM 기반 의도 분류
-            intent_result = intent_chain.invoke({"query": last_message})
+            intent_result = await run_with_deadline(intent_chain.ainvoke({"query": last_message}), deadline)
             intent_data = json.loads(intent_result)
             intent = intent_data["intent"]
 
-            elapsed = time.time() - start_time
-            print(f"⏱️ [의도분류 시간] {elapsed:.3f}초")
-            print(f"[의도분류 노드] 결과: {intent} (신뢰도: {intent_data.get('confidence', 0)})")
+            elapsed = time.perf_counter() - start_time
+            logger.info(
+                "[의도분류 노드] 결과: %s (신뢰도: %s, %.3f초)",
+                intent,
+                intent_data.get("confidence", 0),
+                elapsed,
+                extra={"intent": intent},
+            )
 
-            return {"intent": intent}
+            # 이전 턴의 지도 데이터가 이번 응답에 섞이지 않도록 초기화
+            return {
+                "intent": intent,
+                "intent_confidence": float(intent_data.get("confidence", 0) or 0),
+                "structured_data": None,
+                **budget,
+            }
 
         except Exception as e:
-            elapsed = time.time() - start_time
-            print(f"⏱️ [의도분류 시간 (실패)] {elapsed:.3f}초")
-            print(f"[의도분류 노드] 오류: {e}, 기본값 사용")
-            return {"intent": "general_chat"}
+            elapsed = time.perf_counter() - start_time
+            logger.warning("[의도분류 노드] 오류: %r, 기본값 사용 (%.3f초)", e, elapsed)
+            return {"intent": "general_chat", "intent_confidence": 0.0, "structured_data": None, **budget}
 
 
-    def query_rewrite_node(state: AgentState):
+    async def query_rewrite_node(state: AgentState):
         """질문 재정의 노드 (시간 측정)"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         messages = state["messages"]
         last_message = messages[-1].content
         intent = state.get("intent", "")
 
+        # 이전 턴의 재정의 결과가 도구에 재사용되지 않도록 항상 덮어씀
         if intent in ["general_chat", "general_knowledge"]:
-            return {"rewritten_query": last_message}
+            return {"rewritten_query": last_message, "kakao_query": None, "location_type": None}
 
-        print(f"\n[질문재정의 노드] 입력: {last_message}")
+        logger.debug("[질문재정의 노드] 입력: %s", last_message)
 
         try:
-            rewritten = query_rewrite_chain.invoke({"original_query": last_message})
+            rewritten = await run_with_deadline(
+                query_rewrite_chain.ainvoke({"original_query": last_message}), state.get("deadline")
+            )
             
             # JSON 파싱 시도
-            try:
-                import json
-                parsed = json.loads(rewritten)
-                kakao_query = parsed.get("kakao", last_message)
-                vector_query = parsed.get("vector", last_message)
-                
-                print(f"[질문재정의] 카카오용: {kakao_query}")
-                print(f"[질문재정의] Vector용: {vector_query}")
+            parsed = parse_rewritten_query(rewritten, last_message)
+            if parsed:
+                logger.debug("[질문재정의] 카카오용: %s", parsed["kakao_query"])
+                logger.debug("[질문재정의] Vector용: %s", parsed["vector_query"])
                 
-                # State에 두 쿼리 모두 저장
+                # State에 쿼리 모두 저장 (도구에서 재정의 LLM을 다시 호출하지 않도록)
                 return {
-                    "rewritten_query": vector_query,  # 기본값 (기존 로직 유지)
-                    "kakao_query": kakao_query,       # 카카오 전용 (NEW)
+                    "rewritten_query": parsed["vector_query"],  # 기본값 (기존 로직 유지)
+                    "kakao_query": parsed["kakao_query"],       # 카카오 전용
+                    "location_type": parsed["location_type"],
                 }
-            except (json.JSONDecodeError, KeyError):
-                # JSON 파싱 실패 시 기존 방식 사용
-                print(f"[질문재정의] 단일 쿼리: {rewritten}")
-                return {"rewritten_query": rewritten}
+
+            # JSON 파싱 실패 시 기존 방식 사용
+            logger.debug("[질문재정의] 단일 쿼리: %s", rewritten)
+            return {"rewritten_query": rewritten, "kakao_query": None, "location_type": None}
             
         except Exception as e:
-            elapsed = time.time() - start_time
-            print(f"⏱️ [질문재정의 시간 (실패)] {elapsed:.3f}초")
-            print(f"[질문재정의 노드] 오류: {e}")
-            return {"rewritten_query": last_message}
+            elapsed = time.perf_counter() - start_time
+            logger.warning("[질문재정의 노드] 오류: %r (%.3f초)", e, elapsed)
+            return {"rewritten_query": last_message, "kakao_query": None, "location_type": None}
 
 
-    def agent_node(state: AgentState):
+    async def agent_node(state: AgentState):
         """에이전트 추론 노드 (시간 측정)"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         messages = state["messages"]
         intent = state.get("intent", "")
 
-        print(f"\n[에이전트 노드] 의도: {intent}")
+        iterations = (state.get("agent_iterations") or 0) + 1
+        logger.debug("[에이전트 노드] 의도: %s (%d회차)", intent, iterations)
+
+        # 컨텍스트 윈도우 적용 (시스템 프롬프트는 항상 맨 앞에 한 번만)
+        history = [m for m in messages if not isinstance(m, SystemMessage)]
+        history, window = apply_context_window(
+            history,
+            keep_turns=CONTEXT_KEEP_TURNS,
+            max_tokens=CONTEXT_MAX_TOKENS,
+            tool_summary_chars=CONTEXT_TOOL_SUMMARY_CHARS,
+            reserved_tokens=system_prompt_tokens,
+        )
+        if window["tokens_after"] < window["tokens_before"]:
+            logger.debug(
+                "[컨텍스트] %d → %d 토큰 (요약 %d개, 제거 %d턴)",
+                window["tokens_before"],
+                window["tokens_after"],
+                window["summarized_tool_messages"],
+                window["dropped_turns"],
+            )
 
-        if not any(isinstance(m, SystemMessage) for m in messages):
-            messages = [SystemMessage(content=SYSTEM_PROMPT)] + messages
+        try:
+            response = await run_with_deadline(llm_with_tools.ainvoke([system_message] + history), state.get("deadline"))
+        except TimeoutError:
+            # 마감 시각 초과 → 지금까지 얻은 가장 나은 답변으로 종료 (도구 호출 없는 AIMessage)
+            record_exhausted("deadline")
+            logger.warning("[에이전트 노드] 요청 마감 시각 초과 → 현재까지의 답변으로 종료")
+            return {
+                "messages": [AIMessage(content=best_answer_so_far(messages))],
+                "agent_iterations": iterations,
+                "budget_exhausted": "deadline",
+            }
 
-        response = llm_with_tools.invoke(messages)
+        # 실제 프롬프트 토큰 (제공자 사용량이 없으면 추정치)
+        usage = getattr(response, "usage_metadata", None) or {}
+        prompt_tokens = usage.get("input_tokens") or window["tokens_after"]
+        record_prompt_tokens(prompt_tokens)
+        logger.debug("[컨텍스트] 프롬프트 토큰: %s", prompt_tokens)
         
-        elapsed = time.time() - start_time
-        print(f"⏱️ [LLM 호출 시간] {elapsed:.3f}초")
+        elapsed = time.perf_counter() - start_time
+        logger.debug("⏱️ [LLM 호출 시간] %.3f초", elapsed)
 
-        return {"messages": [response]}
+        return {"messages": [response], "agent_iterations": iterations}
 
 
-    def tools_node_with_structured_data(state: AgentState):
+    async def tools_node_with_structured_data(state: AgentState):
         """도구 실행 노드 (시간 측정)"""
-        start_time = time.time()
-        from langgraph.prebuilt import ToolNode
+        start_time = time.perf_counter()
+        tool_calls = getattr(state["messages"][-1], "tool_calls", None) or []
+        tool_calls_used = (state.get("tool_calls_used") or 0) + len(tool_calls)
 
-        tool_node = ToolNode(tools)
-        result = tool_node.invoke(state)
+        try:
+            result = await run_with_deadline(tool_node.ainvoke(state), state.get("deadline"))
+        except TimeoutError:
+            # 마감 시각 초과 → 실행 중인 도구를 취소하고 각 호출에 "실행하지 않음" 응답
+            logger.warning("[tools_node] 요청 마감 시각 초과 → 도구 %d개 취소", len(tool_calls))
+            return {
+                "messages": skipped_tool_messages(state["messages"][-1]),
+                "structured_data": None,
+                "tool_calls_used": tool_calls_used,
+                "budget_exhausted": "deadline",
+            }
 
-        # 도구 결과에서 structured_data 추출
+        # 도구 결과에서 structured_data 추출 (content_and_artifact → ToolMessage.artifact)
         messages = result.get("messages", [])
         structured_data = None
 
         for message in messages:
-            if hasattr(message, "content"):
-                content = message.content
-
-                # content가 문자열인 경우 JSON 파싱 시도
-                if isinstance(content, str):
-                    try:
-                        import json
-
-                        parsed = json.loads(content)
-                        if isinstance(parsed, dict) and "structured_data" in parsed:
-                            # None이 아닌 structured_data를 우선적으로 사용
-                            if parsed["structured_data"] is not None:
-                                structured_data = parsed["structured_data"]
-                                print(
-                                    f"[tools_node] structured_data 추출 완료 (JSON): True"
-                                )
-                            message.content = parsed.get("text", content)
-                    except (json.JSONDecodeError, TypeError):
-                        pass
-
-                # content가 dict인 경우 직접 처리
-                elif isinstance(content, dict) and "structured_data" in content:
-                    # None이 아닌 structured_data를 우선적으로 사용
-                    if content["structured_data"] is not None:
-                        structured_data = content["structured_data"]
-                        print(f"[tools_node] structured_data 추출 완료 (dict): True")
-                    message.content = content.get("text", str(content))
-
-        elapsed = time.time() - start_time
-        print(f"⏱️ [도구 실행 시간] {elapsed:.3f}초")
-
-        return {"messages": messages, "structured_data": structured_data}
+            artifact = getattr(message, "artifact", None)
+            # None이 아닌 structured_data를 우선적으로 사용
+            if artifact is not None:
+                structured_data = artifact
+
+        elapsed = time.perf_counter() - start_time
+        logger.debug("⏱️ [도구 실행 시간] %.3f초 (지도 데이터: %s)", elapsed, structured_data is not None)
+
+        return {"messages": messages, "structured_data": structured_data, "tool_calls_used": tool_calls_used}
+
+    def route_after_rewrite(state: AgentState):
+        """
+        확실한 의도는 에이전트 LLM을 거치지 않고 바로 도구 실행
+        (대화의 첫 질문일 때만: "거기서 화재 나면?" 같은 후속 질문은 에이전트가 이전 대화로 인자를 채움)
+        """
+        intent = state.get("intent", "")
+        confidence = state.get("intent_confidence", 0.0) or 0.0
+
+        # 의도분류/질문재정의에서 예산을 다 쓴 경우
+        if expired(state.get("deadline")):
+            return "budget_exhausted"
+
+        is_first_turn = not any(isinstance(message, HumanMessage) for message in state["messages"][:-1])
+        if (
+            DIRECT_DISPATCH_ENABLED
+            and is_first_turn
+            and intent in INTENT_TOOL_MAP
+            and confidence >= DIRECT_DISPATCH_MIN_CONFIDENCE
+        ):
+            return "direct_dispatch"
+        return "agent"
+
+    def direct_dispatch_node(state: AgentState):
+        """의도에 대응하는 도구 호출 메시지를 직접 생성 (LLM 호출 없음)"""
+        intent = state["intent"]
+        last_message = state["messages"][-1].content
+        tool_name = INTENT_TOOL_MAP[intent]
+        argument = build_dispatch_argument(intent, last_message)
+
+        logger.info("[직접 실행] 의도: %s → %s('%s')", intent, tool_name, argument, extra={"tool": tool_name})
+
+        tool_call_message = AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": tool_name,
+                    "args": {"query": argument},
+                    "id": f"call_direct_{uuid.uuid4().hex[:12]}",
+                    "type": "tool_call",
+                }
+            ],
+        )
+        return {"messages": [tool_call_message]}
+
+    def budget_exhausted_node(state: AgentState):
+        """시간/반복/도구 호출 예산 소진 → 지금까지 얻은 가장 나은 답변으로 종료"""
+        messages = state["messages"]
+        last_message = messages[-1]
+        pending_calls = getattr(last_message, "tool_calls", None) or []
+
+        if state.get("budget_exhausted"):
+            reason = state["budget_exhausted"]
+        elif expired(state.get("deadline")):
+            reason = "deadline"
+        elif pending_calls:
+            reason = "max_tool_calls"
+        else:
+            reason = "max_iterations"
+        record_exhausted(reason)
+
+        answer = best_answer_so_far(messages)
+        logger.warning(
+            "[예산 소진] %s (에이전트 %d회, 도구 %d회) → 현재까지의 답변으로 종료",
+            reason,
+            state.get("agent_iterations") or 0,
+            state.get("tool_calls_used") or 0,
+            extra={"budget_exhausted": reason},
+        )
+        # 실행하지 않은 도구 호출에도 응답을 남겨 다음 턴의 LLM 호출이 깨지지 않도록 함
+        return {
+            "messages": [*skipped_tool_messages(last_message), AIMessage(content=answer)],
+            "budget_exhausted": reason,
+        }
 
     def should_continue(state: AgentState):
         """도구 실행 필요 여부 판단"""
         messages = state["messages"]
         last_message = messages[-1]
 
-        # 도구 호출이 있으면 도구 실행
+        # 도구 호출이 있으면 도구 실행 (마감 시각 초과나 도구 호출 한도 초과면 중단)
         if hasattr(last_message, "tool_calls") and last_message.tool_calls:
+            if expired(state.get("deadline")):
+                return "budget_exhausted"
+            if (state.get("tool_calls_used") or 0) + len(last_message.tool_calls) > AGENT_MAX_TOOL_CALLS:
+                return "budget_exhausted"
             return "tools"
 
         # 없으면 종료
@@ -1708,41 +1709,58 @@ def create_langgraph_app(vectorstore):
         
         # 도구 실행 결과가 있고, structured_data가 있으면 바로 종료
         if state.get("structured_data") is not None:
-            print("[최적화] structured_data 존재 → 즉시 종료")
+            logger.debug("[최적화] structured_data 존재 → 즉시 종료")
             return END
         
         # 도구 실행 결과가 텍스트로만 있어도 종료
         if hasattr(last_message, "content") and len(str(last_message.content)) > 50:
-            print("[최적화] 충분한 답변 존재 → 즉시 종료")
+            logger.debug("[최적화] 충분한 답변 존재 → 즉시 종료")
             return END
         
-        # 추가 도구 호출이 필요한 경우만 agent로 복귀
+        # 예산이 남은 경우에만 agent로 복귀 (마감 시각, 에이전트 반복 한도)
+        if (
+            state.get("budget_exhausted")
+            or expired(state.get("deadline"))
+            or (state.get("agent_iterations") or 0) >= AGENT_MAX_ITERATIONS
+        ):
+            return "budget_exhausted"
         return "agent"
 
     # 11. 그래프 구성
     workflow = StateGraph(AgentState)
 
-    # 노드 추가
-    workflow.add_node("intent_classifier", intent_classifier_node)
-    workflow.add_node("query_rewrite", query_rewrite_node)
-    workflow.add_node("agent", agent_node)
-    workflow.add_node("tools", tools_node_with_structured_data)
+    # 노드 추가 (노드별 node.<이름> span 측정)
+    workflow.add_node("intent_classifier", traced_node("intent_classifier", intent_classifier_node))
+    workflow.add_node("query_rewrite", traced_node("query_rewrite", query_rewrite_node))
+    workflow.add_node("agent", traced_node("agent", agent_node))
+    workflow.add_node("direct_dispatch", traced_node("direct_dispatch", direct_dispatch_node))
+    workflow.add_node("tools", traced_node("tools", tools_node_with_structured_data))
+    workflow.add_node("budget_exhausted", traced_node("budget_exhausted", budget_exhausted_node))
 
     # 엣지 연결
     workflow.add_edge(START, "intent_classifier")
     workflow.add_edge("intent_classifier", "query_rewrite")
-    workflow.add_edge("query_rewrite", "agent")
-    workflow.add_conditional_edges("agent", should_continue, ["tools", END])
-    workflow.add_conditional_edges("tools", should_continue_after_tools, ["agent", END])  # 수정
-
-    # 12. 메모리 체크포인트
-    memory = MemorySaver()
-
-    # 13. 컴파일
-    app = workflow.compile(checkpointer=memory)
-
-    print("[LangGraph] 앱 생성 완료")
-    print(f"  - 노드: intent_classifier → query_rewrite → agent ⇄ tools")
-    print(f"  - 도구: {len(tools)}개")
+    workflow.add_conditional_edges(
+        "query_rewrite", route_after_rewrite, ["direct_dispatch", "agent", "budget_exhausted"]
+    )
+    workflow.add_edge("direct_dispatch", "tools")
+    workflow.add_conditional_edges("agent", should_continue, ["tools", "budget_exhausted", END])
+    workflow.add_conditional_edges("tools", should_continue_after_tools, ["agent", "budget_exhausted", END])  # 수정
+    workflow.add_edge("budget_exhausted", END)
+
+    # 12. 컴파일
+    checkpointer = create_checkpointer()
+    app = workflow.compile(checkpointer=checkpointer)
+    stateless_app = workflow.compile()
+
+    logger.info(
+        "[LangGraph] 앱 생성 완료 (노드: intent_classifier → query_rewrite → (direct_dispatch | agent) ⇄ tools "
+        "[→ budget_exhausted], "
+        "도구 %d개, 체크포인트 %s, 정적 프롬프트 토큰 %s, %.3f초)",
+        len(tools),
+        type(checkpointer).__name__,
+        static_prompt_tokens(),
+        time.perf_counter() - build_start,
+    )
 
-    return app
+    return app, stateless_app
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+LLM 호출 계측용 콜백 모듈
+요청 단위로 LLM 호출 횟수와 토큰 사용량(프롬프트/캐시 적중/완성)을 집계하는 LangChain 콜백 핸들러
+"""
+
+import threading
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# 서버 전체 누적 토큰 사용량 (노드별)
+_usage_lock = threading.Lock()
+_usage_by_node: Dict[str, Dict[str, int]] = {}
+
+
+def extract_token_usage(response) -> Tuple[int, int, int]:
+    """
+    LLMResult에서 (프롬프트, 캐시 적중 프롬프트, 완성) 토큰 수 추출
+    - usage_metadata (langchain 표준) 우선, 없으면 llm_output.token_usage (OpenAI 원본)
+    """
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                details = usage.get("input_token_details") or {}
+                return (
+                    usage.get("input_tokens", 0) or 0,
+                    details.get("cache_read", 0) or 0,
+                    usage.get("output_tokens", 0) or 0,
+                )
+
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    cached = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0) or 0
+    return (
+        token_usage.get("prompt_tokens", 0) or 0,
+        cached,
+        token_usage.get("completion_tokens", 0) or 0,
+    )
+
+
+def llm_usage_stats() -> dict:
+    """노드별 누적 토큰 사용량과 프롬프트 캐시 적중률"""
+    with _usage_lock:
+        by_node = {node: dict(usage) for node, usage in _usage_by_node.items()}
+
+    totals = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+    for usage in by_node.values():
+        for key in totals:
+            totals[key] += usage[key]
+    for usage in [totals, *by_node.values()]:
+        usage["cache_hit_ratio"] = (
+            round(usage["cached_tokens"] / usage["prompt_tokens"], 4) if usage["prompt_tokens"] else 0.0
+        )
+    return {"total": totals, "by_node": by_node}
+
+
+class LLMCallCounter(BaseCallbackHandler):
+    """요청 1건 동안 발생한 LLM 호출 횟수와 토큰 사용량을 세는 콜백"""
+
+    def __init__(self):
+        self.count = 0
+        self.calls: List[str] = []
+        self.usage: List[Dict[str, Any]] = []  # 호출별 {"node", "prompt", "cached", "completion"}
+        self._run_nodes: Dict[Any, str] = {}
+
+    def _record(self, run_id, metadata: Dict[str, Any] = None):
+        self.count += 1
+        # 어느 노드에서 호출됐는지 기록 (LangGraph가 metadata에 노드명을 넣어줌)
+        node = (metadata or {}).get("langgraph_node", "unknown")
+        self.calls.append(node)
+        self._run_nodes[run_id] = node
+
+    def on_chat_model_start(self, serialized, messages, *, run_id=None, metadata=None, **kwargs):
+        self._record(run_id, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id=None, metadata=None, **kwargs):
+        self._record(run_id, metadata)
+
+    def on_llm_end(self, response, *, run_id=None, **kwargs):
+        node = self._run_nodes.pop(run_id, "unknown")
+        prompt, cached, completion = extract_token_usage(response)
+        self.usage.append({"node": node, "prompt": prompt, "cached": cached, "completion": completion})
+
+        with _usage_lock:
+            usage = _usage_by_node.setdefault(
+                node, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+            )
+            usage["calls"] += 1
+            usage["prompt_tokens"] += prompt
+            usage["cached_tokens"] += cached
+            usage["completion_tokens"] += completion
+
+    def token_summary(self) -> str:
+        """요청 단위 토큰 합계 로그 문자열"""
+        prompt = sum(call["prompt"] for call in self.usage)
+        cached = sum(call["cached"] for call in self.usage)
+        completion = sum(call["completion"] for call in self.usage)
+        return f"프롬프트 {prompt} (캐시 {cached}) / 완성 {completion} 토큰"
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+비동기 구조화 로깅 설정 모듈
+- backend.* 로거의 기록은 QueueHandler로 큐에 넣기만 하고 (요청 처리 경로에서 stdout 쓰기 없음)
+  QueueListener 백그라운드 스레드가 JSON(python-json-logger) 또는 텍스트로 출력
+- DEBUG 기록은 LOG_DEBUG_SAMPLE_RATE 비율만 남김 (큐에 넣기 전에 버림)
+- 큐가 가득 차면 기다리지 않고 버린 뒤 개수만 집계
+- backend 로거에만 적용 (uvicorn 등 다른 라이브러리의 로깅 설정은 바꾸지 않음)
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+
+try:
+    from pythonjsonlogger.json import JsonFormatter
+except ImportError:  # python-json-logger 3.0 이전
+    from pythonjsonlogger.jsonlogger import JsonFormatter
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # json | text
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# 설정을 적용할 최상위 로거 (각 모듈은 logging.getLogger(__name__) 사용)
+ROOT_LOGGER_NAME = "backend"
+
+_stats_lock = threading.Lock()
+_stats = {"enqueued": 0, "dropped": 0, "sampled_out": 0}
+_listener = None
+
+
+class DebugSampler(logging.Filter):
+    """DEBUG 이하 기록을 일정 비율만 통과시키는 필터"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0 or random.random() < self.rate:
+            return True
+        with _stats_lock:
+            _stats["sampled_out"] += 1
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차도 기다리지 않는 QueueHandler (메시지 문자열만 만들고 포맷은 리스너에서)"""
+
+    def __init__(self, log_queue: "queue.SimpleQueue", maxsize: int):
+        super().__init__(log_queue)
+        self.maxsize = maxsize
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 인자를 지금 문자열로 확정 (이후 객체가 바뀌어도 기록 내용 유지), 예외는 텍스트로 보관
+        # backend 로거의 유일한 핸들러라 복사하지 않고 그대로 수정
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        # SimpleQueue는 상한이 없으므로 크기를 보고 직접 버림 (대략적인 상한이면 충분)
+        if self.queue.qsize() >= self.maxsize:
+            with _stats_lock:
+                _stats["dropped"] += 1
+            return
+        self.queue.put(record)
+        with _stats_lock:
+            _stats["enqueued"] += 1
+
+
+def _build_formatter() -> logging.Formatter:
+    if LOG_FORMAT == "text":
+        return logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    return JsonFormatter(
+        "%(asctime)s %(levelname)s %(name)s %(message)s",
+        rename_fields={"asctime": "time", "levelname": "level", "name": "logger"},
+        json_ensure_ascii=False,
+    )
+
+
+def setup_logging():
+    """backend.* 로거에 큐 핸들러 + 백그라운드 리스너 연결 (여러 번 호출해도 한 번만 적용)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+
+    queue_handler = NonBlockingQueueHandler(log_queue, LOG_QUEUE_SIZE)
+    queue_handler.addFilter(DebugSampler(LOG_DEBUG_SAMPLE_RATE))
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(_build_formatter())
+
+    logger = logging.getLogger(ROOT_LOGGER_NAME)
+    logger.setLevel(LOG_LEVEL)
+    logger.handlers = [queue_handler]
+    logger.propagate = False  # uvicorn/루트 로거로 중복 출력 방지
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # 종료 시 큐에 남은 기록까지 출력
+    atexit.register(_listener.stop)
+
+
+def logging_stats() -> dict:
+    with _stats_lock:
+        return {**_stats, "level": LOG_LEVEL, "debug_sample_rate": LOG_DEBUG_SAMPLE_RATE}
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+질문 힌트 모듈
+LLM 호출 없이 질문에 위치 정보가 포함됐는지 빠르게 판단하는 함수
+(캐시 사용 여부 판단 등 보수적인 용도로만 사용: 오탐은 허용, 미탐은 최소화)
+"""
+
+import re
+from typing import List
+
+from backend.app.services.keyword_matcher import DISASTER_MATCHER
+
+# 위치를 직접 가리키는 표현
+LOCATION_WORDS = ["근처", "주변", "인근", "근방", "여기", "이곳", "우리 동네", "현위치", "현재 위치"]
+
+# 지명 어미 (예: 강남역, 동작구, 여의도동, 설악산, 한강공원)
+LOCATION_SUFFIX_PATTERN = re.compile(
+    r"\S+(역|구|동|시|군|읍|리|산|도|대교|공원|터미널|공항|병원|학교|아파트|빌딩|타워|시장|해수욕장|해변|항)"
+    r"(에서|에|의|인데|근처|주변)?$"
+)
+
+# 장소 뒤에 붙는 조사/어미 (예: 롯데월드에서, 설악산인데)
+LOCATION_PARTICLE_PATTERN = re.compile(r"\S{2,}(에서|인데|쪽)$")
+
+# 광역 지자체명
+REGION_NAMES = ["서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종", "제주", "경기", "강원", "충북", "충남", "전북", "전남", "경북", "경남"]
+
+# 지명 어미로 끝나지만 위치가 아닌 단어
+NON_LOCATION_WORDS = {"화산", "행동", "진동", "발생시", "대피시", "비상시", "필요시", "유사시", "평시", "지진해일", "정도", "온도", "속도", "강도", "진도"}
+
+
+def has_location_hint(text: str) -> bool:
+    """질문에 위치 정보로 보이는 표현이 있으면 True"""
+    if any(word in text for word in LOCATION_WORDS):
+        return True
+
+    if any(region in text for region in REGION_NAMES):
+        return True
+
+    for token in text.split():
+        token = token.strip("?!.,~")
+        if token in NON_LOCATION_WORDS:
+            continue
+        if LOCATION_SUFFIX_PATTERN.match(token) or LOCATION_PARTICLE_PATTERN.match(token):
+            return True
+
+    return False
+
+
+# 지명 뒤에 붙는 조사/표현 (후보 추출 시 제거)
+PLACE_TRAILING_WORDS = ("에서", "인데", "근처", "주변", "인근", "쪽", "에", "의")
+
+
+def extract_place_candidates(text: str, limit: int = 2) -> List[str]:
+    """
+    질문에서 카카오 검색어 후보를 추출 (질문 재정의 프롬프트의 변환 규칙을 흉내)
+    예) "강남역에서 지진 나면" → ["강남역"], "동작구 대피소" → ["동작구청"], "서울 대피소" → ["서울시청"]
+    """
+    candidates: List[str] = []
+
+    for token in text.split():
+        token = token.strip("?!.,~")
+        for suffix in PLACE_TRAILING_WORDS:
+            if token.endswith(suffix) and len(token) > len(suffix) + 1:
+                token = token[: -len(suffix)]
+                break
+
+        if len(token) < 2 or token in NON_LOCATION_WORDS:
+            continue
+
+        if token in REGION_NAMES:
+            variants = [f"{token}시청"]
+        elif not LOCATION_SUFFIX_PATTERN.match(token):
+            continue
+        elif token.endswith(("구", "시")):
+            variants = [f"{token}청"]
+        elif token.endswith("동"):
+            # 동 이름은 특정 장소(명동)일 수도, 행정구역(여의도동)일 수도 있음
+            variants = [token, f"{token} 주민센터"]
+        else:
+            variants = [token]
+
+        for variant in variants:
+            if variant not in candidates:
+                candidates.append(variant)
+
+    return candidates[:limit]
+
+
+# 재난 키워드를 뺀 나머지가 이 표현들로만 이루어져야 위치 무관 질문으로 판단
+# - 두 글자 이상: 앞부분 일치 (예: "어떻게해야해", "알려줘")
+GENERIC_QUESTION_STEMS = (
+    # 질문/요청
+    "어떻게", "어떡", "어떤", "무엇", "무슨", "언제", "알려", "설명", "궁금", "가르쳐",
+    # 정의/개념
+    "이란", "정의", "의미", "차이", "종류", "원인", "특징", "증상",
+    # 행동요령
+    "행동", "요령", "대처", "대응", "대피", "피난", "방법", "준비", "대비", "예방", "주의", "수칙", "안전",
+    "조심", "비상", "물품", "가방", "챙겨", "필요", "해야", "하면", "하나", "되나", "할까",
+    # 경보
+    "경보", "특보", "재난문자", "문자", "알림",
+    # 상황
+    "나면", "일어나", "발생", "오면", "상황", "경우", "만약", "혹시",
+    # 기타 부사
+    "지금", "빨리", "정말", "그리고",
+)
+# - 한 글자: 뒤에 어미/조사만 붙은 경우만 (예: "때는", "났을", "뭐야" / "해운대"는 제외)
+GENERIC_QUESTION_CHARS = "뭐뭔왜뜻란때시중후전해할돼되올왔났좀또및요"
+GENERIC_ENDINGS = {"", "요", "어", "야", "을", "는", "는데", "서", "면", "도", "에", "엔", "나", "지", "죠", "해", "고", "다"}
+
+
+# 재난 유형 표준명 (키워드 사전에 없는 형태로 쓰여도 일반 표현으로 취급, 예: "호우")
+DISASTER_NAMES = tuple(sorted(set(DISASTER_MATCHER.mapping.values())))
+
+
+def _is_generic_word(token: str) -> bool:
+    if token.startswith(GENERIC_QUESTION_STEMS) or token.startswith(DISASTER_NAMES):
+        return True
+    return token[0] in GENERIC_QUESTION_CHARS and token[1:] in GENERIC_ENDINGS
+
+
+def is_location_free(text: str) -> bool:
+    """
+    위치와 무관한 질문이라고 확신할 수 있을 때만 True (시맨틱 캐시 조회/저장 대상 판단용)
+    - 위치 힌트나 지명 후보가 있으면 False
+    - 재난 키워드를 뺀 나머지에 일반 질문 표현이 아닌 단어가 남으면 False
+      (예: "롯데월드 화재", "코엑스 지진", "해운대 쓰나미" → 장소명일 수 있으므로 False)
+    """
+    if has_location_hint(text) or extract_place_candidates(text):
+        return False
+
+    rest = DISASTER_MATCHER.remove_spans(text, DISASTER_MATCHER.find_all(text))
+    for token in rest.split():
+        token = token.strip("?!.,~")
+        if len(token) <= 1:
+            continue
+        if not _is_generic_word(token):
+            return False
+    return True
+
+
+# 대피가 필요한 상황을 직접 가리키는 표현 (재난 키워드가 없어도 긴급 질문)
+# ("가까운", "어디로"는 앞선 위치 검색에 이어지는 대화 대비)
+URGENT_WORDS = ["대피", "피난", "살려", "도와줘", "도와주세요", "갇혔", "다쳤", "119", "긴급", "비상", "가까운", "어디로"]
+
+# 재난 키워드가 있어도 정의/개념을 묻는 질문의 끝 표현 (예: "쓰나미가 뭐야", "지진이란?")
+DEFINITION_QUESTION_PATTERN = re.compile(
+    r"(뭐야|뭐예요|뭐에요|뭔가요|뭐지|뭐임|뭔데|무엇인가요|무엇이야|이란|란|뜻|정의|의미|차이)\W*$"
+)
+
+
+def priority_lane(text: str) -> str:
+    """
+    과부하 시 그래프 실행 우선순위 (LLM 호출 없이 판단, 오탐은 허용하고 긴급 질문 미탐을 최소화)
+    - "high": 위치 정보, 대피/구조 표현, 재난 상황 질문 (예: "강남역에서 지진 나면", "불났어")
+    - "low": 인사/일반 대화, 재난 정의 질문 (예: "안녕", "쓰나미가 뭐야")
+    """
+    if has_location_hint(text) or any(word in text for word in URGENT_WORDS):
+        return "high"
+    if DISASTER_MATCHER.best(text) is not None and not DEFINITION_QUESTION_PATTERN.search(text.strip()):
+        return "high"
+    return "low"
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+정확 일치 응답 캐시 모듈
+공백/문장부호를 정규화한 질문이 같으면 이전 응답을 그대로 반환하는 LRU + TTL 캐시
+(선택적으로 디스크에 저장해 재시작 후에도 유지)
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+
+
+def normalize_query(text: str) -> str:
+    """
+    질문 정규화: 유니코드 정규화 → 소문자 → 문장부호 제거 → 공백 정리
+    예) "강남역  근처 대피소?" → "강남역 근처 대피소"
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = PUNCTUATION_PATTERN.sub(" ", text)
+    return " ".join(text.split())
+
+
+class ResponseCache:
+    """
+    (엔드포인트, 정규화된 질문) 키 기반 LRU + TTL 응답 캐시
+
+    - data_version이 바뀌면(데이터 재적재) 전체 무효화
+    - persist_path가 있으면 종료 시 저장 / 시작 시 복원
+    - TTL이 지난 항목도 stale_seconds 동안은 남겨 두고 과부하 시 get_stale()로만 반환
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 600,
+        persist_path: Optional[str] = None,
+        data_version: str = "initial",
+        stale_seconds: float = 0,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.data_version = data_version
+
+        # key -> (저장 시각(epoch), payload) - 재시작 후에도 TTL 판단이 가능하도록 벽시계 사용
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_hits = 0
+
+    @staticmethod
+    def make_key(endpoint: str, query: str, context: str = "") -> str:
+        return f"{endpoint}|{context}|{normalize_query(query)}"
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            created_at, payload = entry
+            age = time.time() - created_at
+            if age > self.ttl_seconds:
+                if age > self.ttl_seconds + self.stale_seconds:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def __contains__(self, key: str) -> bool:
+        """만료됐어도 stale_seconds 이내 항목이 있는지 (통계에 포함하지 않음)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and time.time() - entry[0] <= self.ttl_seconds + self.stale_seconds
+
+    def get_stale(self, key: str) -> Optional[dict]:
+        """TTL이 지났어도 stale_seconds 이내면 반환 (과부하 시 대체 응답용)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            created_at, payload = entry
+            if time.time() - created_at > self.ttl_seconds + self.stale_seconds:
+                return None
+
+            self.stale_hits += 1
+            return payload
+
+    def set(self, key: str, payload: dict):
+        with self._lock:
+            self._entries[key] = (time.time(), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def ensure_version(self, data_version: str):
+        """데이터 버전이 바뀌었으면 전체 무효화"""
+        if data_version != self.data_version:
+            logger.info("[응답 캐시] 데이터 버전 변경 (%s → %s) → 무효화", self.data_version, data_version)
+            self.invalidate()
+            self.data_version = data_version
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "stale_hits": self.stale_hits,
+            "data_version": self.data_version,
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+            "max_entries": self.max_entries,
+            "persist_path": str(self.persist_path) if self.persist_path else None,
+        }
+
+    def save(self):
+        """디스크 저장 (임시 파일에 쓴 뒤 교체)"""
+        if self.persist_path is None:
+            return
+
+        with self._lock:
+            data = {
+                "data_version": self.data_version,
+                "entries": [[key, created_at, payload] for key, (created_at, payload) in self._entries.items()],
+            }
+
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.persist_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.persist_path)
+        logger.info("[응답 캐시] 저장 완료: %d개 → %s", len(data["entries"]), self.persist_path)
+
+    def load(self):
+        """디스크에서 복원 (데이터 버전이 다르거나 만료된 항목은 버림)"""
+        if self.persist_path is None or not self.persist_path.exists():
+            return
+
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("[응답 캐시] 복원 실패: %s", e)
+            return
+
+        if data.get("data_version") != self.data_version:
+            logger.info("[응답 캐시] 데이터 버전이 달라 저장된 캐시를 사용하지 않습니다.")
+            return
+
+        now = time.time()
+        with self._lock:
+            for key, created_at, payload in data.get("entries", []):
+                if now - created_at <= self.ttl_seconds + self.stale_seconds:
+                    self._entries[key] = (created_at, payload)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        logger.info("[응답 캐시] 복원 완료: %d개", len(self._entries))
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+시맨틱 응답 캐시 모듈
+질문 임베딩 간 코사인 유사도로 이전 답변을 재사용하는 인메모리 캐시
+(위치와 무관한 의도 - 행동요령, 일반 지식 - 의 답변만 저장/반환)
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 위치와 무관하게 답변이 같은 의도 (캐시 대상)
+LOCATION_INDEPENDENT_INTENTS = {"disaster_guideline", "general_knowledge"}
+
+
+class SemanticCache:
+    """
+    질문 임베딩 기반 응답 캐시
+
+    - 정규화된 임베딩 행렬에 대한 내적 한 번으로 최근접 질문 검색
+    - TTL 만료 + 최대 개수 초과 시 LRU 제거
+    - data_version이 바뀌면(데이터 재적재) 전체 무효화
+    - 적중률 등 통계 제공
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        threshold: float = 0.92,
+        ttl_seconds: float = 3600,
+        max_entries: int = 512,
+        data_version: str = "initial",
+    ):
+        self.embeddings = embeddings
+        self.data_version = data_version
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        # key -> {"query", "vector", "payload", "intent", "created_at"}
+        self._entries: "OrderedDict[int, dict]" = OrderedDict()
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+        # 검색용 행렬 (변경 시 재구성)
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[int] = []
+        self._dirty = True
+
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _normalize(raw_vector) -> np.ndarray:
+        vector = np.asarray(raw_vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def embed(self, query: str) -> np.ndarray:
+        """질문 임베딩 (단위 벡터로 정규화)"""
+        return self._normalize(self.embeddings.embed_query(query))
+
+    async def aembed(self, query: str) -> np.ndarray:
+        return self._normalize(await self.embeddings.aembed_query(query))
+
+    def lookup(self, query: str) -> Tuple[Optional[dict], Optional[np.ndarray]]:
+        """
+        가장 유사한 이전 질문의 답변 검색
+
+        Returns:
+        - (payload 또는 None, 질문 임베딩) - 임베딩은 store()에서 재사용
+        """
+        return self._search(query, self.embed(query))
+
+    async def alookup(self, query: str) -> Tuple[Optional[dict], Optional[np.ndarray]]:
+        """lookup()의 비동기 버전 (임베딩 API 호출이 이벤트 루프를 막지 않음)"""
+        return self._search(query, await self.aembed(query))
+
+    def _search(self, query: str, vector: np.ndarray) -> Tuple[Optional[dict], Optional[np.ndarray]]:
+        with self._lock:
+            self._expire()
+            if not self._entries:
+                self.misses += 1
+                return None, vector
+
+            if self._dirty:
+                self._rebuild()
+
+            scores = self._matrix @ vector
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+
+            if similarity < self.threshold:
+                self.misses += 1
+                return None, vector
+
+            key = self._matrix_keys[best]
+            entry = self._entries[key]
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        logger.debug("[시맨틱 캐시] 적중: '%s' ≈ '%s' (유사도 %.3f)", query, entry["query"], similarity)
+        return entry["payload"], vector
+
+    def nearest(self, vector: np.ndarray, threshold: float) -> Optional[dict]:
+        """
+        임계값을 낮춘 최근접 답변 (과부하로 LLM을 호출할 수 없을 때의 대체 응답용)
+        적중/실패 통계에는 포함하지 않음
+        """
+        with self._lock:
+            self._expire()
+            if not self._entries:
+                return None
+            if self._dirty:
+                self._rebuild()
+
+            scores = self._matrix @ vector
+            best = int(np.argmax(scores))
+            if float(scores[best]) < threshold:
+                return None
+            return self._entries[self._matrix_keys[best]]["payload"]
+
+    def store(self, query: str, vector: Optional[np.ndarray], payload: dict, intent: Optional[str]):
+        """위치와 무관한 의도의 답변만 저장"""
+        if intent not in LOCATION_INDEPENDENT_INTENTS:
+            self.skipped += 1
+            return
+
+        if vector is None:
+            vector = self.embed(query)
+        self._insert(query, vector, payload, intent)
+
+    async def astore(self, query: str, vector: Optional[np.ndarray], payload: dict, intent: Optional[str]):
+        """store()의 비동기 버전"""
+        if intent not in LOCATION_INDEPENDENT_INTENTS:
+            self.skipped += 1
+            return
+
+        if vector is None:
+            vector = await self.aembed(query)
+        self._insert(query, vector, payload, intent)
+
+    def _insert(self, query: str, vector: np.ndarray, payload: dict, intent: str):
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+            self._entries[key] = {
+                "query": query,
+                "vector": vector,
+                "payload": payload,
+                "intent": intent,
+                "created_at": time.monotonic(),
+            }
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._dirty = True
+
+    def clear(self):
+        """전체 무효화 (데이터 재적재 시)"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            self._matrix_keys = []
+            self._dirty = True
+            self.invalidations += 1
+
+    def ensure_version(self, data_version: str):
+        """데이터 버전이 바뀌었으면 전체 무효화 (이전 데이터로 만든 행동요령 답변 제거)"""
+        if data_version != self.data_version:
+            logger.info("[시맨틱 캐시] 데이터 버전 변경 (%s → %s) → 무효화", self.data_version, data_version)
+            self.clear()
+            self.data_version = data_version
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "skipped": self.skipped,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "data_version": self.data_version,
+            "threshold": self.threshold,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+        }
+
+    def _expire(self):
+        """TTL 지난 항목 제거 (삽입 순서가 오래된 것부터)"""
+        now = time.monotonic()
+        expired = [
+            key
+            for key, entry in self._entries.items()
+            if now - entry["created_at"] > self.ttl_seconds
+        ]
+        for key in expired:
+            del self._entries[key]
+            self.expirations += 1
+        if expired:
+            self._dirty = True
+
+    def _rebuild(self):
+        self._matrix_keys = list(self._entries.keys())
+        self._matrix = np.vstack([self._entries[key]["vector"] for key in self._matrix_keys])
+        self._dirty = False
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+투기적 위치 검색 모듈
+질문이 들어오자마자 지명 후보를 로컬에서 추출해 카카오 좌표 검색 + 근처 대피소 조회를
+백그라운드로 시작하고, 위치 도구가 최종 카카오 검색어와 일치하는 결과를 가져다 쓰도록 함
+(사용되지 않은 작업은 요청 종료 시 취소하고 낭비 지표로 집계)
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+from backend.app.services.query_hints import extract_place_candidates
+
+logger = logging.getLogger(__name__)
+
+# request_id -> {정규화된 카카오 검색어: Task}
+_pending: Dict[str, Dict[str, asyncio.Task]] = {}
+
+_stats = {
+    "requests": 0,  # 투기 실행을 시작한 요청 수
+    "started": 0,  # 시작한 후보 작업 수
+    "used": 0,  # 도구가 가져다 쓴 작업 수
+    "mismatched": 0,  # 도구의 카카오 검색어가 후보와 달랐던 횟수
+    "failed": 0,  # 사용하려 했으나 오류로 끝난 작업 수
+    "wasted": 0,  # 사용되지 않고 버려진 작업 수
+    "cancelled": 0,  # 그중 완료 전에 취소된 작업 수
+}
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.split())
+
+
+class SpeculativeGeocoder:
+    """지명 후보별 위치 검색 작업을 미리 시작하고 도구에 결과를 넘겨주는 객체"""
+
+    def __init__(self, resolve_fn: Callable[[str], Awaitable[dict]], max_candidates: int = 2, enabled: bool = True):
+        self.resolve_fn = resolve_fn
+        self.max_candidates = max_candidates
+        self.enabled = enabled
+
+    def start(self, request_id: Optional[str], message: str):
+        """질문 도착 즉시 후보 지명의 위치 검색을 백그라운드로 시작"""
+        if not self.enabled or not request_id or request_id in _pending:
+            return
+
+        candidates = extract_place_candidates(message, limit=self.max_candidates)
+        if not candidates:
+            return
+
+        _pending[request_id] = {
+            _normalize(candidate): asyncio.create_task(self.resolve_fn(candidate))
+            for candidate in candidates
+        }
+        _stats["requests"] += 1
+        _stats["started"] += len(candidates)
+        logger.debug("[투기 실행] 위치 검색 선행 시작: %s", candidates)
+
+    async def consume(self, request_id: Optional[str], kakao_query: str) -> Optional[dict]:
+        """최종 카카오 검색어와 일치하는 선행 결과 반환 (없으면 None → 도구가 직접 검색)"""
+        tasks = _pending.get(request_id) if request_id else None
+        if not tasks:
+            return None
+
+        task = tasks.pop(_normalize(kakao_query), None)
+        if task is None:
+            _stats["mismatched"] += 1
+            logger.debug("[투기 실행] 후보 불일치: '%s' not in %s", kakao_query, list(tasks))
+            return None
+
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _stats["failed"] += 1
+            logger.warning("[투기 실행] 선행 작업 실패 → 직접 검색: %s", e)
+            return None
+
+        _stats["used"] += 1
+        logger.debug("[투기 실행] 선행 결과 사용: '%s'", kakao_query)
+        return result
+
+
+def finish_speculation(request_id: Optional[str]):
+    """요청 종료 시 사용되지 않은 선행 작업 정리"""
+    tasks = _pending.pop(request_id, None) if request_id else None
+    if not tasks:
+        return
+
+    for task in tasks.values():
+        _stats["wasted"] += 1
+        if not task.done():
+            task.cancel()
+            _stats["cancelled"] += 1
+        elif not task.cancelled():
+            # 완료된 작업의 예외를 회수해 "never retrieved" 경고 방지
+            task.exception()
+
+
+def speculation_stats() -> dict:
+    used_ratio = _stats["used"] / _stats["started"] if _stats["started"] else 0.0
+    return {**_stats, "pending_requests": len(_pending), "used_ratio": round(used_ratio, 4)}
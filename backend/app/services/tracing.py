@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+요청 추적(span) / 지연시간 히스토그램 모듈
+- 요청, 그래프 노드, 도구, LLM, 카카오 API, ChromaDB 호출을 span으로 측정 (단조 시계 perf_counter)
+- span 이름별 히스토그램에 누적해 /metrics에서 p50/p95/p99 조회
+- TRACE_FILE 환경변수가 있으면 요청 단위 trace를 JSON Lines로 기록 (별도 스레드에서 쓰기)
+"""
+
+import functools
+import inspect
+import json
+import logging
+import math
+import os
+import queue
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILE = os.getenv("TRACE_FILE", "")
+# 요청 1건에 기록할 최대 span 수 (에이전트 루프가 길어져도 trace 크기 제한)
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "200"))
+
+# 히스토그램 버킷 상한 (초): 1ms부터 1.25배씩 약 2분까지
+BUCKET_BOUNDS = [round(0.001 * 1.25 ** i, 6) for i in range(53)]
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[str]] = ContextVar("current_span", default=None)
+
+
+class Histogram:
+    """고정 버킷 지연시간 히스토그램 (분위수는 버킷 내 선형 보간)"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)  # 마지막은 +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+    def observe(self, seconds: float, error: bool = False):
+        self.buckets[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if error:
+            self.errors += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = BUCKET_BOUNDS[index - 1] if index > 0 else 0.0
+                upper = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                value = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(value, self.max)
+            seen += bucket_count
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean": round(self.total / self.count, 4) if self.count else 0.0,
+            "p50": round(self.percentile(0.50), 4),
+            "p95": round(self.percentile(0.95), 4),
+            "p99": round(self.percentile(0.99), 4),
+            "max": round(self.max, 4),
+        }
+
+
+_histograms_lock = threading.Lock()
+_histograms: Dict[str, Histogram] = {}
+
+
+def observe(name: str, seconds: float, error: bool = False):
+    """span 이름별 히스토그램에 소요 시간 기록"""
+    with _histograms_lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds, error)
+
+
+class Trace:
+    """요청 1건의 span 목록 (trace 파일 기록용)"""
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.attrs = attrs
+        self.started_at = time.time()  # 기록용 벽시계 시각
+        self.start = time.perf_counter()
+        self.spans: List[dict] = []
+        self.dropped = 0
+
+    def add(self, record: dict):
+        if len(self.spans) < TRACE_MAX_SPANS:
+            self.spans.append(record)
+        else:
+            self.dropped += 1
+
+
+def _finish_span(name, span_id, parent_id, start, attrs, error):
+    """span 종료 처리 (히스토그램 + 현재 trace에 기록), 소요 시간 반환"""
+    end = time.perf_counter()
+    elapsed = end - start
+    observe(name, elapsed, error is not None)
+
+    trace = _current_trace.get()
+    if trace is not None:
+        record = {
+            "name": name,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "offset": round(start - trace.start, 6),
+            "duration": round(elapsed, 6),
+        }
+        if attrs:
+            record["attrs"] = attrs
+        if error is not None:
+            record["error"] = error
+        trace.add(record)
+    return elapsed
+
+
+def _reset(var: ContextVar, token):
+    try:
+        var.reset(token)
+    except ValueError:
+        # 스트리밍 제너레이터가 다른 컨텍스트에서 종료된 경우
+        var.set(None)
+
+
+class span:
+    """
+    span 측정 컨텍스트 매니저 (with / async with 모두 사용 가능)
+
+    예: with span("kakao.keyword_search", query=query) as s: ...; print(s.elapsed)
+    """
+
+    def __init__(self, name: str, **attrs):
+        self.name = name
+        self.attrs = attrs
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id: Optional[str] = None
+        self.start = 0.0
+        self.elapsed = 0.0
+        self._token = None
+
+    def set(self, **attrs):
+        """span 속성 추가 (캐시 적중 여부 등)"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.parent_id = _current_span.get()
+        self._token = _current_span.set(self.span_id)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        error = exc_type.__name__ if exc_type is not None else None
+        self.elapsed = _finish_span(self.name, self.span_id, self.parent_id, self.start, self.attrs, error)
+        _reset(_current_span, self._token)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+class trace_request(span):
+    """요청 최상위 span (새 trace를 시작하고 종료 시 trace 파일에 기록)"""
+
+    def __init__(self, name: str, **attrs):
+        super().__init__(f"request.{name}", **attrs)
+        self.trace: Optional[Trace] = None
+        self._trace_token = None
+
+    def __enter__(self):
+        self.trace = Trace(self.name, self.attrs)
+        self._trace_token = _current_trace.set(self.trace)
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        super().__exit__(exc_type, exc, tb)
+        _reset(_current_trace, self._trace_token)
+        if _trace_writer is not None:
+            _trace_writer.write(
+                {
+                    "trace_id": self.trace.trace_id,
+                    "name": self.name,
+                    "started_at": round(self.trace.started_at, 3),
+                    "duration": round(self.elapsed, 6),
+                    "attrs": self.attrs,
+                    "spans": self.trace.spans,
+                    "dropped_spans": self.trace.dropped,
+                }
+            )
+        return False
+
+
+def traced_node(name: str, func):
+    """그래프 노드 함수를 node.<이름> span으로 감쌈 (config 주입을 위해 시그니처 유지)"""
+    span_name = f"node.{name}"
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with span(span_name):
+                return await func(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def sync_wrapper(*args, **kwargs):
+        with span(span_name):
+            return func(*args, **kwargs)
+
+    return sync_wrapper
+
+
+class TracingCallback(BaseCallbackHandler):
+    """LLM/도구 호출을 llm.<노드>, tool.<도구> span으로 기록하는 콜백 (요청마다 생성)"""
+
+    # 실행기 스레드로 넘기지 않고 바로 호출 (시작/종료 시각 왜곡 방지, 현재 span 컨텍스트 유지)
+    run_inline = True
+
+    def __init__(self):
+        self._runs: Dict[Any, tuple] = {}
+
+    def _start(self, run_id, name: str, attrs: Optional[dict] = None):
+        self._runs[run_id] = (name, _current_span.get(), time.perf_counter(), attrs or {})
+
+    def _end(self, run_id, error: Optional[BaseException] = None):
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        name, parent_id, start, attrs = run
+        _finish_span(
+            name,
+            uuid.uuid4().hex[:16],
+            parent_id,
+            start,
+            attrs,
+            type(error).__name__ if error is not None else None,
+        )
+
+    def on_chat_model_start(self, serialized, messages, *, run_id=None, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node", "unknown")
+        self._start(run_id, f"llm.{node}")
+
+    def on_llm_start(self, serialized, prompts, *, run_id=None, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node", "unknown")
+        self._start(run_id, f"llm.{node}")
+
+    def on_llm_end(self, response, *, run_id=None, **kwargs):
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id=None, **kwargs):
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id=None, **kwargs):
+        tool_name = kwargs.get("name") or (serialized or {}).get("name", "unknown")
+        self._start(run_id, f"tool.{tool_name}")
+
+    def on_tool_end(self, output, *, run_id=None, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id=None, **kwargs):
+        self._end(run_id, error)
+
+
+class _TraceWriter:
+    """trace를 JSON Lines 파일에 기록하는 백그라운드 스레드 (요청 처리 경로에서 파일 I/O 없음)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.SimpleQueue[dict]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record: dict):
+        self._queue.put(record)
+
+    def _run(self):
+        while True:
+            records = [self._queue.get()]
+            # 밀린 trace는 한 번에 기록
+            while True:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    for record in records:
+                        f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            except OSError as e:
+                logger.warning("⚠️ trace 파일 기록 실패: %s", e)
+
+
+_trace_writer = _TraceWriter(TRACE_FILE) if TRACE_FILE else None
+
+
+def tracing_stats() -> dict:
+    """span 이름별 지연시간 요약 (초 단위 count/mean/p50/p95/p99/max)"""
+    with _histograms_lock:
+        return {name: histogram.summary() for name, histogram in sorted(_histograms.items())}
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else repr(bound)
+
+
+def render_prometheus() -> str:
+    """Prometheus 텍스트 형식 히스토그램 (span_duration_seconds{span="..."})"""
+    lines = [
+        "# HELP span_duration_seconds Span latency by stage",
+        "# TYPE span_duration_seconds histogram",
+    ]
+    errors = [
+        "# HELP span_errors_total Spans that ended with an exception",
+        "# TYPE span_errors_total counter",
+    ]
+    with _histograms_lock:
+        for name, histogram in sorted(_histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip([*BUCKET_BOUNDS, math.inf], histogram.buckets):
+                cumulative += bucket_count
+                lines.append(f'span_duration_seconds_bucket{{span="{name}",le="{_format_bound(bound)}"}} {cumulative}')
+            lines.append(f'span_duration_seconds_sum{{span="{name}"}} {histogram.total:.6f}')
+            lines.append(f'span_duration_seconds_count{{span="{name}"}} {histogram.count}')
+            errors.append(f'span_errors_total{{span="{name}"}} {histogram.errors}')
+    return "\n".join(lines + errors) + "\n"
@@ -0,0 +1,492 @@
+# -*- coding: utf-8 -*-
+"""
+백엔드 성능 벤치마크
+- concurrency: 동시 요청을 보내 워커당 처리량(req/s)과 지연시간 분포 측정
+- latency: 질문별 순차 요청으로 종단 간 지연시간 측정
+  (DIRECT_DISPATCH_ENABLED=false/true 로 서버를 각각 띄워 직접 도구 실행 전후 비교)
+- keywords: 재난 키워드 매칭 마이크로 벤치마크 (서버 불필요)
+- capacity: 수용인원 질의 파서 퍼즈 테스트 + 파싱/범위 조회 마이크로 벤치마크 (서버 불필요)
+- followup: 여러 턴 대화에서 카카오 검색어가 도구 인자를 따르는지 확인 (가짜 LLM/카카오, 서버 불필요)
+
+실행 전 백엔드 서버를 띄워 두세요. 캐시가 결과를 왜곡하지 않도록
+RESPONSE_CACHE_ENABLED=false SEMANTIC_CACHE_ENABLED=false 로 실행하는 것을 권장합니다.
+
+예)
+    uvicorn backend.app.main:app --port 8001 --workers 1
+    python eval/benchmark.py concurrency --concurrency 16 --requests 64
+    python eval/benchmark.py latency --rounds 5
+    python eval/benchmark.py keywords --iterations 20000
+    python eval/benchmark.py capacity --phrasings 5000
+    python eval/benchmark.py followup
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import httpx
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+DEFAULT_QUERIES = [
+    "강남역 근처 대피소",
+    "지진 발생 시 행동요령",
+    "서울 지하 대피소 몇 개",
+    "천명 이상 수용 가능한 대피소",
+    "명동에서 화재 나면",
+    "쓰나미가 뭐야",
+    "동대문맨션 수용인원",
+    "설악산 근처인데 산사태 발생 시",
+]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """단순 백분위수 (정렬 후 최근접 순위)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def print_latency_summary(label: str, latencies: List[float]):
+    print(f"  {label}")
+    print(f"    - 평균: {statistics.mean(latencies):.3f}초")
+    print(f"    - p50:  {percentile(latencies, 50):.3f}초")
+    print(f"    - p95:  {percentile(latencies, 95):.3f}초")
+    print(f"    - p99:  {percentile(latencies, 99):.3f}초")
+
+
+async def run_concurrency(args):
+    """동시 요청 처리량 측정"""
+    url = f"{args.url}{args.endpoint}"
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one_request(client: httpx.AsyncClient, index: int):
+        nonlocal errors
+        query = DEFAULT_QUERIES[index % len(DEFAULT_QUERIES)]
+        body = {"query": query} if "extract" in args.endpoint else {"message": query, "session_id": f"bench_{index}"}
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json=body)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors += 1
+                print(f"[ERROR] {query}: {e}")
+
+    async with httpx.AsyncClient(timeout=args.timeout) as client:
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(one_request(client, i) for i in range(args.requests)))
+        wall_time = time.perf_counter() - wall_start
+
+    print(f"\n{'='*60}")
+    print(f"📊 동시성 벤치마크 결과 ({url})")
+    print(f"{'='*60}")
+    print(f"  요청 수: {args.requests} (동시 {args.concurrency}), 실패: {errors}")
+    print(f"  총 소요 시간: {wall_time:.3f}초")
+    print(f"  처리량: {len(latencies) / wall_time:.2f} req/s")
+    if latencies:
+        print_latency_summary("요청 지연시간", latencies)
+    print(f"{'='*60}\n")
+
+
+async def run_latency(args):
+    """질문별 종단 간 지연시간 측정 (순차 실행)"""
+    url = f"{args.url}{args.endpoint}"
+    per_query = {query: [] for query in DEFAULT_QUERIES}
+
+    async with httpx.AsyncClient(timeout=args.timeout) as client:
+        for round_index in range(args.rounds):
+            for query in DEFAULT_QUERIES:
+                body = {"query": query} if "extract" in args.endpoint else {"message": query, "session_id": f"bench_{round_index}"}
+                start = time.perf_counter()
+                try:
+                    response = await client.post(url, json=body)
+                    response.raise_for_status()
+                    per_query[query].append(time.perf_counter() - start)
+                except Exception as e:
+                    print(f"[ERROR] {query}: {e}")
+
+    print(f"\n{'='*60}")
+    print(f"📊 종단 간 지연시간 ({url}, {args.rounds}회 반복)")
+    print(f"{'='*60}")
+    for query, latencies in per_query.items():
+        if latencies:
+            print(f"  {query:<30} 평균 {statistics.mean(latencies):.3f}초")
+    all_latencies = [value for latencies in per_query.values() for value in latencies]
+    if all_latencies:
+        print_latency_summary("전체", all_latencies)
+    print(f"{'='*60}\n")
+
+
+KEYWORD_QUERIES = [
+    "산불 났을 때 어떻게 해",
+    "강남역에서 지진 나면",
+    "지진 대비 행동요령",
+    "화산 폭발하면?",
+    "설악산 근처인데 산사태 발생 시",
+    "양양 쓰나미",
+    "비산동 가스 누출",
+    "서울 대피소 알려줘",
+]
+
+
+def run_keywords(args):
+    """재난 키워드 매칭: 기존 방식(사전 순서대로 `in` 검사) vs Aho–Corasick"""
+    from backend.app.services.keyword_matcher import DISASTER_KEYWORD_MAPPING, DISASTER_MATCHER
+
+    def linear_first_match(query: str):
+        # 기존 도구 코드와 같은 방식: 삽입 순서상 처음 포함된 키워드
+        for keyword, mapped_name in DISASTER_KEYWORD_MAPPING.items():
+            if keyword in query:
+                return keyword, mapped_name
+        return None
+
+    print(f"\n{'='*60}")
+    print("📊 재난 키워드 매칭 결과 비교 (기존 → Aho–Corasick)")
+    print(f"{'='*60}")
+    for query in KEYWORD_QUERIES:
+        before = linear_first_match(query)
+        after = DISASTER_MATCHER.best(query)
+        after_text = f"{after.keyword}→{after.value}" if after else None
+        before_text = f"{before[0]}→{before[1]}" if before else None
+        print(f"  {query:<28} {before_text} → {after_text}")
+
+    timings = {}
+    for label, func in [
+        # 기존 도구는 호출마다 사전을 새로 만들었으므로 생성 비용 포함
+        ("기존 (사전 생성 + 순차 검사)", lambda q: (dict(DISASTER_KEYWORD_MAPPING), linear_first_match(q))),
+        ("Aho–Corasick (best)", DISASTER_MATCHER.best),
+        ("Aho–Corasick (find_all)", DISASTER_MATCHER.find_all),
+    ]:
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            for query in KEYWORD_QUERIES:
+                func(query)
+        elapsed = time.perf_counter() - start
+        timings[label] = elapsed / (args.iterations * len(KEYWORD_QUERIES)) * 1e6
+
+    print(f"\n  질의당 평균 ({args.iterations}회 × {len(KEYWORD_QUERIES)}개 질의)")
+    for label, micros in timings.items():
+        print(f"    - {label}: {micros:.2f}µs")
+    print(f"{'='*60}\n")
+
+
+def legacy_parse_capacity(query: str):
+    """이전 search_shelter_by_capacity의 파싱 (비교용 재현: 정규식 15개 이상을 순서대로 적용)"""
+    import re
+
+    is_minimum = "이하" not in query
+    capacity_value = 0
+    if "천" in query or "1000" in query:
+        match = re.search(r"(\d+)\s*천", query)
+        capacity_value = int(match.group(1)) * 1000 if match else 1000
+    elif "만" in query or "10000" in query:
+        match = re.search(r"(\d+)\s*만", query)
+        capacity_value = int(match.group(1)) * 10000 if match else 10000
+    else:
+        numbers = re.findall(r"\d+", query)
+        if numbers:
+            capacity_value = int(numbers[0])
+
+    location_query = query
+    for pattern in [
+        r"\d+\s*천\s*명?\s*(이상|이하)?", r"\d+\s*만\s*명?\s*(이상|이하)?", r"\d+\s*명\s*(이상|이하)?",
+        r"천\s*명?\s*(이상|이하)?", r"만\s*명?\s*(이상|이하)?", r"수용\s*인원\s*(이|가)?",
+        r"수용\s*할?\s*수\s*있는", r"수용\s*가능한?", r"최대\s*수용", r"인원\s*(이|가|을|를)?",
+        r"대피소\s*(를|을|이|가)?", r"찾아\s*줘?", r"알려\s*줘?", r"있어\??", r"있니\??", r"있나요\??",
+    ]:
+        location_query = re.sub(pattern, " ", location_query, flags=re.IGNORECASE)
+    location_query = re.sub(r"\s*(에서|에|의|에서의)\s*", " ", location_query)
+    return capacity_value, is_minimum, " ".join(location_query.split()).strip()
+
+
+def korean_number_forms(value: int) -> List[str]:
+    """같은 값을 나타내는 여러 숫자 표기 (1500 → "1500", "1,500", "천오백", "1천5백" ...)"""
+    digits = "영일이삼사오육칠팔구"
+
+    def korean_section(number: int, use_digits: bool) -> str:
+        text = ""
+        for unit_value, unit in ((1000, "천"), (100, "백"), (10, "십")):
+            count, number = divmod(number, unit_value)
+            if count:
+                prefix = str(count) if use_digits else ("" if count == 1 else digits[count])
+                text += prefix + unit
+        if number:
+            text += str(number) if use_digits else digits[number]
+        return text
+
+    forms = [str(value), f"{value:,}"]
+    high, low = divmod(value, 10000)
+    for use_digits in (False, True):
+        text = ""
+        if high:
+            text += ("" if high == 1 and not use_digits else korean_section(high, use_digits)) + "만"
+        text += korean_section(low, use_digits)
+        forms.append(text)
+    return list(dict.fromkeys(forms))
+
+
+CAPACITY_LOCATIONS = ["", "서울 동작구", "인천", "천호동", "이천시", "의정부", "강남구에서", "부산 해운대구의"]
+CAPACITY_FILLERS = ["", " 수용 가능한 대피소", " 수용할 수 있는 대피소 알려줘", " 대피소 있어?", "인 곳 찾아줘"]
+CAPACITY_OPERATORS = [
+    ("이상", "min", True), ("이하", "max", True), ("초과", "min", False), ("미만", "max", False),
+    ("넘는", "min", False), ("까지", "max", True), ("", "min", True),
+]
+
+
+def generate_capacity_phrasings(count: int, seed: int = 42):
+    """(질문, 기대 (min, max, min_inclusive, max_inclusive), 기대 위치) 생성"""
+    import random
+
+    rng = random.Random(seed)
+    for _ in range(count):
+        location = rng.choice(CAPACITY_LOCATIONS)
+        filler = rng.choice(CAPACITY_FILLERS)
+        expected_location = location.removesuffix("에서").removesuffix("의")
+        unit = rng.choice(["명", " 명", "명", ""])
+
+        if rng.random() < 0.25:
+            # 범위: "500~1000명", "500명에서 1000명 사이"
+            low = rng.choice([100, 300, 500, 1000, 1500, 2000])
+            high = low + rng.choice([200, 500, 1000, 3000])
+            low_text = rng.choice(korean_number_forms(low))
+            high_text = rng.choice(korean_number_forms(high))
+            separator = rng.choice(["~", " ~ ", "-", f"{unit or '명'}에서 "])
+            suffix = rng.choice(["", " 사이"])
+            condition = f"{low_text}{separator}{high_text}{unit or '명'}{suffix}"
+            expected = (low, high, True, True)
+        else:
+            value = rng.choice([50, 100, 300, 500, 1000, 1500, 2000, 3000, 5000, 10000, 15000, 20000, 53600])
+            operator, kind, inclusive = rng.choice(CAPACITY_OPERATORS)
+            value_text = rng.choice(korean_number_forms(value))
+            if not unit and not operator:
+                unit = "명"
+            condition = f"{value_text}{unit}{' ' if rng.random() < 0.7 and operator else ''}{operator}"
+            expected = (value, None, inclusive, True) if kind == "min" else (None, value, True, inclusive)
+
+        query = f"{location} {condition}{filler}".strip()
+        yield query, expected, expected_location
+
+
+def run_capacity(args):
+    """수용인원 질의 파서 퍼즈 테스트 + 기존 정규식 방식 대비 파싱 속도 + 범위 조회 속도"""
+    import random
+
+    from backend.app.services.capacity_parser import CapacityIndex, parse_capacity_query
+
+    phrasings = list(generate_capacity_phrasings(args.phrasings, seed=args.seed))
+
+    # 1. 정확도 (수용인원 조건 + 위치 키워드)
+    failures = []
+    legacy_correct = 0
+    for query, expected, expected_location in phrasings:
+        parsed = parse_capacity_query(query)
+        actual = (parsed.minimum, parsed.maximum, parsed.min_inclusive, parsed.max_inclusive)
+        if actual != expected or parsed.location != expected_location:
+            failures.append((query, expected, expected_location, parsed))
+
+        # 기존 방식은 포함 경계 하나("이상"/"이하")만 표현 가능
+        value, is_minimum, location = legacy_parse_capacity(query)
+        minimum, maximum, min_inclusive, max_inclusive = expected
+        if maximum is None and min_inclusive:
+            legacy_expected = (minimum, True, expected_location)
+        elif minimum is None and max_inclusive:
+            legacy_expected = (maximum, False, expected_location)
+        else:
+            legacy_expected = None
+        legacy_correct += (value, is_minimum, location) == legacy_expected
+
+    print(f"\n{'='*60}")
+    print(f"📊 수용인원 질의 파서 퍼즈 테스트 ({len(phrasings)}개 표현, seed={args.seed})")
+    print(f"{'='*60}")
+    print(f"  - 새 파서 정확도:  {len(phrasings) - len(failures)}/{len(phrasings)}")
+    print(f"  - 기존 방식 정확도: {legacy_correct}/{len(phrasings)}")
+    for query, expected, expected_location, parsed in failures[:10]:
+        print(f"    ✗ {query!r}: 기대 {expected} '{expected_location}' / 결과 {tuple(parsed)}")
+
+    # 2. 파싱 속도
+    queries = [query for query, _, _ in phrasings]
+    timings = {}
+    for label, func in [("기존 (정규식 순차 적용)", legacy_parse_capacity), ("단일 패스 토크나이저", parse_capacity_query)]:
+        rounds = []
+        for _ in range(5):
+            start = time.perf_counter()
+            for query in queries:
+                func(query)
+            rounds.append(time.perf_counter() - start)
+        timings[label] = min(rounds) / len(queries) * 1e6
+    print("\n  질의당 평균 파싱 시간 (5회 중 최솟값)")
+    for label, micros in timings.items():
+        print(f"    - {label}: {micros:.2f}µs")
+
+    # 3. 범위 조회 속도 (합성 대피소 메타데이터)
+    rng = random.Random(args.seed)
+    metadatas = [{"capacity": rng.randint(0, 60000), "facility_name": f"대피소{i}"} for i in range(args.shelters)]
+    index = CapacityIndex(metadatas)
+    capacity_queries = [parse_capacity_query(query) for query in queries[:200]]
+
+    start = time.perf_counter()
+    for capacity_query in capacity_queries:
+        sorted(
+            (m for m in metadatas if capacity_query.matches(int(m["capacity"]))),
+            key=lambda m: m["capacity"],
+            reverse=True,
+        )
+    linear_ms = (time.perf_counter() - start) / len(capacity_queries) * 1000
+
+    start = time.perf_counter()
+    for capacity_query in capacity_queries:
+        index.range(capacity_query)
+    index_ms = (time.perf_counter() - start) / len(capacity_queries) * 1000
+
+    print(f"\n  범위 조회 ({args.shelters:,}곳, 질의 {len(capacity_queries)}개 평균)")
+    print(f"    - 전체 순회 + 정렬: {linear_ms:.3f}ms")
+    print(f"    - 정렬 인덱스 + bisect: {index_ms:.3f}ms")
+    print(f"{'='*60}\n")
+    return 1 if failures else 0
+
+
+# (질문, 에이전트가 호출할 도구와 인자, 기대하는 카카오 검색어)
+# 1턴은 직접 실행(질문재정의 결과 재사용), 2턴은 이전 대화로 채운 인자, 3턴은 한 턴에 두 장소
+FOLLOWUP_TURNS = [
+    ("강남역 근처 대피소", [], ["강남역"]),
+    ("거기서 지진 나면?", [("search_location_with_disaster", "강남역 지진")], ["강남역"]),
+    ("강남역과 홍대 대피소", [("search_shelter_by_location", "강남역"), ("search_shelter_by_location", "홍대")], ["강남역", "홍대"]),
+]
+
+
+def run_followup(args):
+    """같은 세션의 여러 턴에서 카카오 검색어가 (State의 재정의 결과가 아니라) 실제 도구 인자를 따르는지 확인"""
+    import json
+    import os
+    import uuid
+
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    import backend.app.services.langgraph_agent as agent_module
+    from backend.app.services.prompts import INTENT_SYSTEM_PROMPT, QUERY_REWRITE_SYSTEM_PROMPT
+
+    plans = {query: calls for query, calls, _ in FOLLOWUP_TURNS}
+
+    class ScriptedChatModel(BaseChatModel):
+        """프롬프트 종류별로 정해진 답을 내는 가짜 LLM (재정의: 첫 어절을 카카오 검색어로)"""
+
+        @property
+        def _llm_type(self) -> str:
+            return "scripted"
+
+        def bind_tools(self, tools, **kwargs):
+            return self
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            # 프롬프트 템플릿이 중괄호를 이스케이프하므로 앞부분으로 구분
+            system = messages[0].content[:20] if messages else ""
+            last = messages[-1]
+            if system == INTENT_SYSTEM_PROMPT[:20]:
+                intent = "disaster_location" if "나면" in last.content else "shelter_search"
+                content = json.dumps({"intent": intent, "confidence": 0.95})
+                message = AIMessage(content=content)
+            elif system == QUERY_REWRITE_SYSTEM_PROMPT[:20]:
+                parsed = {"kakao": last.content.split()[0], "vector": last.content, "location_type": "specific"}
+                message = AIMessage(content=json.dumps(parsed, ensure_ascii=False))
+            elif isinstance(last, ToolMessage):
+                message = AIMessage(content="답변")
+            else:
+                question = [m for m in messages if isinstance(m, HumanMessage)][-1].content
+                message = AIMessage(
+                    content="",
+                    tool_calls=[
+                        {"name": name, "args": {"query": query}, "id": f"call_{uuid.uuid4().hex[:8]}", "type": "tool_call"}
+                        for name, query in plans[question]
+                    ],
+                )
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+    kakao_queries = []
+
+    async def recording_kakao_search(client, api_key, query, timeout=None):
+        kakao_queries.append(query)
+        return None
+
+    os.environ.setdefault("KAKAO_REST_API_KEY", "benchmark")
+    os.environ["SPECULATIVE_GEOCODING_ENABLED"] = "false"
+    agent_module.SPECULATIVE_GEOCODING_ENABLED = False
+    agent_module.ChatOpenAI = lambda **kwargs: ScriptedChatModel()
+    agent_module.search_kakao_place = recording_kakao_search
+
+    print(f"\n{'='*60}")
+    print("📊 후속 질문 카카오 검색어 확인")
+    print(f"{'='*60}")
+    failures = 0
+    for backend in ("memory", "sqlite"):
+        os.environ["CHECKPOINT_BACKEND"] = backend
+        os.environ["CHECKPOINT_SQLITE_PATH"] = str(Path(args.workdir) / f"followup-{uuid.uuid4().hex[:8]}.sqlite")
+        app, _ = agent_module.create_langgraph_apps(None, retrievers=(None, None))
+        config = {"configurable": {"thread_id": f"followup-{backend}"}}
+        for query, _, expected in FOLLOWUP_TURNS:
+            kakao_queries.clear()
+            asyncio.run(app.ainvoke({"messages": [HumanMessage(content=query)]}, config=config))
+            ok = sorted(kakao_queries) == sorted(expected)
+            failures += not ok
+            print(f"  [{backend}] {query:<16} → 카카오 {kakao_queries} {'✓' if ok else f'✗ (기대 {expected})'}")
+        if hasattr(app.checkpointer, "close"):
+            app.checkpointer.close()
+    print(f"{'='*60}\n")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재난 대피 챗봇 백엔드 벤치마크")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    concurrency = subparsers.add_parser("concurrency", help="동시 요청 처리량 측정")
+    concurrency.add_argument("--url", default="http://localhost:8001")
+    concurrency.add_argument("--endpoint", default="/api/location/extract")
+    concurrency.add_argument("--concurrency", type=int, default=16)
+    concurrency.add_argument("--requests", type=int, default=64)
+    concurrency.add_argument("--timeout", type=float, default=120.0)
+
+    latency = subparsers.add_parser("latency", help="종단 간 지연시간 측정")
+    latency.add_argument("--url", default="http://localhost:8001")
+    latency.add_argument("--endpoint", default="/api/location/extract")
+    latency.add_argument("--rounds", type=int, default=3)
+    latency.add_argument("--timeout", type=float, default=120.0)
+
+    keywords = subparsers.add_parser("keywords", help="재난 키워드 매칭 마이크로 벤치마크")
+    keywords.add_argument("--iterations", type=int, default=20000)
+
+    capacity = subparsers.add_parser("capacity", help="수용인원 질의 파서 퍼즈 테스트 + 마이크로 벤치마크")
+    capacity.add_argument("--phrasings", type=int, default=5000)
+    capacity.add_argument("--shelters", type=int, default=20000)
+    capacity.add_argument("--seed", type=int, default=42)
+
+    followup = subparsers.add_parser("followup", help="후속 질문 카카오 검색어 확인 (가짜 LLM)")
+    followup.add_argument("--workdir", default="/tmp")
+
+    args = parser.parse_args()
+
+    if args.command == "concurrency":
+        asyncio.run(run_concurrency(args))
+    elif args.command == "latency":
+        asyncio.run(run_latency(args))
+    elif args.command == "keywords":
+        run_keywords(args)
+    elif args.command == "capacity":
+        sys.exit(run_capacity(args))
+    elif args.command == "followup":
+        sys.exit(run_followup(args))
+
+
+if __name__ == "__main__":
+    main()
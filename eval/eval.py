@@ -7,6 +7,7 @@
 """
 import json
 import sys
+import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
 from typing import Dict, List
@@ -252,7 +253,7 @@ class LLMEvaluator:
             }
 
 
-def evaluate_with_llm(test_path: str, langgraph_app):
+async def evaluate_with_llm(test_path: str, langgraph_app):
     """LLM 기반 행동요령 평가"""
     
     evaluator = LLMEvaluator()
@@ -289,7 +290,7 @@ def evaluate_with_llm(test_path: str, langgraph_app):
         
         try:
             # LangGraph 실행
-            response = langgraph_app.invoke(
+            response = await langgraph_app.ainvoke(
                 {"messages": [HumanMessage(content=query)]},
                 config={"configurable": {"thread_id": f"test_{idx}"}}
             )
@@ -414,7 +415,7 @@ if __name__ == "__main__":
     
     print("\n[3/3] 평가 시작...")
     test_path = project_root / "eval" / "guideline_test.json"
-    results = evaluate_with_llm(str(test_path), langgraph_app)
+    results = asyncio.run(evaluate_with_llm(str(test_path), langgraph_app))
     
     # 최종 결과 출력
     print("\n" + "="*70)